@@ -0,0 +1,35 @@
+"""
+What the benchmarks share: their command line, timing repeated runs, and reporting the timings.
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, Optional, Sequence, Tuple
+
+
+def argument_parser(description: Optional[str], repeat: Optional[int] = None) -> argparse.ArgumentParser:
+    """A parser showing the benchmark's docstring as its help, taking `--repeat` if it has a default."""
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    if repeat is not None:
+        parser.add_argument("--repeat", type=int, default=repeat)
+    return parser
+
+
+def median_time(function: Callable[[], object], repeat: int, setup: Callable[[], object] = lambda: None) -> float:
+    """The median of `repeat` runs of `function`, in seconds. `setup` runs before each of them, untimed."""
+    timings = []
+    for _ in range(repeat):
+        setup()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def report(title: str, rows: Sequence[Tuple[str, str]]):
+    """Print `title`, followed by a line for each of the `(label, value)` rows, with the values aligned."""
+    print(title)
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label:<{width}} {value}")
@@ -0,0 +1,51 @@
+"""
+Measure how long rendering a shared command template takes, for every target of a large monorepo.
+
+    python benchmarks/bench_commands.py --targets 1000
+"""
+
+import pathlib
+
+from _common import argument_parser, median_time, report
+from suit.config import ProjectConfig, SuitConfig, SuitTemplate
+from suit.scripts.commands import render_command
+from suit.scripts.specs import ShellScriptSpec
+from suit.targets import TargetConfig, TargetConfigData
+
+_COMMAND = 'pylint "{local.path}/src/{args.package_dir}" --rcfile "{root.path}/pylintrc" -j {args.jobs}'
+
+
+def main():
+    parser = argument_parser(__doc__, repeat=20)
+    parser.add_argument("--targets", type=int, default=1000)
+    args = parser.parse_args()
+
+    root = pathlib.Path("root")
+    targets = [
+        TargetConfig(
+            root / "packages" / f"package-{index}",
+            TargetConfigData(inherit=["package"], args={"package_dir": f"package_{index}", "jobs": 4}),
+        )
+        for index in range(args.targets)
+    ]
+    suit = SuitConfig(
+        root, ProjectConfig(templates={"package": SuitTemplate({"lint": ShellScriptSpec(_COMMAND)})}), targets
+    )
+    scripts = [suit.scripts.of(target)["lint"] for target in targets]
+
+    def render_all():
+        for script in scripts:
+            render_command(script)
+
+    timing = median_time(render_all, args.repeat)
+    report(
+        f"{args.targets} targets (median of {args.repeat})",
+        [
+            ("total:", f"{timing * 1000:8.2f}ms"),
+            ("per command:", f"{timing / args.targets * 1_000_000:8.2f}us"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Measure how long validating the project configurations takes, per template.
+
+    python benchmarks/bench_config.py --templates 500
+"""
+
+from _common import argument_parser, median_time, report
+from suit.config import ProjectConfig
+
+
+def generate_config(templates: int) -> dict:
+    return {
+        "templates": {
+            f"template-{index}": {
+                "scripts": {
+                    "lint:black": {"cmd": "black --check {package_dir}", "inputs": ["src/**/*.py"]},
+                    "lint:pylint": "pylint {package_dir}",
+                    "lint": {"scripts": [{"ref": "lint:black"}, {"ref": "lint:pylint"}], "parallel": True},
+                    "test": ["pytest tests", "coverage report"],
+                }
+            }
+            for index in range(templates)
+        },
+        "discovery": {"exclude": ["build"], "gitignore": True},
+    }
+
+
+def main():
+    parser = argument_parser(__doc__, repeat=20)
+    parser.add_argument("--templates", type=int, default=500)
+    args = parser.parse_args()
+
+    raw_config = generate_config(args.templates)
+    timing = median_time(lambda: ProjectConfig.parse_obj(raw_config), args.repeat)
+    report(
+        f"{args.templates} templates (median of {args.repeat})",
+        [
+            ("total:", f"{timing * 1000:8.2f}ms"),
+            ("per template:", f"{timing / args.templates * 1_000_000:8.2f}us"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measure how much memory the scripts of a large monorepo take, once every target's scripts are resolved.
+
+    python benchmarks/bench_memory.py --targets 5000
+
+Every target inherits a template of 15 scripts, and declares a few scripts of its own, the same in
+every target - as targets copying their `pyproject.toml` from each other do.
+"""
+
+import copy
+import gc
+import pathlib
+import tracemalloc
+
+from _common import argument_parser, report
+from suit.config import ProjectConfig, SuitConfig
+from suit.targets import TargetConfig
+
+_TEMPLATE_SCRIPTS = {
+    **{f"lint:{tool}": {"cmd": f"{tool} {{local.path}}/src", "inputs": ["src/**/*.py"]} for tool in "abcdefghij"},
+    "lint": {"scripts": [{"ref": "lint:a"}, {"ref": "lint:b"}], "parallel": True},
+    "test": ["pytest {local.path}/tests", "coverage report"],
+    "build": {"cmd": "python -m build {local.path}", "inputs": ["src/**"], "outputs": ["dist/*"]},
+    "format": {"cmd": "black {local.path}", "warm": True},
+    "clean": "rm -rf {local.path}/dist",
+}
+_TARGET_SCRIPTS = {
+    "typing": {"cmd": "mypy {local.path}/src", "inputs": ["src/**/*.py"]},
+    "docs": "sphinx-build docs docs/_build",
+    "check": [{"ref": "typing"}, {"ref": "lint"}],
+}
+
+
+def load(targets: int) -> SuitConfig:
+    root = pathlib.Path("root")
+    project_config = ProjectConfig.parse_obj({"templates": {"package": {"scripts": _TEMPLATE_SCRIPTS}}})
+    return SuitConfig(
+        root,
+        project_config,
+        [
+            TargetConfig.from_mapping(
+                root / "packages" / f"package-{index}",
+                # Copied, as every `pyproject.toml` is parsed into tables of its own.
+                {"inherit": ["package"], "scripts": copy.deepcopy(_TARGET_SCRIPTS)},
+            )
+            for index in range(targets)
+        ],
+    )
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument("--targets", type=int, default=5000)
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    suit = load(args.targets)
+    loaded, _ = tracemalloc.get_traced_memory()
+    scripts = sum(len(defining) for defining in suit.scripts.by_name.values())
+    resolved, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    report(
+        f"{args.targets} targets, {scripts} scripts",
+        [
+            ("configurations:", f"{loaded / 2**20:8.2f}MiB ({loaded / args.targets:.0f}B per target)"),
+            ("resolved:", f"{(resolved - loaded) / 2**20:8.2f}MiB ({(resolved - loaded) / scripts:.0f}B per script)"),
+            ("total:", f"{resolved / 2**20:8.2f}MiB (peak {peak / 2**20:.2f}MiB)"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Measure how long running a script that prints a lot takes, in each output mode.
+
+    python benchmarks/bench_output.py --lines 20000
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+
+from _common import argument_parser, median_time, report
+from rich.console import Console
+from suit.cli.executor import CLIExecutor
+from suit.cli.output import OUTPUT_MODES
+from suit.config import ProjectConfig, SuitConfig
+from suit.targets import TargetConfig, TargetConfigData
+
+
+def time_mode(root: pathlib.Path, lines: int, mode: str, repeat: int) -> float:
+    command = f"{sys.executable} -c 'print(*range({lines}), sep=chr(10))'"
+    target = TargetConfig(root / "target", TargetConfigData(scripts={"noisy": command}))
+    suit = SuitConfig(root, ProjectConfig(), [target])
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+
+        def run():
+            # A terminal-like console, so rich renders as it would for a person watching the run.
+            console = Console(file=devnull, force_terminal=True, width=120)
+            CLIExecutor(is_dry_run=False, console=console, output_mode=mode).execute(suit.scripts.of(target)["noisy"])
+
+        return median_time(run, repeat)
+
+
+def main():
+    parser = argument_parser(__doc__, repeat=3)
+    parser.add_argument("--lines", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        timings = {
+            mode: time_mode(pathlib.Path(temporary_directory), args.lines, mode, args.repeat) for mode in OUTPUT_MODES
+        }
+    report(
+        f"A script printing {args.lines} lines (median of {args.repeat})",
+        [(f"--output {mode}", f"{timing * 1000:8.1f}ms") for mode, timing in timings.items()],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Measure how much the byte-level prefilter saves when discovering targets in a tree where only a few
+of the `pyproject.toml` files use suit.
+
+    python benchmarks/bench_prefilter.py --projects 2000 --suit-ratio 0.05
+"""
+
+import pathlib
+import tempfile
+from unittest import mock
+
+from _common import argument_parser, median_time, report
+from suit import discovery
+
+_NON_SUIT_PROJECT = """\
+[build-system]
+requires = ["setuptools>=61", "wheel"]
+build-backend = "setuptools.build_meta"
+
+[project]
+name = "package-{index}"
+version = "1.{index}.0"
+description = "A package that has nothing to do with the task runner"
+readme = "README.md"
+requires-python = ">=3.8"
+dependencies = [
+    "requests>=2.28",
+    "click>=8",
+    "rich>=12",
+    "attrs>=22.1",
+]
+
+[project.optional-dependencies]
+dev = ["pytest", "pytest-cov", "mypy", "black", "pylint"]
+
+[tool.black]
+line-length = 119
+target-version = ["py38", "py39", "py310"]
+
+[tool.pytest.ini_options]
+addopts = "-ra -q"
+testpaths = ["tests"]
+
+[tool.mypy]
+strict = true
+warn_unused_ignores = true
+"""
+
+_SUIT_PROJECT = _NON_SUIT_PROJECT + """
+[tool.suit.target]
+inherit = ["package"]
+
+[tool.suit.target.args]
+package_dir = "src/package_{index}"
+"""
+
+
+def generate_tree(root: pathlib.Path, projects: int, suit_ratio: float):
+    suit_every = max(1, round(1 / suit_ratio)) if suit_ratio else projects + 1
+    for index in range(projects):
+        project_dir = root / "packages" / f"group-{index % 50}" / f"package-{index}"
+        project_dir.mkdir(parents=True)
+        template = _SUIT_PROJECT if index % suit_every == 0 else _NON_SUIT_PROJECT
+        project_dir.joinpath("pyproject.toml").write_text(template.format(index=index))
+
+
+def time_discovery(root: pathlib.Path, repeat: int) -> float:
+    assert list(discovery.discover_targets(root, max_workers=1))
+    return median_time(lambda: list(discovery.discover_targets(root, max_workers=1)), repeat)
+
+
+def main():
+    parser = argument_parser(__doc__, repeat=5)
+    parser.add_argument("--projects", type=int, default=2000)
+    parser.add_argument("--suit-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        root = pathlib.Path(temporary_directory)
+        generate_tree(root, args.projects, args.suit_ratio)
+
+        with mock.patch.object(discovery, "_may_use_suit", lambda raw_project_data: True):
+            without_prefilter = time_discovery(root, args.repeat)
+        with_prefilter = time_discovery(root, args.repeat)
+
+    report(
+        f"{args.projects} projects, {args.suit_ratio:.0%} using suit (median of {args.repeat}, no cache)",
+        [
+            ("without prefilter:", f"{without_prefilter * 1000:8.1f}ms"),
+            ("with prefilter:", f"{with_prefilter * 1000:8.1f}ms ({without_prefilter / with_prefilter:.1f}x)"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
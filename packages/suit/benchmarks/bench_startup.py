@@ -0,0 +1,83 @@
+"""
+Measure how long common commands take to start, and fail when one exceeds its budget.
+
+Each command runs in a fresh interpreter, in a small generated monorepo, so the timings include
+importing suit and collecting the targets.
+
+    python benchmarks/bench_startup.py --repeat 10
+"""
+
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+from typing import List, Sequence, Tuple
+
+from _common import argument_parser, median_time, report
+
+# Budgets in milliseconds, for the median of the runs. They're generous enough for a slow CI machine,
+# but will catch a heavy import sneaking back into the startup path.
+_COMMANDS: List[Tuple[Sequence[str], float]] = [
+    (["--help"], 150),
+    (["targets", "list", "--raw"], 200),
+    (["scripts", "list", "--json"], 200),
+    (["run", "hello", "--dry-run"], 500),
+]
+
+_TARGET_PROJECT = """\
+[tool.suit.target.scripts]
+hello = "echo hello"
+"""
+
+
+def generate_tree(root: pathlib.Path, targets: int):
+    root.joinpath("suit.toml").write_text("[suit]\n")
+    for index in range(targets):
+        target_dir = root / "packages" / f"package-{index}"
+        target_dir.mkdir(parents=True)
+        target_dir.joinpath("pyproject.toml").write_text(_TARGET_PROJECT)
+
+
+def time_command(root: pathlib.Path, args: Sequence[str], repeat: int) -> float:
+    return median_time(
+        lambda: subprocess.run(
+            [sys.executable, "-m", "suit", *args],
+            cwd=root,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        ),
+        repeat,
+    )
+
+
+def main():
+    parser = argument_parser(__doc__, repeat=5)
+    parser.add_argument("--targets", type=int, default=20)
+    parser.add_argument("--budget-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    over_budget = []
+    rows = []
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        root = pathlib.Path(temporary_directory)
+        generate_tree(root, args.targets)
+        # The first run warms up the discovery cache, like any but the first run in a real monorepo.
+        time_command(root, ["targets", "list", "--raw"], 1)
+
+        for command, budget in _COMMANDS:
+            budget *= args.budget_scale
+            timing = time_command(root, command, args.repeat) * 1000
+            verdict = "ok" if timing <= budget else "OVER BUDGET"
+            rows.append((f"suit {' '.join(command)}", f"{timing:8.1f}ms / {budget:6.0f}ms  {verdict}"))
+            if timing > budget:
+                over_budget.append(command)
+
+    report(f"{args.targets} targets (median of {args.repeat})", rows)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Measure how suit scales with the size of the monorepo, on generated monorepos of several sizes.
+
+For every size, times collecting the configurations (with and without the discovery cache),
+resolving every target's scripts, `suit scripts list --json` and `suit run --dry-run`, and records
+the peak memory each of them allocated. Results are written as JSON along with the git revision they
+were measured at, and can be compared with the results of another revision:
+
+    python benchmarks/bench_suite.py --targets 100 1000 10000 --output before.json
+    python benchmarks/bench_suite.py --targets 100 1000 10000 --output after.json --compare before.json
+"""
+
+import contextlib
+import datetime
+import json
+import os
+import pathlib
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from _common import argument_parser, median_time
+from monorepo import MonorepoShape, generate_monorepo
+from suit.cli.cli import cli
+from suit.collector import SuitCollector
+from suit.discovery import CACHE_DIRECTORY
+from suit.scripts.resolver import resolve_scripts
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "HEAD"], check=True, stdout=subprocess.PIPE, encoding="utf-8"
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], stdout=subprocess.PIPE).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{revision}-dirty" if dirty else revision
+
+
+def _invoke(root: pathlib.Path, *args: str):
+    """Run the CLI in-process, from `root`, discarding its output."""
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+            cli.main(list(args), standalone_mode=False)
+    finally:
+        os.chdir(cwd)
+
+
+def _measure(function: Callable[[], None], repeat: int, setup: Callable[[], None] = lambda: None) -> Dict:
+    seconds = median_time(function, repeat, setup)
+    # Tracing allocations slows everything down, so the peak is measured on a run of its own.
+    setup()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": seconds, "peak_memory_bytes": peak}
+
+
+def run_benchmarks(root: pathlib.Path, repeat: int) -> Dict[str, Dict]:
+    cache_directory = root / CACHE_DIRECTORY
+
+    def clear_cache():
+        shutil.rmtree(cache_directory, ignore_errors=True)
+
+    def collect():
+        SuitCollector.find_root(root).collect()
+
+    suit = SuitCollector.find_root(root).collect()
+
+    def resolve():
+        for target in suit.targets.values():
+            resolve_scripts(suit, target)
+
+    collect()  # Warms the discovery cache up for the benchmarks relying on it.
+    return {
+        "collect (no cache)": _measure(collect, repeat, setup=clear_cache),
+        "collect": _measure(collect, repeat),
+        "resolve_scripts": _measure(resolve, repeat),
+        "scripts list --json": _measure(lambda: _invoke(root, "scripts", "list", "--json"), repeat),
+        "run --dry-run": _measure(
+            lambda: _invoke(root, "run", "all", "--dry-run", "--force", "--output", "plain", "--jobs", "1"), repeat
+        ),
+    }
+
+
+def _print_results(results: List[Dict], previous: Optional[List[Dict]]):
+    previous_by_key = {(result["targets"], result["benchmark"]): result for result in previous or []}
+    for result in results:
+        line = (
+            f"  {result['targets']:>6} targets  {result['benchmark']:<20} {result['seconds'] * 1000:10.1f}ms"
+            f"  {result['peak_memory_bytes'] / 2 ** 20:8.1f}MiB"
+        )
+        before = previous_by_key.get((result["targets"], result["benchmark"]))
+        if before is not None:
+            line += (
+                f"  (time x{result['seconds'] / before['seconds']:.2f},"
+                f" memory x{result['peak_memory_bytes'] / max(before['peak_memory_bytes'], 1):.2f})"
+            )
+        print(line)
+
+
+def main():
+    parser = argument_parser(__doc__, repeat=3)
+    parser.add_argument("--targets", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--templates", type=int, default=MonorepoShape.templates)
+    parser.add_argument("--inherit-depth", type=int, default=MonorepoShape.inherit_depth)
+    parser.add_argument("--noise-ratio", type=float, default=MonorepoShape.noise_ratio)
+    parser.add_argument("--output", type=pathlib.Path)
+    parser.add_argument("--compare", type=pathlib.Path)
+    args = parser.parse_args()
+
+    previous = json.loads(args.compare.read_text())["results"] if args.compare else None
+    results = []
+    for targets in args.targets:
+        shape = MonorepoShape(
+            targets=targets, templates=args.templates, inherit_depth=args.inherit_depth, noise_ratio=args.noise_ratio
+        )
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            root = pathlib.Path(temporary_directory)
+            generate_monorepo(root, shape)
+            for benchmark, measured in run_benchmarks(root, args.repeat).items():
+                results.append({"targets": targets, "benchmark": benchmark, **measured})
+        _print_results(results[-5:], previous)
+
+    if args.output:
+        report = {
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "measured_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "repeat": args.repeat,
+            "shape": {key: value for key, value in vars(shape).items() if key != "targets"},
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
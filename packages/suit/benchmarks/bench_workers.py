@@ -0,0 +1,57 @@
+"""
+Measure how long running a short Python tool takes, started cold and in a warm worker.
+
+    python benchmarks/bench_workers.py --command "python -m black --version" --repeat 20
+
+The command must run a Python entry point of this interpreter's environment: one of its console
+scripts, or `python -m <module>`.
+"""
+
+import os
+import pathlib
+import shlex
+import sys
+
+from _common import argument_parser, median_time, report
+from rich.console import Console
+from suit.cli.executor import CLIExecutor
+from suit.cli.workers import resolve_python_command, worker_pool
+from suit.config import ProjectConfig, SuitConfig
+from suit.scripts.specs import ShellScriptSpec
+from suit.targets import TargetConfig, TargetConfigData
+
+
+def time_runs(command: str, warm: bool, repeat: int) -> float:
+    root = pathlib.Path.cwd()
+    target = TargetConfig(root, TargetConfigData(scripts={"tool": ShellScriptSpec(command, warm=warm)}))
+    script = SuitConfig(root, ProjectConfig(), [target]).scripts.of(target)["tool"]
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        return median_time(
+            lambda: CLIExecutor(is_dry_run=False, console=Console(file=devnull), output_mode="plain").execute(script),
+            repeat,
+        )
+
+
+def main():
+    parser = argument_parser(__doc__, repeat=20)
+    parser.add_argument("--command", default=f"{sys.executable} -m black --version")
+    args = parser.parse_args()
+
+    command = resolve_python_command(shlex.split(args.command))
+    workers = worker_pool()
+    if command is None or workers is None:
+        parser.error("The command must run a Python entry point, on a platform with multiprocessing's forkserver")
+    # Started ahead, as a run does while planning - the first warm command doesn't wait for the imports.
+    workers.preload([command.preloaded] if command.preloaded is not None else [])
+    time_runs(args.command, warm=True, repeat=1)
+
+    cold = time_runs(args.command, warm=False, repeat=args.repeat)
+    warm = time_runs(args.command, warm=True, repeat=args.repeat)
+    report(
+        f"{args.command} (median of {args.repeat})",
+        [("cold:", f"{cold * 1000:8.2f}ms"), ("warm:", f"{warm * 1000:8.2f}ms ({cold / warm:.1f}x)")],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Generate synthetic monorepos for the benchmarks.
+
+A generated monorepo has targets spread over nested directories, templates they inherit in long
+chains, nested composite and ref scripts, chains of dependent targets, and plenty of `pyproject.toml`
+files that don't use suit (some of which still mention it).
+"""
+
+import json
+import pathlib
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class MonorepoShape:
+    targets: int = 1000
+    templates: int = 20
+    # How many templates every target inherits - later ones override and refer to earlier ones.
+    inherit_depth: int = 5
+    # Projects not using suit, per target.
+    noise_ratio: float = 1.0
+    # Every chain of this many targets depends on each other, one after the other.
+    dependency_chain: int = 10
+    groups: int = 50
+
+
+def _toml_value(value) -> str:
+    # JSON strings, arrays and numbers are valid TOML, and tables are written inline.
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{json.dumps(key)} = {_toml_value(item)}" for key, item in value.items()) + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(_toml_value(item) for item in value) + "]"
+    return json.dumps(value)
+
+
+def _template_scripts(index: int) -> dict:
+    return {
+        f"lint:t{index}": {"cmd": "pylint {local.path}/src/{args.package_dir}", "inputs": ["src/**/*.py"]},
+        "build": {"cmd": f"python -m build --template {index} {{local.path}}", "outputs": ["dist/*"]},
+        "test": "pytest {local.path}/tests -p no:cacheprovider",
+        "check": {
+            "scripts": [
+                {"ref": "build"},
+                {"scripts": [{"ref": f"lint:t{index}"}, {"ref": "test"}], "parallel": True},
+                "echo checked {args.package_dir}",
+            ]
+        },
+    }
+
+
+def _template_name(index: int) -> str:
+    return f"template-{index}"
+
+
+def _suit_toml(shape: MonorepoShape) -> str:
+    lines = ["[suit]", ""]
+    for index in range(shape.templates):
+        lines.append(f"[suit.templates.{_template_name(index)}.scripts]")
+        lines.extend(
+            f"{json.dumps(name)} = {_toml_value(script)}" for name, script in _template_scripts(index).items()
+        )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _target_directory(shape: MonorepoShape, index: int) -> str:
+    group = index % shape.groups
+    return f"packages/group-{group}/area-{index // shape.groups % 7}/package-{index}"
+
+
+def _target_pyproject(shape: MonorepoShape, index: int) -> str:
+    inherit = [_template_name((index + depth) % shape.templates) for depth in range(shape.inherit_depth)]
+    target = {
+        "inherit": inherit,
+        "args": {"package_dir": f"package_{index}"},
+        "scripts": {"all": [{"ref": "check"}, {"ref": "local"}], "local": "echo {args.package_dir}"},
+    }
+    if index % shape.dependency_chain:
+        target["depends_on"] = [_target_directory(shape, index - 1)]
+    return (
+        f'[project]\nname = "package-{index}"\nversion = "1.0.0"\n\n'
+        + "[tool.suit.target]\n"
+        + "".join(f"{key} = {_toml_value(value)}\n" for key, value in target.items())
+    )
+
+
+def _noise_pyproject(index: int) -> str:
+    # Every third noise project mentions suit, so it can't be ruled out without parsing it.
+    dependencies = ["requests>=2.28", "click>=8"] + (["python-suit"] if index % 3 == 0 else [])
+    return (
+        f'[project]\nname = "noise-{index}"\nversion = "0.{index}.0"\n'
+        f"dependencies = {_toml_value(dependencies)}\n\n"
+        "[tool.black]\nline-length = 119\n"
+    )
+
+
+def generate_monorepo(root: pathlib.Path, shape: MonorepoShape):
+    root.joinpath("suit.toml").write_text(_suit_toml(shape))
+    for index in range(shape.targets):
+        target_dir = root / _target_directory(shape, index)
+        target_dir.mkdir(parents=True)
+        target_dir.joinpath("pyproject.toml").write_text(_target_pyproject(shape, index))
+    for index in range(round(shape.targets * shape.noise_ratio)):
+        noise_dir = root / "third_party" / f"vendor-{index % shape.groups}" / f"noise-{index}"
+        noise_dir.mkdir(parents=True)
+        noise_dir.joinpath("pyproject.toml").write_text(_noise_pyproject(index))
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pathlib
+import subprocess
+from typing import Iterable, List, Optional, Set
+
+from .config import SuitConfig
+
+
+class AffectedTargetsError(Exception):
+    pass
+
+
+class TargetPathIndex:
+    """
+    Find the target owning a path - the target whose directory is the longest prefix of the path.
+
+    Paths and target names are relative to the root and `/` separated; a target at the root itself is
+    named `.`. A lookup costs one set lookup per directory level of the path.
+    """
+
+    def __init__(self, target_names: Iterable[str]):
+        self.__target_names = set(target_names)
+
+    def owner_of(self, path: str) -> Optional[str]:
+        parts = [part for part in path.split("/") if part and part != "."]
+        for length in range(len(parts), 0, -1):
+            candidate = "/".join(parts[:length])
+            if candidate in self.__target_names:
+                return candidate
+        return "." if "." in self.__target_names else None
+
+
+def _git(root: pathlib.Path, *args: str) -> List[str]:
+    try:
+        completed = subprocess.run(
+            ["git", *args],
+            cwd=root,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
+        )
+    except FileNotFoundError as error:
+        raise AffectedTargetsError("Finding affected targets requires git") from error
+    except subprocess.CalledProcessError as error:
+        raise AffectedTargetsError(f"`git {' '.join(args)}` failed: {error.stderr.strip()}") from error
+    return [line for line in completed.stdout.splitlines() if line]
+
+
+def changed_files(root: pathlib.Path, since: str) -> Set[str]:
+    """
+    The files under `root` (relative to it) that changed since `since` branched off the current commit.
+
+    That includes committed, uncommitted and untracked files - everything that differs from the
+    merge-base of `since` and `HEAD`. Renamed files count under both their old and new names.
+    """
+    (merge_base,) = _git(root, "merge-base", since, "HEAD")
+    changed = set(_git(root, "diff", "--name-only", "--no-renames", "--relative", merge_base, "--"))
+    changed.update(_git(root, "ls-files", "--others", "--exclude-standard"))
+    return changed
+
+
+def affected_targets(suit: SuitConfig, since: str, include_dependents: bool = True) -> Set[str]:
+    """
+    The names of the targets owning files that changed since `since`.
+
+    Unless `include_dependents` is off, the targets depending on those are affected as well.
+    """
+    index = TargetPathIndex(suit.targets)
+    owners = (index.owner_of(path) for path in changed_files(suit.root, since))
+    affected = {owner for owner in owners if owner is not None}
+    if include_dependents:
+        affected = suit.dependencies.with_dependents(affected)
+    return affected
@@ -0,0 +1,56 @@
+import click
+import click_default_group
+from suit.collector import SuitCollector
+from suit.daemon.client import DaemonUnavailable, request_daemon
+
+
+@click.group(
+    "daemon",
+    cls=click_default_group.DefaultGroup,
+    default="serve",
+    default_if_no_args=True,
+)
+def cli_daemon():
+    pass
+
+
+@cli_daemon.command("serve")
+@click.option("--poll", "should_poll", is_flag=True, type=bool)
+def cli_serve_daemon(should_poll: bool = False):
+    # pylint: disable=import-outside-toplevel
+    from suit.console import console
+    from suit.daemon.server import DaemonAlreadyRunning, SuitDaemon
+    from suit.warm import CONFIGURATION_FILE_NAMES
+    from suit.watcher import PollingWatcher
+
+    root = SuitCollector.find_root().root
+    daemon = SuitDaemon(
+        root, watcher=PollingWatcher(CONFIGURATION_FILE_NAMES) if should_poll else None, log=console.log
+    )
+    try:
+        daemon.serve()
+    except DaemonAlreadyRunning as error:
+        raise click.ClickException(str(error)) from error
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        raise click.ClickException(f"Can't serve at {daemon.socket_path}: {error}") from error
+
+
+@cli_daemon.command("stop")
+def cli_stop_daemon():
+    try:
+        request_daemon(SuitCollector.find_root().root, "stop")
+    except DaemonUnavailable as error:
+        raise click.ClickException(str(error)) from error
+
+
+@cli_daemon.command("status")
+def cli_daemon_status():
+    try:
+        status, _ = request_daemon(SuitCollector.find_root().root, "status")
+    except DaemonUnavailable as error:
+        raise click.ClickException(str(error)) from error
+    for key in ("pid", "root", "watcher", "targets", "error"):
+        if status.get(key) is not None:
+            click.echo(f"{key}: {status[key]}")
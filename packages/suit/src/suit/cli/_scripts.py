@@ -1,25 +1,35 @@
 from __future__ import annotations
 
+import fnmatch
 import json
-import re
+import os
+import pathlib
+import shlex
 import sys
-from typing import Iterable, List, Tuple, cast
+from typing import TYPE_CHECKING, Callable, Collection, Dict, FrozenSet, Iterable, List, Optional, Tuple, cast
 
 import click
 import click_default_group
-import rich.table
-from rich.console import Group
-from rich.padding import Padding
-from rich.table import Column, Table
-from rich.text import Text
 
+from ._selection import affected_since_option, collect_suit, select_affected, select_targets, target_pattern_option
+from .output import OUTPUT_MODES
+from .streaming import DEFAULT_TAIL_LINES
 
-# from suit.cli.executor import ExecutionPlanStage, ScriptFailedError, TargetScriptExecutor
-from suit.collector import SuitCollector
-from suit.console import console
-from suit.scripts.resolver import resolve_scripts
+_SLOWEST_SCRIPTS = 5
 
-from .executor import CLIExecutor, ScriptFailedError
+# Running scripts and rendering tables need rich, which takes a while to import. The commands import
+# what they need when they're invoked, so listing scripts as plain JSON or asking for help stays quick.
+if TYPE_CHECKING:
+    from suit.config import SuitConfig
+    from suit.results.shared import SharedResults
+    from suit.results.store import ResultStore
+    from suit.scripts.graph import ScriptGraph, ScriptNode
+    from suit.scripts.resolver import ScriptIndex
+    from suit.selection import TargetSelector
+    from suit.tracing import Tracer
+
+    from .jobserver import JobServer
+    from .scheduler import Job, JobContext, JobResult, ProcessGroup
 
 
 @click.group(
@@ -32,35 +42,49 @@ def cli_scripts():
     pass
 
 
-def __to_patterns(ctx: click.Context, param: click.Parameter, value: Tuple[str, ...]) -> _Patterns:
-    return _Patterns(value)
-
-
 @cli_scripts.command("list")
+@click.argument("script_patterns", nargs=-1)
 @click.option("--json", "should_print_json", type=bool, is_flag=True)
-@click.option(
-    "-t",
-    "--target-pattern",
-    "target_patterns",
-    type=str,
-    multiple=True,
-    callback=__to_patterns,
-)
-def cli_list_scripts(target_patterns: _Patterns, should_print_json: bool = False):
-    suit = SuitCollector.find_root().collect()
-    scripts = {}
+@click.option("--ndjson", "should_stream_ndjson", type=bool, is_flag=True)
+@target_pattern_option
+@affected_since_option
+def cli_list_scripts(
+    target_selector: TargetSelector,
+    script_patterns: Tuple[str, ...] = (),
+    should_print_json: bool = False,
+    should_stream_ndjson: bool = False,
+    affected_since: Optional[str] = None,
+    with_dependents: bool = True,
+):
+    if should_print_json and should_stream_ndjson:
+        raise click.UsageError("--json and --ndjson can't be used together")
+    suit = collect_suit()
+    selected_targets = select_targets(suit, target_selector, select_affected(suit, affected_since, with_dependents))
+    if should_stream_ndjson:
+        _stream_scripts(suit, selected_targets, script_patterns)
+        return
 
-    for target_name, target in suit.targets.items():
-        if not target_patterns.match(target_name):
-            continue
+    selected = set(selected_targets)
+    scripts = {}
 
-        for script_name in resolve_scripts(suit, target):
-            scripts.setdefault(script_name, []).append(target_name)
+    script_names = _expand_script_names(suit.scripts, script_patterns) if script_patterns else suit.scripts.by_name
+    for script_name in script_names:
+        script_targets = suit.scripts.targets_of(script_name)
+        matching_targets = [target_name for target_name, _ in script_targets if target_name in selected]
+        if matching_targets:
+            scripts[script_name] = matching_targets
 
     if should_print_json:
         print(json.dumps(scripts, indent=2))
         return
 
+    # pylint: disable=import-outside-toplevel
+    import rich.table
+    from rich.console import Group
+    from rich.padding import Padding
+    from rich.table import Column, Table
+    from suit.console import console
+
     table = Table(
         Column("Scripts", style="magenta"),
         Column("Targets", style="italic"),
@@ -73,45 +97,272 @@ def cli_list_scripts(target_patterns: _Patterns, should_print_json: bool = False
     console.print(table)
 
 
+def _stream_scripts(suit: SuitConfig, target_names: Iterable[str], script_patterns: Tuple[str, ...]):
+    """
+    Print a JSON object per script of every target, matching any of `script_patterns` if given.
+
+    As with `ScriptIndex.find`, a pattern naming one of the target's scripts exactly matches only it.
+
+    Targets are resolved one at a time, and their scripts printed right away, rather than resolving
+    every target first. Shell scripts come with their rendered command, or the error rendering it.
+    """
+    # pylint: disable=import-outside-toplevel
+    from suit.scripts.commands import CommandTemplateError, render_command
+    from suit.scripts.resolver import resolve_scripts
+    from suit.scripts.types import CompositeScript, RefScript, ShellScript
+
+    kinds = {ShellScript: "shell", RefScript: "ref", CompositeScript: "composite"}
+    try:
+        for target_name in target_names:
+            records = []
+            scripts = resolve_scripts(suit, suit.targets[target_name])
+            for script_name, script in scripts.items():
+                if script_patterns and not any(
+                    script_name == pattern if pattern in scripts else fnmatch.fnmatchcase(script_name, pattern)
+                    for pattern in script_patterns
+                ):
+                    continue
+                record = {"target": target_name, "script": script_name, "kind": kinds[type(script)]}
+                if isinstance(script, ShellScript):
+                    try:
+                        record["command"] = render_command(script)
+                    except CommandTemplateError as error:
+                        record["command"] = None
+                        record["error"] = str(error)
+                records.append(json.dumps(record) + "\n")
+            sys.stdout.writelines(records)
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader had enough, as `head` does. Further writes (and the flush at exit) would fail too.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
 @cli_scripts.command("run")
 @click.argument(
     "scripts",
     nargs=-1,
 )
-@click.option(
-    "-t",
-    "--target-pattern",
-    "target_patterns",
-    type=str,
-    multiple=True,
-    callback=__to_patterns,
-)
+@target_pattern_option
 @click.option("--dry-run", "is_dry_run", is_flag=True, type=bool)
-def cli_run_scripts(scripts: Tuple[str, ...], target_patterns: _Patterns, is_dry_run: bool = False):
+@click.option("-j", "--jobs", "jobs", type=click.IntRange(min=1), default=None)
+@click.option("-k", "--keep-going", "keep_going", is_flag=True, type=bool)
+@click.option("--jobserver", "should_serve_jobs", is_flag=True, type=bool)
+@click.option("--tail-lines", "tail_lines", type=click.IntRange(min=0), default=DEFAULT_TAIL_LINES)
+@click.option("--force", "is_forced", is_flag=True, type=bool)
+@click.option("--output", "output_mode", type=click.Choice(OUTPUT_MODES), default="rich")
+@click.option("--trace", "trace_path", type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path))
+@affected_since_option
+def cli_run_scripts(
+    scripts: Tuple[str, ...],
+    target_selector: TargetSelector,
+    is_dry_run: bool = False,
+    jobs: Optional[int] = None,
+    keep_going: bool = False,
+    should_serve_jobs: bool = False,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+    is_forced: bool = False,
+    output_mode: str = "rich",
+    trace_path: Optional[pathlib.Path] = None,
+    affected_since: Optional[str] = None,
+    with_dependents: bool = True,
+):
+    # pylint: disable=import-outside-toplevel
+    from suit.console import console
+    from suit.dependencies import TargetCycleError, UnknownTargetError
+    from suit.discovery import CACHE_DIRECTORY
+    from suit.results.shared import shared_results_of
+    from suit.results.store import LocalResultStore
+    from suit.scripts.commands import CommandTemplateError
+    from suit.scripts.graph import ScriptCycleError, ScriptGraph, UnknownScriptError
+    from suit.tracing import Tracer
+
+    from .executor import ScriptFailedError
+    from .output import create_output
+    from .scheduler import JobStatus, critical_path
+
     if not scripts:
         raise click.UsageError("Must provide scripts to run!")
-    suit = SuitCollector.find_root().collect()
+    # Tracing is cheap, and the slowest scripts are summarized from the trace even if it's not saved.
+    tracer = Tracer()
+    suit = collect_suit(tracer)
+    with tracer.span("select targets", "resolution"):
+        selected = set(select_targets(suit, target_selector, select_affected(suit, affected_since, with_dependents)))
+
+    graph = ScriptGraph()
+    try:
+        with tracer.span("resolve scripts", "resolution"):
+            _plan_scripts(suit, graph, scripts, selected)
+    except (ScriptCycleError, UnknownScriptError, CommandTemplateError, TargetCycleError, UnknownTargetError) as error:
+        raise click.ClickException(str(error)) from error
+
+    results_store = None if is_forced else LocalResultStore(suit.root / CACHE_DIRECTORY / "results")
+    cache_config = suit.project_config.cache
+    shared_results = None if is_forced else shared_results_of(cache_config.url, suit.root, cache_config.upload)
+    planned_jobs = _jobs_of(graph, is_dry_run, tail_lines, results_store, output_mode, tracer, shared_results)
+    results = _run_jobs(suit, planned_jobs, jobs, keep_going, should_serve_jobs)
+    if shared_results is not None:
+        shared_results.close()
+        if shared_results.error is not None:
+            click.echo(f"Warning: the shared cache was left alone, it failed with: {shared_results.error}", err=True)
+    output = create_output(output_mode, console)
+    if len(planned_jobs) > 1 and not is_dry_run:
+        output.critical_path(critical_path(results))
+        output.slowest_scripts(tracer.slowest("script", _SLOWEST_SCRIPTS))
+    if trace_path is not None:
+        tracer.save(trace_path)
+
+    failures = [result for result in results if result.status is JobStatus.FAILED]
+    if not failures:
+        return
+
+    for failure in failures:
+        error = failure.error
+        if not isinstance(error, ScriptFailedError):
+            raise error
+        # Other scripts' output may have buried the failure, so repeat its last lines.
+        tail = error.tail if len(planned_jobs) > 1 else []
+        output.failure_summary(error.target_name, error.script_name, error.return_code, tail)
+    sys.exit(cast(ScriptFailedError, failures[0].error).return_code)
+
+
+def _run_jobs(
+    suit: SuitConfig,
+    planned_jobs: List[Job],
+    jobs: Optional[int],
+    keep_going: bool = False,
+    should_serve_jobs: bool = False,
+    processes: Optional[ProcessGroup] = None,
+) -> List[JobResult]:
+    """Run the jobs planned for the scripts of `suit`, within its resource budgets and the jobserver."""
+    # pylint: disable=import-outside-toplevel
+    from .scheduler import Scheduler
+
+    jobserver = _jobserver_of(jobs, should_serve_jobs)
+    try:
+        scheduler = Scheduler(
+            jobs=jobs, keep_going=keep_going, budget=suit.project_config.resources, jobserver=jobserver
+        )
+        return scheduler.run(planned_jobs, processes)
+    finally:
+        if jobserver is not None:
+            jobserver.close()
 
-    for script_name in scripts:
-        for target_name, target in suit.targets.items():
-            if not target_patterns.match(target_name):
+
+def _jobserver_of(jobs: Optional[int], should_serve: bool) -> Optional[JobServer]:
+    """The GNU make jobserver the run joins - the one it was started under, or else its own if asked to serve one."""
+    # pylint: disable=import-outside-toplevel
+    from .jobserver import JobServer
+    from .scheduler import default_jobs
+
+    joined = JobServer.join(os.environ)
+    if joined is not None or not should_serve:
+        return joined
+    if os.name != "posix":
+        raise click.UsageError("--jobserver is only supported on POSIX platforms")
+    return JobServer.serve(jobs or default_jobs())
+
+
+def _plan_scripts(
+    suit: SuitConfig,
+    graph: ScriptGraph,
+    scripts: Iterable[str],
+    selected: Collection[str],
+):
+    """Add the requested scripts of the `selected` targets to `graph`."""
+    dependencies = suit.dependencies
+    completion_of_target: Dict[str, FrozenSet[str]] = {}
+    for script_name in _expand_script_names(suit.scripts, scripts):
+        script_of_target = dict(suit.scripts.targets_of(script_name))
+        completion_of_script: Dict[str, FrozenSet[str]] = {}
+        for target_name in dependencies.order:
+            target_script = script_of_target.get(target_name)
+            if target_script is None or target_name not in selected:
                 continue
-            for target_script_name, target_script in resolve_scripts(suit, target).items():
-                if script_name != target_script_name:
-                    continue
+            # Scripts of the same target run in the order they were requested, and after the same
+            # script finished in the targets it depends on.
+            after = completion_of_target.get(target_name, frozenset()).union(
+                *(
+                    completion_of_script.get(dependency_name, frozenset())
+                    for dependency_name in dependencies.all_dependencies_of(target_name)
+                )
+            )
+            completion_of_script[target_name] = completion_of_target[target_name] = graph.add(
+                target_script, after=after
+            )
+
+
+def _expand_script_names(index: ScriptIndex, requested: Iterable[str]) -> List[str]:
+    """The script names to run, in the requested order, expanding glob patterns such as `lint:*`."""
+    return list(dict.fromkeys(name for pattern in requested for name in index.find(pattern)))
+
+
+def _jobs_of(
+    graph: ScriptGraph,
+    is_dry_run: bool,
+    tail_lines: int,
+    results_store: Optional[ResultStore],
+    output_mode: str,
+    tracer: Tracer,
+    shared_results: Optional[SharedResults] = None,
+) -> List[Job]:
+    from .scheduler import Job  # pylint: disable=import-outside-toplevel
+
+    if not is_dry_run:
+        _preload_workers(graph)
+    return [
+        Job(
+            name=node.key,
+            run=_script_runner(node, is_dry_run, tail_lines, results_store, output_mode, tracer, shared_results),
+            deps=node.deps,
+            resources=node.script.specs.resources,
+        )
+        for node in graph.nodes.values()
+    ]
+
+
+def _preload_workers(graph: ScriptGraph):
+    """Start the workers of the warm scripts early, importing the modules they run while others run."""
+    # pylint: disable=import-outside-toplevel
+    from suit.scripts.commands import render_command
+    from suit.scripts.types import ShellScript
+
+    from .workers import resolve_python_command, worker_pool
+
+    commands = (
+        resolve_python_command(shlex.split(render_command(node.script)))
+        for node in graph.nodes.values()
+        if isinstance(node.script, ShellScript) and node.script.specs.warm
+    )
+    modules = {command.preloaded for command in commands if command is not None and command.preloaded is not None}
+    workers = worker_pool() if modules else None
+    if workers is not None:
+        workers.preload(modules)
 
-                executor = CLIExecutor(is_dry_run=is_dry_run)
-                try:
-                    executor.execute(target_script)
-                except ScriptFailedError as script_failure:
-                    sys.exit(script_failure.return_code)
 
+def _script_runner(
+    node: ScriptNode,
+    is_dry_run: bool,
+    tail_lines: int,
+    results_store: Optional[ResultStore],
+    output_mode: str,
+    tracer: Tracer,
+    shared_results: Optional[SharedResults],
+) -> Callable[[JobContext], None]:
+    from .executor import CLIExecutor  # pylint: disable=import-outside-toplevel
 
-class _Patterns:
-    def __init__(self, patterns: Iterable[str]):
-        self.__patterns = [re.compile(pattern) for pattern in patterns]
+    def run(context: JobContext):
+        executor = CLIExecutor(
+            is_dry_run=is_dry_run,
+            console=context.console,
+            processes=context.processes,
+            tail_lines=tail_lines,
+            results=results_store,
+            output_mode=output_mode,
+            tracer=tracer,
+            parents=node.parents,
+            shared_results=shared_results,
+            inherited_fds=context.inherited_fds,
+        )
+        executor.execute(node.script)
 
-    def match(self, name: str) -> bool:
-        if not self.__patterns:
-            return True
-        return any(pattern.search(name) for pattern in self.__patterns)
+    return run
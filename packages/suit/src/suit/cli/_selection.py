@@ -0,0 +1,70 @@
+from typing import Callable, List, Optional, Set, Tuple, TypeVar
+
+import click
+from suit.affected import AffectedTargetsError, affected_targets
+from suit.collector import SuitCollector
+from suit.config import SuitConfig
+from suit.dependencies import TargetCycleError, UnknownTargetError
+from suit.schema import ConfigError
+from suit.selection import TargetPatternError, TargetSelector
+from suit.tracing import Tracer
+
+_F = TypeVar("_F", bound=Callable)
+
+
+def collect_suit(tracer: Optional[Tracer] = None) -> SuitConfig:
+    """The configurations of the root this command runs under, reporting invalid ones as a command error."""
+    try:
+        return SuitCollector.find_root().collect(tracer)
+    except ConfigError as error:
+        raise click.ClickException(str(error)) from error
+
+
+def affected_since_option(function: _F) -> _F:
+    function = click.option("--dependents/--no-dependents", "with_dependents", default=True)(function)
+    return click.option("--affected-since", "affected_since", type=str, default=None, metavar="REV")(function)
+
+
+def _to_selector(ctx: click.Context, param: click.Parameter, value: Tuple[str, ...]) -> TargetSelector:
+    try:
+        return TargetSelector(value)
+    except TargetPatternError as error:
+        raise click.BadParameter(str(error), ctx, param) from error
+
+
+def target_pattern_option(function: _F) -> _F:
+    return click.option("-t", "--target-pattern", "target_selector", type=str, multiple=True, callback=_to_selector)(
+        function
+    )
+
+
+def select_targets(suit: SuitConfig, target_selector: TargetSelector, affected: Optional[Set[str]]) -> List[str]:
+    """
+    The targets a command works on - the selected ones, narrowed down to the `affected` ones if given.
+
+    A pattern selecting no target is a usage error, as it's likely a mistake - such as a target's
+    name rather than its path.
+    """
+    unmatched = target_selector.unmatched(suit.targets)
+    if unmatched:
+        pattern = unmatched[0]
+        message = f"No target matches the pattern '{pattern}' - patterns match the targets' paths from the root"
+        named = [target_name for target_name in suit.targets if target_name.rsplit("/", 1)[-1] == pattern]
+        raise click.UsageError(f"{message}, such as '{named[0]}'" if named else message)
+    return [
+        target_name
+        for target_name in target_selector.select(suit.targets)
+        if affected is None or target_name in affected
+    ]
+
+
+def select_affected(
+    suit: SuitConfig, affected_since: Optional[str], with_dependents: bool = True
+) -> Optional[Set[str]]:
+    """The targets affected by changes since `affected_since`, or `None` when every target is selected."""
+    if affected_since is None:
+        return None
+    try:
+        return affected_targets(suit, affected_since, include_dependents=with_dependents)
+    except (AffectedTargetsError, TargetCycleError, UnknownTargetError) as error:
+        raise click.ClickException(str(error)) from error
@@ -1,9 +1,10 @@
+from typing import Optional
+
 import click
 import click_default_group
-import rich.table
-from rich.table import Column, Table
-from suit.collector import SuitCollector
-from suit.console import console
+from suit.selection import TargetSelector
+
+from ._selection import affected_since_option, collect_suit, select_affected, select_targets, target_pattern_option
 
 
 @click.group(
@@ -18,19 +19,32 @@ def cli_targets():
 
 @cli_targets.command("list")
 @click.option("--raw", "raw_print", is_flag=True, type=bool)
-def cli_list_targets(raw_print: bool):
-    suit = SuitCollector.find_root().collect()
+@target_pattern_option
+@affected_since_option
+def cli_list_targets(
+    raw_print: bool,
+    target_selector: TargetSelector,
+    affected_since: Optional[str] = None,
+    with_dependents: bool = True,
+):
+    suit = collect_suit()
+    target_names = select_targets(suit, target_selector, select_affected(suit, affected_since, with_dependents))
 
     if raw_print:
-        for target_name in suit.targets:
-            console.print(target_name)
+        for target_name in target_names:
+            click.echo(target_name)
         return
 
+    # Rendering tables is the only thing rich is needed for here, and importing it is costly.
+    import rich.table  # pylint: disable=import-outside-toplevel
+    from rich.table import Column, Table  # pylint: disable=import-outside-toplevel
+    from suit.console import console  # pylint: disable=import-outside-toplevel
+
     table = Table(
         Column("Target", style="magenta"),
         show_edge=True,
         box=rich.table.box.SIMPLE,
     )
-    for target_name in suit.targets:
+    for target_name in target_names:
         table.add_row(target_name)
     console.print(table)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Set, Tuple
+
+import click
+from suit.collector import SuitCollector
+
+from ._scripts import _expand_script_names, _jobs_of, _plan_scripts, _run_jobs
+from ._selection import select_targets, target_pattern_option
+from .output import OUTPUT_MODES
+from .streaming import DEFAULT_TAIL_LINES
+from .watch import DEFAULT_DEBOUNCE_SECONDS, RunTargets
+
+if TYPE_CHECKING:
+    from suit.config import SuitConfig
+    from suit.selection import TargetSelector
+
+    from .scheduler import ProcessGroup
+
+
+def _log(message: str):
+    # Messages go to stderr, keeping stdout for the scripts' output (which may be ndjson).
+    click.echo(message, err=True)
+
+
+@click.command("watch")
+@click.argument("scripts", nargs=-1)
+@target_pattern_option
+@click.option("--debounce", "debounce_ms", type=click.IntRange(min=0), default=int(DEFAULT_DEBOUNCE_SECONDS * 1000))
+@click.option("-j", "--jobs", "jobs", type=click.IntRange(min=1), default=None)
+@click.option("--tail-lines", "tail_lines", type=click.IntRange(min=0), default=DEFAULT_TAIL_LINES)
+@click.option("--force", "is_forced", is_flag=True, type=bool)
+@click.option("--output", "output_mode", type=click.Choice(OUTPUT_MODES), default="rich")
+@click.option("--dependents/--no-dependents", "with_dependents", default=False)
+@click.option("--poll", "should_poll", is_flag=True, type=bool)
+def cli_watch(
+    scripts: Tuple[str, ...],
+    target_selector: TargetSelector,
+    debounce_ms: int = int(DEFAULT_DEBOUNCE_SECONDS * 1000),
+    jobs: Optional[int] = None,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+    is_forced: bool = False,
+    output_mode: str = "rich",
+    with_dependents: bool = False,
+    should_poll: bool = False,
+):
+    # pylint: disable=import-outside-toplevel
+    from suit.warm import WarmSuit
+    from suit.watcher import PollingWatcher, create_watcher
+
+    from .watch import ScriptWatch
+
+    if not scripts:
+        raise click.UsageError("Must provide scripts to watch!")
+    root = SuitCollector.find_root().root
+    watcher = PollingWatcher() if should_poll else create_watcher()
+    run_targets = _watch_runner(scripts, target_selector, jobs, tail_lines, is_forced, output_mode, with_dependents)
+    warm = WarmSuit(root)
+    watch = ScriptWatch(warm, watcher, run_targets, debounce=debounce_ms / 1000, log=_log)
+    try:
+        suit = watch.start()
+        if suit is None:
+            raise click.ClickException(f"The configurations are invalid, fix them and try again: {warm.error}")
+        if not _expand_script_names(suit.scripts, scripts):
+            raise click.UsageError(f"No target defines any of the scripts: {', '.join(scripts)}")
+        select_targets(suit, target_selector, None)
+        _log(f"Watching {len(suit.targets)} targets for changes, with {watcher.name}...")
+        while True:
+            watch.poll(timeout=1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watch.stop()
+        watcher.close()
+
+
+def _watch_runner(
+    scripts: Tuple[str, ...],
+    target_selector: TargetSelector,
+    jobs: Optional[int],
+    tail_lines: int,
+    is_forced: bool,
+    output_mode: str,
+    with_dependents: bool,
+) -> RunTargets:
+    # pylint: disable=import-outside-toplevel
+    from suit.console import console
+    from suit.dependencies import TargetCycleError, UnknownTargetError
+    from suit.discovery import CACHE_DIRECTORY
+    from suit.results.store import LocalResultStore
+    from suit.scripts.commands import CommandTemplateError
+    from suit.scripts.graph import ScriptCycleError, ScriptGraph, UnknownScriptError
+    from suit.tracing import Tracer
+
+    from .executor import ScriptFailedError
+    from .output import create_output
+    from .scheduler import JobStatus
+
+    def run(suit: SuitConfig, targets: Set[str], processes: ProcessGroup):
+        graph = ScriptGraph()
+        try:
+            if with_dependents:
+                targets = suit.dependencies.with_dependents(targets)
+            _plan_scripts(suit, graph, scripts, set(select_targets(suit, target_selector, targets)))
+        except (
+            click.UsageError,
+            ScriptCycleError,
+            UnknownScriptError,
+            CommandTemplateError,
+            TargetCycleError,
+            UnknownTargetError,
+        ) as error:
+            _log(f"Error: {error}")
+            return
+        if not graph.nodes:
+            return
+
+        _log(f"Changes in {', '.join(sorted(targets))}, running {len(graph.nodes)} scripts...")
+        results_store = None if is_forced else LocalResultStore(suit.root / CACHE_DIRECTORY / "results")
+        planned_jobs = _jobs_of(graph, False, tail_lines, results_store, output_mode, Tracer(enabled=False))
+        results = _run_jobs(suit, planned_jobs, jobs, processes=processes)
+        if processes.cancelled:
+            return
+
+        output = create_output(output_mode, console)
+        for result in results:
+            if result.status is not JobStatus.FAILED:
+                continue
+            error = result.error
+            if isinstance(error, ScriptFailedError):
+                tail = error.tail if len(planned_jobs) > 1 else []
+                output.failure_summary(error.target_name, error.script_name, error.return_code, tail)
+            else:
+                _log(f"Error: {error}")
+        _log("Waiting for changes...")
+
+    return run
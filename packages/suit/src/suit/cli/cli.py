@@ -1,16 +1,51 @@
+import importlib
+from typing import List, Mapping, Optional
+
 import click
 
-from . import _targets, _scripts
 
+class LazyGroup(click.Group):
+    """
+    A group whose subcommands are imported only once they're invoked.
+
+    `lazy_commands` maps each command name to the `module:attribute` it's defined by. Listing the
+    commands, as `--help` does, imports none of them.
+    """
+
+    def __init__(self, *args, lazy_commands: Optional[Mapping[str, str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*super().list_commands(ctx), *self.__lazy_commands})
 
-@click.group("suit")
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name not in self.commands and cmd_name in self.__lazy_commands:
+            module_name, attribute = self.__lazy_commands[cmd_name].split(":")
+            self.add_command(getattr(importlib.import_module(module_name), attribute), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter):
+        commands = self.list_commands(ctx)
+        if commands:
+            with formatter.section("Commands"):
+                formatter.write_dl([(command, "") for command in commands])
+
+
+@click.group(
+    "suit",
+    cls=LazyGroup,
+    lazy_commands={
+        "targets": "suit.cli._targets:cli_targets",
+        "scripts": "suit.cli._scripts:cli_scripts",
+        "run": "suit.cli._scripts:cli_run_scripts",
+        "daemon": "suit.cli._daemon:cli_daemon",
+        "watch": "suit.cli._watch:cli_watch",
+    },
+)
 def cli():
     pass
 
 
-cli.add_command(_targets.cli_targets)
-cli.add_command(_scripts.cli_scripts)
-cli.add_command(_scripts.cli_run_scripts)
-
 if __name__ == "__main__":
     cli()
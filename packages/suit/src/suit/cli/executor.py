@@ -1,78 +1,212 @@
+import contextlib
+import itertools
+import json
+import os
 import shlex
+import sys
+import time
+from collections import deque
 from subprocess import PIPE, Popen
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
-import rich.table
-from box import Box
-from rich.padding import Padding
-from rich.table import Column, Table
-from rich.text import Text
-from suit.console import console
-from suit.scripts.resolver import resolve_script, resolve_scripts
+from rich.console import Console
+from suit.console import console as main_console
+from suit.results.fingerprint import fingerprint, hash_files
+from suit.results.shared import SharedResults
+from suit.results.store import ResultStore, ScriptResult
+from suit.scripts.commands import render_command
 from suit.scripts.types import CompositeScript, RefScript, ScriptExecutor, ShellScript
+from suit.tracing import Tracer
+
+from .output import create_output
+from .scheduler import ProcessGroup
+from .streaming import DEFAULT_TAIL_LINES, OutputLine, stream_process_output_batches
+from .workers import WarmProcess, resolve_python_command, worker_pool
 
 
 class CLIExecutor(ScriptExecutor):
-    def __init__(self, is_dry_run: bool):
+    def __init__(
+        self,
+        is_dry_run: bool,
+        console: Optional[Console] = None,
+        processes: Optional[ProcessGroup] = None,
+        tail_lines: int = DEFAULT_TAIL_LINES,
+        results: Optional[ResultStore] = None,
+        output_mode: str = "rich",
+        tracer: Optional[Tracer] = None,
+        parents: Sequence[str] = (),
+        shared_results: Optional[SharedResults] = None,
+        inherited_fds: Sequence[int] = (),
+    ):
         self.__is_dry_run = is_dry_run
+        self.__inherited_fds = tuple(inherited_fds)
+        self.__shared_results = shared_results
+        self.__tracer = tracer or Tracer(enabled=False)
+        self.__parents: List[str] = list(parents)
+        self.__results = results
+        self.__tail_lines = tail_lines
+        self.__output = create_output(output_mode, console or main_console)
+        self.__processes = processes or ProcessGroup()
 
     def handle_shell_script(self, shell_script: ShellScript):
         target_name = str(shell_script.target.path.relative_to(shell_script.suit.root))
-        console.log(
-            Text.assemble(
-                "Will run '", Text.assemble(target_name, ":", shell_script.name, style="yellow italic"), "'..."
-            )
-        )
+        with self.__tracer.span(f"{target_name}:{shell_script.name}", "script", parents=self.__parents) as span:
+            span.args["status"] = self.__run_shell_script(shell_script, target_name, span.args)
+
+    def __run_shell_script(self, shell_script: ShellScript, target_name: str, trace_args: Dict[str, Any]) -> str:
+        with self.__tracer.span("render command", "render"):
+            full_command = render_command(shell_script)
+        is_cached = self.__results is not None or self.__shared_results is not None
+        result_key = fingerprint(shell_script, full_command) if is_cached else None
+        if result_key is not None and self.__is_up_to_date(shell_script, result_key):
+            self.__output.script_skipped(target_name, shell_script.name)
+            return "skipped"
+        if result_key is not None and not self.__is_dry_run and self.__restore(shell_script, target_name, result_key):
+            return "restored"
+
+        self.__output.script_started(target_name, shell_script.name)
         if self.__is_dry_run:
-            return
+            return "dry-run"
 
-        full_command = shell_script.specs.cmd.format(
-            root=Box(path=shell_script.suit.root),
-            local=Box(path=shell_script.target.path),
-            args=Box(shell_script.target.data.args),
-        )
-        process = Popen(shlex.split(full_command), encoding="utf-8", stdout=PIPE, stderr=PIPE)
-        return_code = process.wait()
-        for out_line in process.stdout:
-            t = Table(
-                Column(style="bold"),
-                box=rich.table.box.HEAVY_EDGE,
-                show_header=False,
-                show_edge=False,
-                border_style="bold",
-            )
-            t.add_row(Padding("OUT", (0, 0, 0, 4)), out_line.rstrip("\n"))
-            console.log(t)
-
-        for err_line in process.stderr:
-            t = Table(
-                Column(style="red bold"),
-                box=rich.table.box.HEAVY_EDGE,
-                show_header=False,
-                show_edge=False,
-                border_style="red bold",
-            )
-            t.add_row(Padding("ERR", (0, 0, 0, 4)), err_line.rstrip("\n"))
-            console.log(t)
+        tail: Deque[OutputLine] = deque(maxlen=self.__tail_lines)
+        # The whole log is kept only when it's shared, the tail is enough otherwise.
+        log: Optional[List[OutputLine]] = [] if result_key is not None and self.__shared_results is not None else None
+
+        def on_lines(lines: List[OutputLine]):
+            tail.extend(lines)
+            if log is not None:
+                log.extend(lines)
+            self.__output.script_output(target_name, shell_script.name, lines)
+
+        process = _spawn(shell_script, shlex.split(full_command), self.__inherited_fds)
+        self.__processes.register(process)
+        try:
+            with process:
+                stream_process_output_batches(process, on_lines)
+                return_code, usage = _wait(process)
+        finally:
+            self.__processes.unregister(process)
+        trace_args.update(usage, exit_code=return_code)
 
         if return_code != 0:
-            console.log(f"[red]Target script exited with return-code [bold]{return_code}[/][/]")
-            raise ScriptFailedError(target_name, shell_script.name, return_code)
+            self.__output.script_failed(target_name, shell_script.name, return_code)
+            raise ScriptFailedError(target_name, shell_script.name, return_code, list(tail))
+
+        if result_key is not None:
+            outputs = hash_files(shell_script.target.path, shell_script.specs.outputs)
+            if self.__results is not None:
+                self.__results.put(result_key, ScriptResult(outputs, time.time()))
+            if self.__shared_results is not None and log is not None:
+                with self.__tracer.span("upload to shared cache", "cache"):
+                    self.__shared_results.record(result_key, shell_script.target.path, outputs, _encode_log(log))
+        return "succeeded"
+
+    def __is_up_to_date(self, shell_script: ShellScript, result_key: str) -> bool:
+        if self.__results is None:
+            return False
+        result = self.__results.get(result_key)
+        # Outputs removed or modified since the run need it to run again.
+        return (
+            result is not None and hash_files(shell_script.target.path, shell_script.specs.outputs) == result.outputs
+        )
+
+    def __restore(self, shell_script: ShellScript, target_name: str, result_key: str) -> bool:
+        """Restore the outputs of a run elsewhere from the shared cache, and replay its logs."""
+        if self.__shared_results is None:
+            return False
+        with self.__tracer.span("restore from shared cache", "cache") as span:
+            log = self.__shared_results.restore(result_key, shell_script.target.path)
+            span.args["hit"] = log is not None
+        if log is None:
+            return False
+
+        self.__output.script_restored(target_name, shell_script.name)
+        for _, lines in itertools.groupby(_decode_log(log), key=lambda line: line.stream):
+            self.__output.script_output(target_name, shell_script.name, list(lines))
+        if self.__results is not None:
+            outputs = hash_files(shell_script.target.path, shell_script.specs.outputs)
+            self.__results.put(result_key, ScriptResult(outputs, time.time()))
+        return True
 
     def handle_ref_script(self, ref_script: RefScript):
-        scripts = resolve_scripts(ref_script.suit, ref_script.target)
-        self.execute(scripts[ref_script.specs.ref])
+        scripts = ref_script.suit.scripts.of(ref_script.target)
+        with self.__nested_in(ref_script):
+            self.execute(scripts[ref_script.specs.ref])
 
     def handle_composite_script(self, composite_script: CompositeScript):
-        for index, raw_script in enumerate(composite_script.specs.scripts):
-            script = resolve_script(
-                composite_script.suit, composite_script.target, f"{composite_script.name}[{index}]", raw_script
-            )
-            self.execute(script)
+        with self.__nested_in(composite_script):
+            for script in composite_script.suit.scripts.steps_of(composite_script):
+                self.execute(script)
+
+    @contextlib.contextmanager
+    def __nested_in(self, script: Union[RefScript, CompositeScript]) -> Iterator[None]:
+        self.__parents.append(f"{script.target.path.relative_to(script.suit.root)}:{script.name}")
+        try:
+            yield
+        finally:
+            self.__parents.pop()
+
+
+def _encode_log(lines: Sequence[OutputLine]) -> bytes:
+    return json.dumps([[line.stream, line.text] for line in lines]).encode("utf-8")
+
+
+def _decode_log(log: bytes) -> List[OutputLine]:
+    if not log:
+        return []
+    try:
+        now = time.time()
+        return [OutputLine(stream, text, now) for stream, text in json.loads(log)]
+    except (ValueError, TypeError):
+        return []
+
+
+def _spawn(shell_script: ShellScript, argv: List[str], inherited_fds: Tuple[int, ...]) -> Union[Popen, WarmProcess]:
+    """
+    Start running `argv`, in a warm worker if the script asks for one and it runs a Python entry point.
+
+    Processes started afresh inherit `inherited_fds`.
+    """
+    if shell_script.specs.warm:
+        command = resolve_python_command(argv)
+        workers = worker_pool() if command is not None else None
+        if command is not None and workers is not None:
+            try:
+                return workers.spawn(command)
+            except OSError:
+                # The workers' server is broken, such as by a module failing to import in it.
+                pass
+    return Popen(argv, stdout=PIPE, stderr=PIPE, pass_fds=inherited_fds)
+
+
+def _wait(process: Union[Popen, WarmProcess]) -> Tuple[int, Dict[str, Any]]:
+    """
+    Wait for `process` to exit, returning its return code and the resources it used.
+
+    The resources are read from `wait4`, so they're of the process alone (and whatever it waited for)
+    even when other processes run alongside it. Platforms without `wait4`, warm workers (which are not
+    our children) and processes reaped by someone else first report none.
+    """
+    if isinstance(process, WarmProcess):
+        return process.wait(), {"warm": True}
+    if not hasattr(os, "wait4"):
+        return process.wait(), {}
+
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # `Popen.poll` - called by `terminate` when the run is cancelled - reaped the process first.
+        return process.wait(), {}
+    process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    # Linux reports the max RSS in kilobytes, macOS in bytes.
+    max_rss_kb = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return process.returncode, {"user_cpu": usage.ru_utime, "system_cpu": usage.ru_stime, "max_rss_kb": max_rss_kb}
 
 
 class ScriptFailedError(Exception):
-    def __init__(self, target_name: str, script_name: str, return_code: int):
+    def __init__(self, target_name: str, script_name: str, return_code: int, tail: Optional[List[OutputLine]] = None):
         super().__init__(f"Script '{target_name}:{script_name}' failed with return-code {return_code}")
         self.target_name = target_name
         self.script_name = script_name
         self.return_code = return_code
+        self.tail = tail or []
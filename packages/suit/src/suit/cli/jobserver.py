@@ -0,0 +1,236 @@
+"""
+GNU make's jobserver, sharing a single limit of concurrent jobs between nested make and suit runs.
+
+The jobserver is a pipe holding a token - a byte - for every job that may run besides the first one.
+Every process taking part runs one job for free, and reads a token from the pipe for every job it
+runs alongside it, writing the token back once that job is done. Processes find the pipe in
+`MAKEFLAGS`: as `--jobserver-auth=R,W`, file descriptors they inherited, or as
+`--jobserver-auth=fifo:PATH` (make 4.4 and later), a named pipe to open.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import select
+import stat
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Mapping, Optional, Tuple
+
+MAKEFLAGS_VARIABLE = "MAKEFLAGS"
+
+_AUTH_PATTERN = re.compile(r"--jobserver-(?:auth|fds)=(?:fifo:(?P<fifo>\S+)|(?P<read>-?\d+),(?P<write>-?\d+))")
+_JOBS_PATTERN = re.compile(r"(?:^|\s)-j(\d*)(?=\s|$)")
+# How often a job waiting for tokens checks whether the run was cancelled.
+_POLL_INTERVAL = 0.1
+# A job holding some of the tokens it needs while waiting for more gives them back after a while, so
+# two processes each holding a part of what the other needs don't wait for each other forever.
+_PARTIAL_HOLD = 1.0
+
+
+@dataclass(frozen=True)
+class JobTokens:
+    """The tokens a running job holds: the free one of this process, and the ones read from the pipe."""
+
+    implicit: bool
+    taken: bytes
+
+
+class JobServer:
+    """
+    The jobserver a run takes part in, either joined from `MAKEFLAGS` or served by the run itself.
+
+    `capacity` is the amount of jobs the jobserver was started for, when known. Jobs heavier than it
+    hold all of its tokens, rather than waiting forever for more.
+    """
+
+    def __init__(
+        self,
+        read_fd: int,
+        write_fd: int,
+        capacity: Optional[int] = None,
+        inherited_fds: Tuple[int, ...] = (),
+        owned_fds: Tuple[int, ...] = (),
+        makeflags: Optional[str] = None,
+    ):
+        self.__read_fd = read_fd
+        self.__write_fd = write_fd
+        self.__capacity = capacity
+        self.__inherited_fds = inherited_fds
+        self.__owned_fds = owned_fds
+        self.__makeflags = makeflags
+        self.__lock = threading.Lock()
+        # Only one job at a time waits for tokens, so jobs of the same run never hold parts of what
+        # they each need.
+        self.__acquiring = threading.Lock()
+        self.__implicit_free = True
+
+    @property
+    def capacity(self) -> Optional[int]:
+        return self.__capacity
+
+    @property
+    def inherited_fds(self) -> Tuple[int, ...]:
+        """The file descriptors the scripts' processes must inherit to take part in the jobserver."""
+        return self.__inherited_fds
+
+    @classmethod
+    def join(cls, environ: Mapping[str, str]) -> Optional[JobServer]:
+        """The jobserver advertised in `MAKEFLAGS`, if there is one this process can use."""
+        if os.name != "posix":
+            return None
+        makeflags = environ.get(MAKEFLAGS_VARIABLE, "")
+        auth = _last_match(_AUTH_PATTERN, makeflags)
+        if auth is None:
+            return None
+        jobs = _last_match(_JOBS_PATTERN, makeflags)
+        capacity = int(jobs.group(1)) if jobs is not None and jobs.group(1) else None
+
+        if auth.group("fifo") is not None:
+            try:
+                read_fd = os.open(auth.group("fifo"), os.O_RDONLY | os.O_NONBLOCK)
+            except OSError:
+                return None
+            try:
+                write_fd = os.open(auth.group("fifo"), os.O_WRONLY)
+            except OSError:
+                os.close(read_fd)
+                return None
+            return cls(read_fd, write_fd, capacity, owned_fds=(read_fd, write_fd))
+
+        read_fd, write_fd = int(auth.group("read")), int(auth.group("write"))
+        # Negative descriptors, or ones that are not open, mean make did not pass the jobserver on.
+        if not (_is_pipe(read_fd) and _is_pipe(write_fd)):
+            return None
+        private_read_fd = _reopen_non_blocking(read_fd)
+        return cls(
+            read_fd if private_read_fd is None else private_read_fd,
+            write_fd,
+            capacity,
+            inherited_fds=(read_fd, write_fd),
+            owned_fds=() if private_read_fd is None else (private_read_fd,),
+        )
+
+    @classmethod
+    def serve(cls, jobs: int) -> JobServer:
+        """
+        Start a jobserver for `jobs` concurrent jobs, advertising it in `MAKEFLAGS` until it's closed.
+
+        `MAKEFLAGS` keeps whatever else it held, other than a `-j` of its own.
+        """
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"+" * (jobs - 1))
+        makeflags = os.environ.get(MAKEFLAGS_VARIABLE)
+        os.environ[MAKEFLAGS_VARIABLE] = " ".join(
+            flag
+            for flag in (
+                _JOBS_PATTERN.sub("", makeflags or "").strip(),
+                f"-j{jobs}",
+                f"--jobserver-auth={read_fd},{write_fd}",
+            )
+            if flag
+        )
+        private_read_fd = _reopen_non_blocking(read_fd)
+        return cls(
+            read_fd if private_read_fd is None else private_read_fd,
+            write_fd,
+            jobs,
+            inherited_fds=(read_fd, write_fd),
+            owned_fds=(read_fd, write_fd) if private_read_fd is None else (read_fd, write_fd, private_read_fd),
+            makeflags=makeflags or "",
+        )
+
+    def acquire(self, count: int, cancelled: Callable[[], bool]) -> Optional[JobTokens]:
+        """
+        Wait for the tokens of a job running `count` jobs' worth of work.
+
+        Returns `None`, holding nothing, if `cancelled` became true before all of them were taken.
+        """
+        if self.__capacity is not None:
+            count = min(count, self.__capacity)
+        with self.__acquiring:
+            implicit = False
+            taken = b""
+            taken_since = time.monotonic()
+            while True:
+                if not implicit:
+                    implicit = self.__take_implicit()
+                if implicit + len(taken) >= count:
+                    return JobTokens(implicit, taken)
+                if cancelled():
+                    self.release(JobTokens(implicit, taken))
+                    return None
+
+                token = self.__read_token()
+                if token:
+                    taken += token
+                    taken_since = time.monotonic()
+                elif taken and time.monotonic() - taken_since > _PARTIAL_HOLD:
+                    os.write(self.__write_fd, taken)
+                    taken = b""
+                    time.sleep(_POLL_INTERVAL)
+
+    def release(self, tokens: JobTokens):
+        """Give back tokens taken by `acquire`."""
+        if tokens.taken:
+            os.write(self.__write_fd, tokens.taken)
+        if tokens.implicit:
+            with self.__lock:
+                self.__implicit_free = True
+
+    def close(self):
+        """Stop taking part in the jobserver, restoring `MAKEFLAGS` if it was served by this process."""
+        if self.__makeflags is not None:
+            if self.__makeflags:
+                os.environ[MAKEFLAGS_VARIABLE] = self.__makeflags
+            else:
+                os.environ.pop(MAKEFLAGS_VARIABLE, None)
+        for fd in self.__owned_fds:
+            os.close(fd)
+        self.__owned_fds = ()
+
+    def __take_implicit(self) -> bool:
+        with self.__lock:
+            implicit, self.__implicit_free = self.__implicit_free, False
+            return implicit
+
+    def __read_token(self) -> bytes:
+        readable, _, _ = select.select([self.__read_fd], [], [], _POLL_INTERVAL)
+        if not readable:
+            return b""
+        try:
+            # Another process may take the token first. When the pipe could not be reopened as
+            # non-blocking, this waits for the next token to be given back.
+            return os.read(self.__read_fd, 1)
+        except BlockingIOError:
+            return b""
+
+
+def _last_match(pattern: re.Pattern, makeflags: str) -> Optional[re.Match]:
+    """The last match of `pattern` - later flags in `MAKEFLAGS` override earlier ones."""
+    matches = list(pattern.finditer(makeflags))
+    return matches[-1] if matches else None
+
+
+def _is_pipe(fd: int) -> bool:
+    if fd < 0:
+        return False
+    try:
+        return stat.S_ISFIFO(os.fstat(fd).st_mode)
+    except OSError:
+        return False
+
+
+def _reopen_non_blocking(fd: int) -> Optional[int]:
+    """
+    Open the pipe behind `fd` again, without blocking reads.
+
+    The inherited descriptor shares its blocking mode with every other process using it, so it's
+    left as it is. Returns `None` where pipes can't be reopened, as on platforms without `/proc`.
+    """
+    try:
+        return os.open(f"/proc/self/fd/{fd}", os.O_RDONLY | os.O_NONBLOCK)
+    except OSError:
+        return None
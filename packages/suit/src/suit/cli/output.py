@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import abc
+import json
+import time
+from typing import TYPE_CHECKING, List, Sequence
+
+from .streaming import OutputLine
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from suit.tracing import Span
+
+    from .scheduler import JobResult
+
+OUTPUT_MODES = ("rich", "plain", "ndjson")
+
+
+class ScriptOutput(metaclass=abc.ABCMeta):
+    """
+    How a run reports what its scripts are doing, and what they print.
+
+    Output arrives in batches - whatever was read from a script's stdout or stderr at once - so
+    renderers can write it out in one go.
+    """
+
+    @abc.abstractmethod
+    def script_skipped(self, target_name: str, script_name: str):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def script_restored(self, target_name: str, script_name: str):
+        """Report a script whose outputs were restored from the shared cache, before replaying its logs."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def script_started(self, target_name: str, script_name: str):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def script_output(self, target_name: str, script_name: str, lines: Sequence[OutputLine]):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def script_failed(self, target_name: str, script_name: str, return_code: int):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def critical_path(self, path: Sequence[JobResult]):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def slowest_scripts(self, spans: Sequence[Span]):
+        """Report the scripts that took the longest, from their trace."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def failure_summary(self, target_name: str, script_name: str, return_code: int, tail: Sequence[OutputLine]):
+        """Report a failed script once the run is over, repeating the last lines it printed (if any)."""
+        raise NotImplementedError
+
+
+def create_output(mode: str, console: Console) -> ScriptOutput:
+    """The `ScriptOutput` of `mode`, writing into `console` (or into its file, when not rendering)."""
+    if mode == "plain":
+        return PlainOutput(console)
+    if mode == "ndjson":
+        return NDJSONOutput(console)
+    return RichOutput(console)
+
+
+class RichOutput(ScriptOutput):
+    """Rendered, colored output. Every batch of lines is logged at once."""
+
+    # pylint: disable=import-outside-toplevel
+    # rich is imported only when rendering with it, so the other modes (and the CLI) start faster.
+
+    def __init__(self, console: Console):
+        self.__console = console
+
+    def __title(self, target_name: str, script_name: str):
+        from rich.text import Text
+
+        return Text.assemble(target_name, ":", script_name, style="yellow italic")
+
+    def script_skipped(self, target_name: str, script_name: str):
+        from rich.text import Text
+
+        title = self.__title(target_name, script_name)
+        self.__console.log(Text.assemble("Skipping '", title, "', its inputs did not change."))
+
+    def script_restored(self, target_name: str, script_name: str):
+        from rich.text import Text
+
+        title = self.__title(target_name, script_name)
+        self.__console.log(Text.assemble("Restored '", title, "' from the shared cache."))
+
+    def script_started(self, target_name: str, script_name: str):
+        from rich.text import Text
+
+        self.__console.log(Text.assemble("Will run '", self.__title(target_name, script_name), "'..."))
+
+    def script_output(self, target_name: str, script_name: str, lines: Sequence[OutputLine]):
+        from rich.text import Text
+
+        if not lines:
+            return
+        # A batch is read from a single stream, so all of its lines look the same. Plain text renders
+        # many times faster than a table would, which matters for scripts printing thousands of lines.
+        style, label = ("bold", "OUT") if lines[0].stream == "stdout" else ("red bold", "ERR")
+        prefix = Text(f"    {label} │ ", style=style)
+        self.__console.log(Text("\n").join(Text.assemble(prefix, line.text) for line in lines))
+
+    def script_failed(self, target_name: str, script_name: str, return_code: int):
+        self.__console.log(f"[red]Target script exited with return-code [bold]{return_code}[/][/]")
+
+    def critical_path(self, path: Sequence[JobResult]):
+        from rich.text import Text
+
+        total = sum(result.duration for result in path)
+        steps = " → ".join(f"{result.job.name} ({result.duration:.1f}s)" for result in path)
+        self.__console.log(Text(f"Critical path ({total:.1f}s): {steps}", style="dim"))
+
+    def slowest_scripts(self, spans: Sequence[Span]):
+        from rich.text import Text
+
+        self.__console.log(Text("Slowest scripts:", style="dim"))
+        for span in spans:
+            self.__console.log(Text(f"    {_describe_span(span)}", style="dim"))
+
+    def failure_summary(self, target_name: str, script_name: str, return_code: int, tail: Sequence[OutputLine]):
+        from rich.text import Text
+
+        message = f"Script '{target_name}:{script_name}' failed with return-code {return_code}"
+        self.__console.log(Text(message, style="red bold"))
+        for line in tail:
+            self.__console.log(Text.assemble(("    ERR │ " if line.stream == "stderr" else "    OUT │ "), line.text))
+
+
+class PlainOutput(ScriptOutput):
+    """Plain text, every line prefixed by the script it came from. Every batch of lines is a single write."""
+
+    def __init__(self, console: Console):
+        self.__file = console.file
+
+    def __write(self, text: str):
+        self.__file.write(text)
+        self.__file.flush()
+
+    def script_skipped(self, target_name: str, script_name: str):
+        self.__write(f"{target_name}:{script_name}: skipped, its inputs did not change\n")
+
+    def script_restored(self, target_name: str, script_name: str):
+        self.__write(f"{target_name}:{script_name}: restored from the shared cache\n")
+
+    def script_started(self, target_name: str, script_name: str):
+        self.__write(f"{target_name}:{script_name}: running\n")
+
+    def script_output(self, target_name: str, script_name: str, lines: Sequence[OutputLine]):
+        prefix = f"{target_name}:{script_name} "
+        self.__write(
+            "".join(f"{prefix}{'ERR' if line.stream == 'stderr' else 'OUT'} | {line.text}\n" for line in lines)
+        )
+
+    def script_failed(self, target_name: str, script_name: str, return_code: int):
+        self.__write(f"{target_name}:{script_name}: exited with return-code {return_code}\n")
+
+    def critical_path(self, path: Sequence[JobResult]):
+        total = sum(result.duration for result in path)
+        steps = " -> ".join(f"{result.job.name} ({result.duration:.1f}s)" for result in path)
+        self.__write(f"Critical path ({total:.1f}s): {steps}\n")
+
+    def slowest_scripts(self, spans: Sequence[Span]):
+        self.__write("Slowest scripts:\n" + "".join(f"    {_describe_span(span)}\n" for span in spans))
+
+    def failure_summary(self, target_name: str, script_name: str, return_code: int, tail: Sequence[OutputLine]):
+        self.__write(f"{target_name}:{script_name}: failed with return-code {return_code}\n")
+        self.script_output(target_name, script_name, tail)
+
+
+class NDJSONOutput(ScriptOutput):
+    """
+    One JSON object per line for every event of the run, for log shippers and other tools.
+
+    Every event has its `event` kind, a `timestamp`, and the `target` and `script` it's about (if any).
+    Output events also have the `stream` and the `line` that was printed.
+    """
+
+    def __init__(self, console: Console):
+        self.__file = console.file
+
+    def __write(self, events: List[dict]):
+        self.__file.write("".join(json.dumps(event) + "\n" for event in events))
+        self.__file.flush()
+
+    @staticmethod
+    def __event(event: str, target_name: str, script_name: str, **fields) -> dict:
+        return {"event": event, "timestamp": time.time(), "target": target_name, "script": script_name, **fields}
+
+    def script_skipped(self, target_name: str, script_name: str):
+        self.__write([self.__event("skipped", target_name, script_name)])
+
+    def script_restored(self, target_name: str, script_name: str):
+        self.__write([self.__event("restored", target_name, script_name)])
+
+    def script_started(self, target_name: str, script_name: str):
+        self.__write([self.__event("started", target_name, script_name)])
+
+    def script_output(self, target_name: str, script_name: str, lines: Sequence[OutputLine]):
+        self.__write(
+            [
+                {
+                    "event": "output",
+                    "timestamp": line.timestamp,
+                    "target": target_name,
+                    "script": script_name,
+                    "stream": line.stream,
+                    "line": line.text,
+                }
+                for line in lines
+            ]
+        )
+
+    def script_failed(self, target_name: str, script_name: str, return_code: int):
+        self.__write([self.__event("failed", target_name, script_name, return_code=return_code)])
+
+    def critical_path(self, path: Sequence[JobResult]):
+        steps = [{"name": result.job.name, "duration": result.duration} for result in path]
+        self.__write([{"event": "critical_path", "timestamp": time.time(), "steps": steps}])
+
+    def slowest_scripts(self, spans: Sequence[Span]):
+        scripts = [{"name": span.name, "duration": span.duration, **span.args} for span in spans]
+        self.__write([{"event": "slowest_scripts", "timestamp": time.time(), "scripts": scripts}])
+
+    def failure_summary(self, target_name: str, script_name: str, return_code: int, tail: Sequence[OutputLine]):
+        # Every failure and every line were already reported as they happened.
+        pass
+
+
+def _describe_span(span: Span) -> str:
+    description = f"{span.name} ({span.duration:.1f}s"
+    if "user_cpu" in span.args:
+        description += (
+            f", {span.args['user_cpu']:.1f}s user, {span.args['system_cpu']:.1f}s system,"
+            f" {span.args['max_rss_kb'] / 1024:.0f}MiB max RSS"
+        )
+    return description + ")"
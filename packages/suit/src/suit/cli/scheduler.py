@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import enum
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from subprocess import Popen
+from typing import Callable, Deque, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from rich.console import Console
+
+from suit.console import buffered_console, console as main_console
+
+from .jobserver import JobServer
+
+# The resource every job holds some of: its share of the concurrent jobs.
+CPU_RESOURCE = "cpu"
+
+
+def default_jobs() -> int:
+    """The default amount of concurrent jobs - one per CPU."""
+    return os.cpu_count() or 1
+
+
+class ProcessGroup:
+    """
+    The processes currently spawned by running jobs.
+
+    Cancelling the group terminates every registered process, and kills the ones that did not exit
+    after a grace period. Processes registered after cancellation are terminated right away.
+    """
+
+    def __init__(self, grace_period: float = 5.0):
+        self.__lock = threading.Lock()
+        self.__processes: Set[Popen] = set()
+        self.__cancelled = threading.Event()
+        self.__grace_period = grace_period
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__cancelled.is_set()
+
+    def register(self, process: Popen):
+        with self.__lock:
+            self.__processes.add(process)
+            if self.cancelled:
+                process.terminate()
+
+    def unregister(self, process: Popen):
+        """Forget about `process`. Must be called once the process was waited for."""
+        with self.__lock:
+            self.__processes.discard(process)
+
+    def cancel(self):
+        with self.__lock:
+            if self.cancelled:
+                return
+            self.__cancelled.set()
+            for process in self.__processes:
+                process.terminate()
+
+        killer = threading.Timer(self.__grace_period, self.__kill_remaining)
+        killer.daemon = True
+        killer.start()
+
+    def __kill_remaining(self):
+        with self.__lock:
+            for process in self.__processes:
+                process.kill()
+
+
+@dataclass(frozen=True)
+class JobContext:
+    """
+    What a running job may use: where to write its output, and where to register its processes.
+
+    Its processes must inherit the `inherited_fds`, such as the pipe of the run's jobserver.
+    """
+
+    console: Console
+    processes: ProcessGroup
+    inherited_fds: Tuple[int, ...] = ()
+
+
+@dataclass
+class Job:
+    """A unit of work for the `Scheduler`. A job starts only after all of its `deps` succeeded."""
+
+    name: str
+    run: Callable[[JobContext], None]
+    deps: Sequence[str] = field(default_factory=tuple)
+    # The resources the job holds while running, such as `{"cpu": 4}`.
+    resources: Mapping[str, int] = field(default_factory=dict)
+
+
+class JobStatus(enum.Enum):
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    SKIPPED = "skipped"
+
+
+@dataclass
+class JobResult:
+    job: Job
+    status: JobStatus
+    error: Optional[BaseException] = None
+    duration: float = 0.0
+
+
+def critical_path(results: Sequence[JobResult]) -> List[JobResult]:
+    """The chain of dependent jobs that took the longest time altogether, in the order they ran."""
+    by_name = {result.job.name: result for result in results}
+    longest: Dict[str, Tuple[float, List[JobResult]]] = {}
+
+    def longest_until(name: str) -> Tuple[float, List[JobResult]]:
+        if name not in longest:
+            result = by_name[name]
+            before = max(
+                (longest_until(dep) for dep in result.job.deps), key=lambda found: found[0], default=(0.0, [])
+            )
+            longest[name] = (before[0] + result.duration, [*before[1], result])
+        return longest[name]
+
+    return max((longest_until(name) for name in by_name), key=lambda found: found[0], default=(0.0, []))[1]
+
+
+class Scheduler:
+    """
+    Run jobs concurrently, up to `jobs` at a time, respecting their dependencies and resources.
+
+    A job holds the `resources` it declares while it runs. `cpu` (1 unless declared) is its share of
+    the `jobs`, and other resources are limited by the `budget`, if they're in it. A job needing more
+    than a whole budget holds all of it, running alone. With a `jobserver`, jobs also take their cpu
+    share of tokens from it, limiting them along with the other processes using it.
+
+    When running more than one job at a time, each job's output is kept aside and printed as a whole
+    when the job is done, so outputs of different jobs never interleave.
+
+    By default the first failure cancels the in-flight jobs and nothing new is started. With
+    `keep_going`, the in-flight and remaining jobs are drained, skipping only the jobs that depend
+    on a failed one. Cancelling the run's process group from outside stops it the same way.
+    """
+
+    def __init__(
+        self,
+        jobs: Optional[int] = None,
+        keep_going: bool = False,
+        console: Optional[Console] = None,
+        budget: Optional[Mapping[str, int]] = None,
+        jobserver: Optional[JobServer] = None,
+    ):
+        self.__jobs = jobs or default_jobs()
+        self.__keep_going = keep_going
+        self.__console = console or main_console
+        self.__budget = {**(budget or {}), CPU_RESOURCE: self.__jobs}
+        self.__jobserver = jobserver
+        self.__output_lock = threading.Lock()
+
+    def run(self, jobs: Sequence[Job], processes: Optional[ProcessGroup] = None) -> List[JobResult]:
+        """Run `jobs`, spawning their processes in `processes`, and return their results in the order they were given."""
+        names = {job.name for job in jobs}
+        if len(names) != len(jobs):
+            raise ValueError("Job names must be unique")
+        for job in jobs:
+            unknown = [dep for dep in job.deps if dep not in names]
+            if unknown:
+                raise ValueError(f"Job '{job.name}' depends on unknown jobs: {unknown}")
+
+        processes = processes or ProcessGroup()
+        results: Dict[str, JobResult] = {}
+        demands = {job.name: self.__demand_of(job) for job in jobs}
+        unfinished_deps = {job.name: len(set(job.deps)) for job in jobs}
+        dependents: Dict[str, List[Job]] = {job.name: [] for job in jobs}
+        for job in jobs:
+            for dep in set(job.deps):
+                dependents[dep].append(job)
+        ready = _ReadyJobs()
+        for job in jobs:
+            if not unfinished_deps[job.name]:
+                ready.push(job, demands[job.name])
+        available = dict(self.__budget)
+        running: Dict[Future, Job] = {}
+        stopping = False
+
+        with ThreadPoolExecutor(max_workers=self.__jobs) as pool:
+            while ready or running:
+                if not stopping and not processes.cancelled:
+                    for job in ready.pop_fitting(available):
+                        running[pool.submit(self.__run_job, job, demands[job.name], processes)] = job
+                if not running:
+                    break
+
+                try:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                except KeyboardInterrupt:
+                    processes.cancel()
+                    raise
+                for future in done:
+                    job = running.pop(future)
+                    for resource, amount in demands[job.name].items():
+                        available[resource] += amount
+                    result = future.result()
+                    if result.status is JobStatus.FAILED and processes.cancelled:
+                        # Failures caused by the cancellation itself are not failures of their own.
+                        result.status = JobStatus.CANCELLED
+                    results[job.name] = result
+                    if result.status is JobStatus.FAILED and not self.__keep_going:
+                        stopping = True
+                        processes.cancel()
+
+                    if result.status is not JobStatus.SUCCEEDED:
+                        _skip_dependents(job, dependents, results)
+                        continue
+                    for dependent in dependents[job.name]:
+                        unfinished_deps[dependent.name] -= 1
+                        if not unfinished_deps[dependent.name] and dependent.name not in results:
+                            ready.push(dependent, demands[dependent.name])
+
+        return [results.get(job.name) or JobResult(job, JobStatus.SKIPPED) for job in jobs]
+
+    def __demand_of(self, job: Job) -> Dict[str, int]:
+        """The budgeted resources `job` holds while running, none more than a whole budget."""
+        demand = {CPU_RESOURCE: 1, **job.resources}
+        return {
+            resource: min(amount, self.__budget[resource])
+            for resource, amount in demand.items()
+            if resource in self.__budget
+        }
+
+    def __run_job(self, job: Job, demand: Mapping[str, int], processes: ProcessGroup) -> JobResult:
+        tokens = None
+        if self.__jobserver is not None:
+            tokens = self.__jobserver.acquire(demand[CPU_RESOURCE], lambda: processes.cancelled)
+            if tokens is None:
+                return JobResult(job, JobStatus.CANCELLED)
+        try:
+            return self.__run_job_holding_tokens(job, processes)
+        finally:
+            if self.__jobserver is not None and tokens is not None:
+                self.__jobserver.release(tokens)
+
+    def __run_job_holding_tokens(self, job: Job, processes: ProcessGroup) -> JobResult:
+        inherited_fds = self.__jobserver.inherited_fds if self.__jobserver is not None else ()
+        if self.__jobs == 1:
+            return self.__timed_run(job, JobContext(self.__console, processes, inherited_fds))
+
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as output:
+            result = self.__timed_run(job, JobContext(buffered_console(output), processes, inherited_fds))
+            output.seek(0)
+            with self.__output_lock:
+                self.__console.file.flush()
+                shutil.copyfileobj(output, self.__console.file)
+                self.__console.file.flush()
+        return result
+
+    @staticmethod
+    def __timed_run(job: Job, context: JobContext) -> JobResult:
+        started = time.perf_counter()
+        try:
+            job.run(context)
+        except Exception as error:  # pylint: disable=broad-except
+            return JobResult(job, JobStatus.FAILED, error, time.perf_counter() - started)
+        return JobResult(job, JobStatus.SUCCEEDED, duration=time.perf_counter() - started)
+
+
+class _ReadyJobs:
+    """
+    The jobs whose dependencies all succeeded, in the order they became ready.
+
+    Jobs are grouped by the resources they demand, so finding the ones fitting in what's available
+    takes a look at every group rather than at every ready job.
+    """
+
+    def __init__(self):
+        self.__groups: Dict[Tuple[Tuple[str, int], ...], Deque[Tuple[int, Job]]] = {}
+        self.__counter = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.__groups)
+
+    def push(self, job: Job, demand: Mapping[str, int]):
+        self.__groups.setdefault(tuple(sorted(demand.items())), deque()).append((next(self.__counter), job))
+
+    def pop_fitting(self, available: Dict[str, int]) -> Iterator[Job]:
+        """Take the jobs fitting in `available`, oldest first, taking what they demand out of it."""
+        while True:
+            fitting = [
+                demand for demand in self.__groups if all(available[resource] >= amount for resource, amount in demand)
+            ]
+            if not fitting:
+                return
+            demand = min(fitting, key=lambda key: self.__groups[key][0][0])
+            group = self.__groups[demand]
+            _, job = group.popleft()
+            if not group:
+                del self.__groups[demand]
+            for resource, amount in demand:
+                available[resource] -= amount
+            yield job
+
+
+def _skip_dependents(job: Job, dependents: Mapping[str, List[Job]], results: Dict[str, JobResult]):
+    """Skip the jobs depending on `job`, directly or not, since it did not succeed."""
+    unsucceeded = [job]
+    while unsucceeded:
+        for dependent in dependents[unsucceeded.pop().name]:
+            if dependent.name not in results:
+                results[dependent.name] = JobResult(dependent, JobStatus.SKIPPED)
+                unsucceeded.append(dependent)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import codecs
+import os
+import queue
+import selectors
+import threading
+import time
+from dataclasses import dataclass
+from subprocess import Popen
+from typing import IO, Callable, List, Optional, Sequence, Tuple
+
+DEFAULT_TAIL_LINES = 20
+
+_CHUNK_SIZE = 64 * 1024
+_MAX_LINE_LENGTH = 64 * 1024
+
+
+@dataclass(frozen=True)
+class OutputLine:
+    """A single line of output, as it was read from a running process."""
+
+    stream: str
+    text: str
+    timestamp: float
+
+
+class _LineSplitter:
+    """Incrementally decode a byte stream, and split it into lines of bounded length."""
+
+    def __init__(self, max_line_length: int = _MAX_LINE_LENGTH):
+        self.__decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.__partial = ""
+        self.__max_line_length = max_line_length
+
+    def feed(self, data: bytes, final: bool = False) -> List[str]:
+        lines = (self.__partial + self.__decoder.decode(data, final=final)).split("\n")
+        self.__partial = lines.pop()
+        if final or len(self.__partial) >= self.__max_line_length:
+            if self.__partial:
+                lines.append(self.__partial)
+            self.__partial = ""
+        return [line.rstrip("\r") for line in lines]
+
+
+def stream_process_output(process: Popen, on_line: Callable[[OutputLine], None]):
+    """
+    Read the (binary) stdout and stderr pipes of `process` as data arrives, until both are closed.
+
+    Every complete line is handed to `on_line` right away.
+    """
+
+    def on_lines(lines: List[OutputLine]):
+        for line in lines:
+            on_line(line)
+
+    stream_process_output_batches(process, on_lines)
+
+
+def stream_process_output_batches(process: Popen, on_lines: Callable[[List[OutputLine]], None]):
+    """
+    Read the (binary) stdout and stderr pipes of `process` as data arrives, until both are closed.
+
+    Both pipes are multiplexed, so a process writing a lot into one of them never blocks while we
+    wait on the other. Nothing is kept besides the line currently being assembled - the complete
+    lines of every read are handed to `on_lines` right away, as a batch. All lines of a batch come
+    from the same stream.
+
+    Windows can't select on pipes, so there every pipe is read by a thread of its own instead.
+    """
+    pipes = [(stream, pipe) for stream, pipe in (("stdout", process.stdout), ("stderr", process.stderr)) if pipe]
+    if os.name == "nt":
+        _read_in_threads(pipes, on_lines)
+    else:
+        _read_selecting(pipes, on_lines)
+
+
+def _read_selecting(pipes: Sequence[Tuple[str, IO[bytes]]], on_lines: Callable[[List[OutputLine]], None]):
+    with selectors.DefaultSelector() as selector:
+        for stream, pipe in pipes:
+            selector.register(pipe, selectors.EVENT_READ, (stream, _LineSplitter()))
+
+        while selector.get_map():
+            for key, _ in selector.select():
+                stream, splitter = key.data
+                data = os.read(key.fd, _CHUNK_SIZE)
+                timestamp = time.time()
+                if data:
+                    lines = splitter.feed(data)
+                else:
+                    selector.unregister(key.fileobj)
+                    lines = splitter.feed(b"", final=True)
+                if lines:
+                    on_lines([OutputLine(stream, line, timestamp) for line in lines])
+
+
+def _read_in_threads(pipes: Sequence[Tuple[str, IO[bytes]]], on_lines: Callable[[List[OutputLine]], None]):
+    # Batches are handed to `on_lines` from the calling thread, as they are when selecting. `None`
+    # marks a pipe that was closed.
+    batches: queue.Queue[Optional[List[OutputLine]]] = queue.Queue()
+
+    def read(stream: str, pipe: IO[bytes]):
+        splitter = _LineSplitter()
+        try:
+            while True:
+                data = os.read(pipe.fileno(), _CHUNK_SIZE)
+                lines = splitter.feed(data, final=not data)
+                if lines:
+                    timestamp = time.time()
+                    batches.put([OutputLine(stream, line, timestamp) for line in lines])
+                if not data:
+                    return
+        finally:
+            batches.put(None)
+
+    readers = [threading.Thread(target=read, args=pipe, daemon=True) for pipe in pipes]
+    for reader in readers:
+        reader.start()
+    open_pipes = len(readers)
+    while open_pipes:
+        batch = batches.get()
+        if batch is None:
+            open_pipes -= 1
+        else:
+            on_lines(batch)
+    for reader in readers:
+        reader.join()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import pathlib
+import threading
+from typing import Callable, Dict, List, Optional, Set
+
+from suit.affected import TargetPathIndex
+from suit.config import SuitConfig
+from suit.scripts.types import ShellScript
+from suit.warm import CONFIGURATION_FILE_NAMES, WarmSuit
+from suit.watcher import TreeWatcher
+
+from .scheduler import ProcessGroup
+
+DEFAULT_DEBOUNCE_SECONDS = 0.2
+
+# Runs the watched scripts of the given targets, spawning their processes in the given group.
+RunTargets = Callable[[SuitConfig, Set[str], ProcessGroup], None]
+
+
+class ScriptWatch:
+    """
+    Run scripts again whenever files of the targets defining them change.
+
+    Changes are gathered until none arrived for `debounce` seconds, so a burst of them - an editor
+    saving, a checkout - starts a single run, of the targets owning the changed files. Changes to
+    ignored paths, and to the outputs declared by the targets' scripts, are left alone. A run still
+    going when new changes arrive is stale: it's cancelled, and its targets run again with the new ones.
+
+    The configurations are kept warm, rather than collected again for every change.
+    """
+
+    def __init__(
+        self,
+        warm: WarmSuit,
+        watcher: TreeWatcher,
+        run_targets: RunTargets,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+        log: Callable[[str], None] = lambda message: None,
+    ):
+        self.__warm = warm
+        self.__watcher = watcher
+        self.__run_targets = run_targets
+        self.__debounce = debounce
+        self.__log = log
+        self.__filter: Optional[_ChangeFilter] = None
+        self.__run: Optional[threading.Thread] = None
+        self.__run_processes = ProcessGroup()
+        self.__run_target_names: Set[str] = set()
+
+    def start(self) -> Optional[SuitConfig]:
+        """Collect the configurations and start watching, returning the configurations (unless they're invalid)."""
+        self.__warm.refresh_watching(self.__watcher)
+        return self.__warm.suit
+
+    def poll(self, timeout: float) -> Optional[Set[str]]:
+        """
+        Wait up to `timeout` seconds for changes, and start a run of the targets they affect.
+
+        Returns the targets of the run that was started, if any.
+        """
+        self.__watcher.wait(timeout)
+        changes = self.__relevant(self.__watcher.changes())
+        if changes is not None and not changes:
+            return None
+        while True:
+            self.__watcher.wait(self.__debounce)
+            more = self.__relevant(self.__watcher.changes())
+            if more is not None and not more:
+                break
+            changes = None if changes is None or more is None else changes | more
+
+        previous = self.__warm.suit
+        self.__warm.refresh_watching(self.__watcher)
+        suit = self.__warm.suit
+        if suit is None:
+            self.__log(f"Invalid configurations: {self.__warm.error}")
+            return None
+        if changes is None or previous is None or suit.project_config is not previous.project_config:
+            # There's no telling what changed, or the templates of every target may have.
+            targets = set(suit.targets)
+        else:
+            targets = self.__owners(suit, changes)
+        if not targets:
+            return None
+
+        targets |= self.__cancel_stale_run()
+        self.__start_run(suit, targets)
+        return targets
+
+    def wait_for_run(self):
+        """Wait for the run in flight, if there's one, to finish."""
+        if self.__run is not None:
+            self.__run.join()
+
+    def stop(self):
+        """Cancel the run in flight, if there's one, and wait for it."""
+        self.__cancel_stale_run()
+
+    def __filter_of(self, suit: SuitConfig) -> _ChangeFilter:
+        if self.__filter is None or self.__filter.suit is not suit:
+            self.__filter = _ChangeFilter(suit)
+        return self.__filter
+
+    def __relevant(self, changes: Optional[Set[str]]) -> Optional[Set[str]]:
+        suit = self.__warm.suit
+        if changes is None or suit is None:
+            return changes
+        change_filter = self.__filter_of(suit)
+        return {path for path in changes if change_filter.is_relevant(path)}
+
+    def __owners(self, suit: SuitConfig, changes: Set[str]) -> Set[str]:
+        change_filter = self.__filter_of(suit)
+        owners = (change_filter.owner_of(path) for path in changes)
+        return {owner for owner in owners if owner is not None}
+
+    def __cancel_stale_run(self) -> Set[str]:
+        if self.__run is None or not self.__run.is_alive():
+            return set()
+        self.__log("Cancelling the stale run")
+        self.__run_processes.cancel()
+        self.__run.join()
+        return self.__run_target_names
+
+    def __start_run(self, suit: SuitConfig, targets: Set[str]):
+        self.__run_processes = ProcessGroup()
+        self.__run_target_names = targets
+        self.__run = threading.Thread(
+            target=self.__run_targets,
+            args=(suit, targets, self.__run_processes),
+            name="suit-watch-run",
+            daemon=True,
+        )
+        self.__run.start()
+
+
+class _ChangeFilter:
+    """Whether changed paths matter to the targets of `suit`, and which target they belong to."""
+
+    def __init__(self, suit: SuitConfig):
+        self.suit = suit
+        self.__rules = suit.project_config.discovery.ignore_rules()
+        self.__index = TargetPathIndex(suit.targets)
+        self.__outputs: Dict[str, List[str]] = {}
+
+    def __relative(self, path: str) -> Optional[str]:
+        relative = pathlib.Path(os.path.relpath(path, self.suit.root)).as_posix()
+        return None if relative == ".." or relative.startswith("../") else relative
+
+    def owner_of(self, path: str) -> Optional[str]:
+        relative = self.__relative(path)
+        return self.__index.owner_of(relative) if relative is not None else None
+
+    def is_relevant(self, path: str) -> bool:
+        relative = self.__relative(path)
+        if relative is None or self.__rules.is_ignored(relative, is_directory=os.path.isdir(path)):
+            return False
+        owner = self.__index.owner_of(relative)
+        if owner is None:
+            # Outside of every target, only what may make a new target matters.
+            return os.path.basename(path) in CONFIGURATION_FILE_NAMES or os.path.isdir(path)
+        path_in_target = relative if owner == "." else relative[len(owner) + 1 :]
+        return not any(
+            fnmatch.fnmatchcase(path_in_target, output) or output.startswith(f"{path_in_target}/")
+            for output in self.__outputs_of(owner)
+        )
+
+    def __outputs_of(self, target_name: str) -> List[str]:
+        outputs = self.__outputs.get(target_name)
+        if outputs is None:
+            scripts = self.suit.scripts.of(self.suit.targets[target_name]).values()
+            outputs = self.__outputs[target_name] = [
+                output for script in scripts if isinstance(script, ShellScript) for output in script.specs.outputs
+            ]
+        return outputs
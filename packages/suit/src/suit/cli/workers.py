@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+import atexit
+import functools
+import importlib
+import importlib.util
+import os
+import pickle
+import re
+import runpy
+import selectors
+import shutil
+import signal
+import socket
+import struct
+import sys
+import sysconfig
+import threading
+import traceback
+from dataclasses import dataclass
+from multiprocessing import reduction
+from subprocess import DEVNULL, Popen
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+_INTERPRETER_NAME = re.compile(r"python(\d+(\.\d+)?)?(\.exe)?")
+_LENGTH = struct.Struct("!I")
+_STATUS = struct.Struct("i")
+
+
+@dataclass(frozen=True)
+class PythonCommand:
+    """A command running a Python entry point - or a module as `__main__`, when it has no `attribute`."""
+
+    module: str
+    attribute: Optional[str]
+    argv: List[str]
+    # What the workers may import up front. Not a module run as `__main__`, that would run it.
+    preloaded: Optional[str]
+
+
+def resolve_python_command(argv: Sequence[str]) -> Optional[PythonCommand]:
+    """
+    The Python entry point `argv` runs, if it runs one of this interpreter's environment.
+
+    That is a console script installed alongside the interpreter (say, `black --check .`), or the
+    interpreter running a module (`python -m pylint src`). Anything else is not a Python command.
+    """
+    if not argv:
+        return None
+    executable = shutil.which(argv[0])
+    if executable is None or os.path.dirname(os.path.abspath(executable)) not in _scripts_directories():
+        return None
+
+    name = os.path.basename(executable)
+    if _INTERPRETER_NAME.fullmatch(name):
+        if len(argv) < 3 or argv[1] != "-m":
+            return None
+        return PythonCommand(argv[2], None, ["-m", *argv[3:]], _package_of(argv[2]))
+
+    value = _console_scripts().get(name)
+    if value is None:
+        return None
+    module, _, attribute = value.partition(":")
+    # Drop the extras, as in `module:function [extra]`.
+    attribute = attribute.split("[", 1)[0].strip()
+    return PythonCommand(module.strip(), attribute or None, [executable, *argv[1:]], module.strip())
+
+
+def _package_of(module: str) -> Optional[str]:
+    """The package running `module` imports first: its parent, or itself if it's a package (run from `__main__`)."""
+    if "." in module:
+        return module.rpartition(".")[0]
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        return None
+    return module if spec is not None and spec.submodule_search_locations is not None else None
+
+
+@functools.lru_cache(maxsize=None)
+def _scripts_directories() -> Set[str]:
+    directories = {os.path.dirname(os.path.abspath(sys.executable))}
+    scripts = sysconfig.get_path("scripts")
+    if scripts:
+        directories.add(os.path.abspath(scripts))
+    return directories
+
+
+@functools.lru_cache(maxsize=None)
+def _console_scripts() -> Dict[str, str]:
+    from importlib import metadata  # pylint: disable=import-outside-toplevel
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        scripts = entry_points.select(group="console_scripts")
+    else:
+        # Python 3.8 and 3.9 group them in a dict.
+        scripts = entry_points.get("console_scripts", [])  # type: ignore[attr-defined]
+    return {entry_point.name: entry_point.value for entry_point in scripts}
+
+
+class WorkerPool:
+    """
+    Run Python commands in workers forked from a warm server, rather than each in a fresh interpreter.
+
+    The server is an interpreter started once, which imports the modules of the commands up front and
+    then forks a worker for every command - with its own working directory, argv, environment and
+    output pipes, exiting with the code the interpreter would have. Modules imported at the server's
+    start (that is, anything reading the environment on import) see the environment of that time.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__server: Optional[Popen] = None
+        self.__socket: Optional[socket.socket] = None
+        self.__modules: Set[str] = set()
+
+    @staticmethod
+    def is_available() -> bool:
+        return hasattr(os, "fork") and hasattr(socket, "AF_UNIX")
+
+    def preload(self, modules: Iterable[str]):
+        """Have the server import `modules` (in the background), so the workers forked later start with them."""
+        with self.__lock:
+            new_modules = sorted(set(modules) - self.__modules)
+            if new_modules or self.__socket is None:
+                self.__send(("import", new_modules))
+                self.__modules.update(new_modules)
+
+    def spawn(self, command: PythonCommand) -> WarmProcess:
+        """Run `command` in a new worker, in the current working directory and environment."""
+        self.preload([command.preloaded] if command.preloaded is not None else [])
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+        status_read, status_write = os.pipe()
+        # pylint: disable-next=consider-using-with
+        pipes = [open(fd, "rb") for fd in (stdout_read, stderr_read, status_read)]
+        try:
+            with self.__lock:
+                self.__send(
+                    ("run", command, os.getcwd(), dict(os.environ)), [stdout_write, stderr_write, status_write]
+                )
+        finally:
+            for fd in (stdout_write, stderr_write, status_write):
+                os.close(fd)
+        try:
+            # Once the server got to it (it may be importing modules still), and forked the worker.
+            pid = _read_status(pipes[2])
+        except BaseException:
+            for pipe in pipes:
+                pipe.close()
+            raise
+        return WarmProcess(pid, *pipes, release=functools.partial(self.__release, pid))
+
+    def close(self):
+        """Stop the server. Workers still running are left to finish."""
+        with self.__lock:
+            if self.__socket is not None:
+                self.__socket.close()
+                self.__socket = None
+            if self.__server is not None:
+                self.__server.wait()
+                self.__server = None
+
+    def __release(self, pid: int):
+        """Have the server reap the worker `pid`, now that its process is done with the pid."""
+        with self.__lock:
+            if self.__socket is None:
+                return
+            try:
+                self.__send(("reap", pid))
+            except OSError:
+                pass
+
+    def __send(self, message: Tuple[Any, ...], fds: Sequence[int] = ()):
+        if self.__socket is None:
+            self.__start()
+        assert self.__socket is not None
+        payload = pickle.dumps(message)
+        try:
+            self.__socket.sendall(_LENGTH.pack(len(payload)) + payload)
+            if fds:
+                reduction.sendfds(self.__socket, fds)
+        except OSError:
+            # The server is gone, a new one is started next time.
+            self.__socket.close()
+            self.__socket = None
+            self.__modules.clear()
+            raise
+
+    def __start(self):
+        ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Wherever suit is imported from, without putting it before what the commands would import.
+        location = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        code = (
+            f"import sys; sys.path.append({location!r}); "
+            f"from suit.cli.workers import _serve; _serve({theirs.fileno()})"
+        )
+        try:
+            self.__server = Popen([sys.executable, "-c", code], stdin=DEVNULL, pass_fds=(theirs.fileno(),))
+        except BaseException:
+            ours.close()
+            raise
+        finally:
+            theirs.close()
+        self.__socket = ours
+
+
+class WarmProcess:
+    """
+    A command running in a worker, standing in for the `Popen` of one started cold.
+
+    The server leaves the worker unreaped until `release` is called, once the process knows its exit
+    code. Until then the pid can't be reused, so signalling a worker that exited is harmless.
+    """
+
+    def __init__(
+        self,
+        pid: int,
+        stdout: BinaryIO,
+        stderr: BinaryIO,
+        status: BinaryIO,
+        release: Callable[[], None] = lambda: None,
+    ):
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self.__status = status
+        self.__release = release
+        self.__lock = threading.Lock()
+        self.returncode: Optional[int] = None
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+    def send_signal(self, signal_number: int):
+        # The pid may be reused once the worker was released.
+        with self.__lock:
+            if self.returncode is None:
+                try:
+                    os.kill(self.pid, signal_number)
+                except ProcessLookupError:
+                    pass
+
+    def wait(self) -> int:
+        if self.returncode is None:
+            try:
+                returncode = _read_status(self.__status)
+            finally:
+                self.__status.close()
+            with self.__lock:
+                self.returncode = returncode
+                self.__release()
+        return self.returncode
+
+    def __enter__(self) -> WarmProcess:
+        return self
+
+    def __exit__(self, *_):
+        self.stdout.close()
+        self.stderr.close()
+        self.wait()
+
+
+def _read_status(status: BinaryIO) -> int:
+    data = status.read(_STATUS.size)
+    if len(data) != _STATUS.size:
+        raise OSError("The workers' server exited")
+    return _STATUS.unpack(data)[0]
+
+
+def _serve(fd: int):
+    """
+    Serve a `WorkerPool`: import modules, and fork workers running commands, as the messages on `fd` ask.
+
+    Every worker is reported on its status pipe: its pid once it's forked, its exit code once it exits.
+    Workers that exited are only reaped once the pool asks for it, so their pids aren't reused before.
+    """
+    connection = socket.socket(fileno=fd)
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_write, False)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+    # Interrupting suit interrupts its workers, the server only goes away once suit did.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    statuses: Dict[int, int] = {}
+    with selectors.DefaultSelector() as selector:
+        selector.register(connection, selectors.EVENT_READ)
+        selector.register(wakeup_read, selectors.EVENT_READ)
+        while True:
+            for key, _ in selector.select():
+                if key.fileobj == wakeup_read:
+                    os.read(wakeup_read, 4096)
+                    _report_exited(statuses)
+                    continue
+                message = _receive(connection)
+                if message is None:
+                    # The pool is gone.
+                    return
+                if message[0] == "reap":
+                    try:
+                        os.waitpid(message[1], 0)
+                    except ChildProcessError:
+                        pass
+                    continue
+                if message[0] == "import":
+                    for module in message[1]:
+                        try:
+                            importlib.import_module(module)
+                        except BaseException:  # pylint: disable=broad-except
+                            # The worker running it will report it.
+                            pass
+                    continue
+
+                _, command, cwd, env = message
+                stdout, stderr, status = reduction.recvfds(connection, 3)
+                pid = os.fork()
+                if pid == 0:
+                    try:
+                        for inherited in (fd, wakeup_read, wakeup_write, status, *statuses.values()):
+                            os.close(inherited)
+                        signal.set_wakeup_fd(-1)
+                        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                        signal.signal(signal.SIGINT, signal.default_int_handler)
+                        _run_command(command, cwd, env, stdout, stderr)
+                    finally:
+                        os._exit(1)  # pylint: disable=protected-access
+                os.close(stdout)
+                os.close(stderr)
+                os.write(status, _STATUS.pack(pid))
+                statuses[pid] = status
+
+
+def _receive(connection: socket.socket) -> Optional[Tuple[Any, ...]]:
+    header = _receive_exactly(connection, _LENGTH.size)
+    if header is None:
+        return None
+    payload = _receive_exactly(connection, _LENGTH.unpack(header)[0])
+    return pickle.loads(payload) if payload is not None else None
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> Optional[bytes]:
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _report_exited(statuses: Dict[int, int]):
+    """Report the exit codes of the workers that exited, leaving them unreaped."""
+    for pid, status_fd in list(statuses.items()):
+        try:
+            exited = os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+        except ChildProcessError:
+            exited = None
+        else:
+            if exited is None:
+                # Still running.
+                continue
+        del statuses[pid]
+        try:
+            if exited is not None:
+                return_code = exited.si_status if exited.si_code == os.CLD_EXITED else -exited.si_status
+                os.write(status_fd, _STATUS.pack(return_code))
+        except OSError:
+            # The process went away without waiting for it.
+            pass
+        finally:
+            os.close(status_fd)
+
+
+def _run_command(command: PythonCommand, cwd: str, env: Dict[str, str], stdout: int, stderr: int):
+    """Run `command` in this worker as the interpreter would, and exit with its exit code."""
+    os.dup2(stdout, 1)
+    os.dup2(stderr, 2)
+    os.close(stdout)
+    os.close(stderr)
+    sys.stdout = open(1, "w", encoding=sys.stdout.encoding, closefd=False)  # pylint: disable=consider-using-with
+    sys.stderr = open(  # pylint: disable=consider-using-with
+        2, "w", encoding=sys.stderr.encoding, errors="backslashreplace", buffering=1, closefd=False
+    )
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(env)
+    sys.argv = list(command.argv)
+    # `python -m` looks up modules from the working directory first, console scripts from where they're installed.
+    sys.path[0] = cwd if command.attribute is None else os.path.dirname(command.argv[0])
+
+    code = _exit_code_of(command)
+    atexit._run_exitfuncs()  # pylint: disable=protected-access
+    try:
+        sys.stdout.flush()
+    except (OSError, ValueError):
+        code = code or 120
+    try:
+        sys.stderr.flush()
+    except (OSError, ValueError):
+        pass
+    os._exit(code)  # pylint: disable=protected-access
+
+
+def _exit_code_of(command: PythonCommand) -> int:
+    try:
+        if command.attribute is None:
+            runpy.run_module(command.module, run_name="__main__", alter_sys=True)
+        else:
+            entry_point = importlib.import_module(command.module)
+            for name in command.attribute.split("."):
+                entry_point = getattr(entry_point, name)
+            # As the console scripts' wrappers do.
+            sys.exit(entry_point())
+    except SystemExit as error:
+        if error.code is None:
+            return 0
+        if isinstance(error.code, int):
+            return error.code & 0xFF
+        print(error.code, file=sys.stderr)
+        return 1
+    except BaseException:  # pylint: disable=broad-except
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+_WORKERS: Optional[WorkerPool] = None
+_WORKERS_LOCK = threading.Lock()
+
+
+def worker_pool() -> Optional[WorkerPool]:
+    """The workers of this process, or `None` where they're not available."""
+    global _WORKERS  # pylint: disable=global-statement
+    if not WorkerPool.is_available():
+        return None
+    with _WORKERS_LOCK:
+        if _WORKERS is None:
+            _WORKERS = WorkerPool()
+        return _WORKERS
@@ -6,11 +6,10 @@ from typing import Any, List, Mapping, Optional
 import tomli
 
 from .targets import TargetConfig
-from .config import SuitConfig, ProjectConfig
-
-
-def _pyproject_uses_suit(pyproject_data: Mapping[str, Any]) -> bool:
-    return "target" in pyproject_data.get("tool", {}).get("suit", {})
+from .config import DiscoveryConfig, SuitConfig, ProjectConfig
+from .discovery import DiscoveryCache, _pyproject_uses_suit, discover_targets
+from .schema import ConfigError
+from .tracing import Tracer
 
 
 def _find_root_configuration(cwd: Optional[pathlib.Path] = None) -> pathlib.Path:
@@ -43,6 +42,10 @@ class SuitCollector:
         self.__root = root
         self.__local_config = local_configurations
 
+    @property
+    def root(self) -> pathlib.Path:
+        return self.__root
+
     @classmethod
     def find_root(cls, starting_search_location: Optional[pathlib.Path] = None):
         """
@@ -58,21 +61,41 @@ class SuitCollector:
             local_configurations=local_configurations["suit"],
         )
 
-    def collect(self) -> SuitConfig:
-        """Collect all targets in the directory structure"""
-        return SuitConfig(
+    def collect(self, tracer: Optional[Tracer] = None, use_daemon: bool = True) -> SuitConfig:
+        """
+        Collect all targets in the directory structure.
+
+        When a daemon serves the root (and `use_daemon`), its warm configurations are used instead.
+        """
+        tracer = tracer or Tracer(enabled=False)
+        if use_daemon:
+            # Collecting without the daemon (as the daemon itself does) has no use for its client.
+            from .daemon.client import fetch_config  # pylint: disable=import-outside-toplevel
+
+            with tracer.span("fetch from daemon", "daemon") as span:
+                suit = fetch_config(self.__root)
+                span.args["served"] = suit is not None
+            if suit is not None:
+                return suit
+        with tracer.span("parse project config", "config"):
+            try:
+                project_config = ProjectConfig.parse_obj(self.__local_config)
+            except ConfigError as error:
+                raise error.in_source(self.__root / "suit.toml") from None
+        with tracer.span("discover targets", "discovery") as span:
+            targets = list(self.__collect_targets(project_config.discovery))
+            span.args["targets"] = len(targets)
+        return SuitConfig(self.__root, project_config=project_config, targets=targets)
+
+    def __collect_targets(self, discovery_config: DiscoveryConfig):
+        cache = DiscoveryCache.load(self.__root) if discovery_config.cache else None
+        found_targets = discover_targets(
             self.__root,
-            project_config=ProjectConfig.parse_obj(self.__local_config),
-            targets=list(self.__collect_targets()),
+            cache,
+            ignore_rules=discovery_config.ignore_rules(),
+            use_ignore_files=discovery_config.gitignore,
         )
-
-    def __collect_targets(self):
-        for found_project_file in self.__root.glob("**/pyproject.toml"):
-            with found_project_file.open("rb") as found_project_file_io:
-                project_data = tomli.load(found_project_file_io)
-                if not _pyproject_uses_suit(project_data):
-                    continue
-                yield TargetConfig.from_mapping(
-                    path=found_project_file.parent,
-                    data=project_data["tool"]["suit"]["target"],
-                )
+        for found_project_file, target_data in found_targets:
+            yield TargetConfig.from_mapping(path=found_project_file.parent, data=target_data)
+        if cache is not None:
+            cache.save()
@@ -1,39 +1,104 @@
 from __future__ import annotations
 
 import pathlib
-from typing import List, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, List, Mapping, Optional
 
-import rich.repr
-from pydantic import BaseModel, Field, validator  # pylint: disable=no-name-in-module
-
-from suit.scripts.specs import scripts_from_mapping
+from suit import schema
+from suit.dependencies import TargetGraph
+from suit.ignore import DEFAULT_EXCLUDES, IgnoreRules
+from suit.schema import ConfigError, Location
+from suit.scripts.specs import resources_from_mapping, scripts_from_mapping
 
 from .targets import ScriptSpec, TargetConfig
 
+if TYPE_CHECKING:
+    from rich.repr import RichReprResult
 
-class SuitTemplate(BaseModel):
-    scripts: Mapping[str, ScriptSpec]
-
-    @validator("scripts", pre=True)
-    def validate_scripts(cls, v):
-        return scripts_from_mapping(v)
-
-    # @classmethod
-    # def __get_validators__(cls):
-    #     yield scripts_from_mapping
-
-    class Config:
-        arbitrary_types_allowed = True
+    from suit.scripts.resolver import ScriptIndex
 
 
-class ProjectConfig(BaseModel):
-    templates: Mapping[str, SuitTemplate] = Field(default_factory=dict)
+@dataclass
+class SuitTemplate:
+    scripts: Mapping[str, ScriptSpec]
 
-    class Config:
-        arbitrary_types_allowed = True
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any], location: Location = ()) -> SuitTemplate:
+        data = schema.mapping(data, location, ("scripts",))
+        if "scripts" not in data:
+            raise ConfigError(location, "Missing key `scripts`")
+        return cls(scripts=scripts_from_mapping(data["scripts"], (*location, "scripts")))
+
+
+@dataclass
+class DiscoveryConfig:
+    cache: bool = True
+    exclude: List[str] = field(default_factory=list)
+    include: List[str] = field(default_factory=list)
+    gitignore: bool = False
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any], location: Location = ()) -> DiscoveryConfig:
+        data = schema.mapping(data, location, ("cache", "exclude", "include", "gitignore"))
+        return cls(
+            cache=schema.boolean(data.get("cache", True), (*location, "cache")),
+            exclude=schema.strings(data.get("exclude", []), (*location, "exclude")),
+            include=schema.strings(data.get("include", []), (*location, "include")),
+            gitignore=schema.boolean(data.get("gitignore", False), (*location, "gitignore")),
+        )
+
+    def ignore_rules(self) -> IgnoreRules:
+        """The default excludes, then the configured ones, then the configured includes overriding both."""
+        return IgnoreRules.from_lines([*DEFAULT_EXCLUDES, *self.exclude, *(f"!{include}" for include in self.include)])
+
+
+@dataclass
+class CacheConfig:
+    # Where results are shared between machines: an `http(s)://` URL, or a directory.
+    url: Optional[str] = None
+    upload: bool = True
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any], location: Location = ()) -> CacheConfig:
+        data = schema.mapping(data, location, ("url", "upload"))
+        return cls(
+            url=schema.string(data["url"], (*location, "url")) if "url" in data else None,
+            upload=schema.boolean(data.get("upload", True), (*location, "upload")),
+        )
+
+
+@dataclass
+class ProjectConfig:
+    templates: Mapping[str, SuitTemplate] = field(default_factory=dict)
+    discovery: DiscoveryConfig = field(default_factory=DiscoveryConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    # How much of each resource the scripts running at the same time may hold altogether.
+    resources: Mapping[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def parse_obj(cls, data: Mapping[str, Any], location: Location = ("suit",)) -> ProjectConfig:
+        """
+        Build the project configurations from the raw `suit` table of `suit.toml`.
+
+        Raises `ConfigError` locating the invalid value, when the data is invalid. Keys other than
+        `templates`, `discovery`, `cache` and `resources` are left for other tools.
+        """
+        data = schema.mapping(data, location)
+        templates = schema.mapping(data.get("templates", {}), (*location, "templates"))
+        resources = resources_from_mapping(data.get("resources", {}), (*location, "resources"))
+        if "cpu" in resources:
+            raise ConfigError((*location, "resources", "cpu"), "The cpu budget is the amount of jobs, set by `--jobs`")
+        return cls(
+            templates={
+                name: SuitTemplate.from_mapping(template, (*location, "templates", name))
+                for name, template in templates.items()
+            },
+            discovery=DiscoveryConfig.from_mapping(data.get("discovery", {}), (*location, "discovery")),
+            cache=CacheConfig.from_mapping(data.get("cache", {}), (*location, "cache")),
+            resources=resources,
+        )
 
 
-@rich.repr.auto()
 class SuitConfig:
     """
     The general suit configurations.
@@ -48,6 +113,8 @@ class SuitConfig:
         self.__root = root
         self.__project_config = project_config
         self.__targets = {str(target.path.relative_to(root)): target for target in targets}
+        self.__scripts: Optional[ScriptIndex] = None
+        self.__dependencies: Optional[TargetGraph] = None
 
     @property
     def root(self) -> pathlib.Path:
@@ -61,7 +128,31 @@ class SuitConfig:
     def targets(self) -> Mapping[str, TargetConfig]:
         return self.__targets
 
-    def __rich_repr__(self) -> rich.repr.RichReprResult:
+    @property
+    def dependencies(self) -> TargetGraph:
+        """The dependencies between the targets. Raises if they're missing, or cyclic."""
+        if self.__dependencies is None:
+            self.__dependencies = TargetGraph(
+                {target_name: target.data.depends_on for target_name, target in self.__targets.items()}
+            )
+        return self.__dependencies
+
+    @property
+    def scripts(self) -> ScriptIndex:
+        """The resolved scripts of the targets, resolved lazily and only once."""
+        if self.__scripts is None:
+            # The resolver depends on this module, so it can only be imported once it's loaded.
+            from suit.scripts.resolver import ScriptIndex  # pylint: disable=import-outside-toplevel
+
+            self.__scripts = ScriptIndex(self)
+        return self.__scripts
+
+    def __rich_repr__(self) -> RichReprResult:
         yield "root", self.__root
         yield "project_config", self.__project_config
         yield "targets", self.__targets
+
+    def __repr__(self) -> str:
+        # Same as what `rich.repr.auto` would generate, without importing rich along with the config.
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.__rich_repr__())
+        return f"{type(self).__name__}({fields})"
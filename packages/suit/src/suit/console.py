@@ -1,3 +1,5 @@
+from typing import IO
+
 from rich.console import Console
 import os
 
@@ -5,3 +7,14 @@ console = Console(
     log_path=False,
     width=int(os.environ["SUIT_SCREEN_WIDTH"]) if "SUIT_SCREEN_WIDTH" in os.environ else None,
 )
+
+
+def buffered_console(file: IO[str]) -> Console:
+    """Create a console that writes into `file`, rendering exactly like the main console would."""
+    return Console(
+        file=file,
+        log_path=False,
+        width=console.width,
+        force_terminal=console.is_terminal,
+        color_system=console.color_system,
+    )
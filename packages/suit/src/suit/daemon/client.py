@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+from typing import Any, Dict, Optional, Tuple
+
+from suit.config import SuitConfig
+
+DAEMON_SOCKET = pathlib.Path(".suit", "daemon.sock")
+# Setting this environment variable (to anything) makes suit collect the configurations itself.
+NO_DAEMON_VARIABLE = "SUIT_NO_DAEMON"
+PROTOCOL_VERSION = 1
+_TIMEOUT_SECONDS = 10.0
+
+
+class DaemonUnavailable(Exception):
+    def __init__(self, socket_path: pathlib.Path, reason: str):
+        super().__init__(f"No suit daemon is serving at {socket_path}: {reason}")
+        self.socket_path = socket_path
+        self.reason = reason
+
+
+def request_daemon(root: pathlib.Path, request: str) -> Tuple[Dict[str, Any], bytes]:
+    """
+    Send `request` to the daemon serving `root`, returning the header and the payload of its response.
+
+    Raises `DaemonUnavailable` if no daemon answers, or if it refuses the request.
+    """
+    import socket  # pylint: disable=import-outside-toplevel
+
+    socket_path = root / DAEMON_SOCKET
+    chunks = []
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(_TIMEOUT_SECONDS)
+            connection.connect(str(socket_path))
+            connection.sendall(json.dumps({"request": request, "protocol": PROTOCOL_VERSION}).encode() + b"\n")
+            while True:
+                chunk = connection.recv(1 << 16)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError as error:
+        raise DaemonUnavailable(socket_path, str(error)) from None
+
+    header_line, _, payload = b"".join(chunks).partition(b"\n")
+    try:
+        header = json.loads(header_line)
+    except ValueError:
+        raise DaemonUnavailable(socket_path, "Invalid response") from None
+    if not header.get("ok"):
+        raise DaemonUnavailable(socket_path, header.get("error") or "Request refused")
+    return header, payload
+
+
+def fetch_config(root: pathlib.Path) -> Optional[SuitConfig]:
+    """
+    The configurations of `root`, as collected by the daemon serving it - if there's one to trust.
+
+    The configurations arrive pickled, so only a socket owned by the current user is trusted. Any
+    problem with the daemon returns `None`, for the caller to collect the configurations itself.
+    """
+    if os.environ.get(NO_DAEMON_VARIABLE) or not hasattr(os, "getuid"):
+        return None
+    try:
+        if os.stat(root / DAEMON_SOCKET).st_uid != os.getuid():
+            return None
+        _, payload = request_daemon(root, "config")
+    except (OSError, DaemonUnavailable):
+        return None
+
+    import pickle  # pylint: disable=import-outside-toplevel
+
+    try:
+        suit = pickle.loads(payload)
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError, ValueError):
+        # A daemon started by another version of suit may pickle what this one can't load.
+        return None
+    if not isinstance(suit, SuitConfig) or suit.root != root:
+        return None
+    return suit
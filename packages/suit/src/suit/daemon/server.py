@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import socketserver
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from suit.warm import CONFIGURATION_FILE_NAMES, WarmSuit
+from suit.watcher import PollingWatcher, TreeWatcher, create_watcher
+
+from .client import DAEMON_SOCKET, PROTOCOL_VERSION, DaemonUnavailable, request_daemon
+
+# How often the watcher is checked for changes in the background, and how long stopping may take.
+_REFRESH_INTERVAL_SECONDS = 1.0
+_MAX_REQUEST_SIZE = 1 << 12
+
+
+class DaemonAlreadyRunning(Exception):
+    def __init__(self, socket_path: pathlib.Path):
+        super().__init__(f"A suit daemon is already serving at {socket_path}")
+        self.socket_path = socket_path
+
+
+class SuitDaemon:
+    """
+    Serve the warm configurations of a root over a Unix socket, until asked to stop.
+
+    The configurations are refreshed whenever the watcher reports a change - in the background, and
+    before answering every request, so answers always reflect the files as they were when asked.
+    """
+
+    def __init__(
+        self,
+        root: pathlib.Path,
+        watcher: Optional[TreeWatcher] = None,
+        log: Callable[[str], None] = lambda message: None,
+    ):
+        self.__root = root
+        self.__warm = WarmSuit(root)
+        self.__watcher = watcher or create_watcher(CONFIGURATION_FILE_NAMES)
+        self.__log = log
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+        self.__server: Optional[_DaemonServer] = None
+        self.__started_at = time.time()
+        self.__refreshed_at = self.__started_at
+
+    @property
+    def socket_path(self) -> pathlib.Path:
+        return self.__root / DAEMON_SOCKET
+
+    def serve(self):
+        """Serve until stopped. Raises `DaemonAlreadyRunning` if another daemon serves the same root."""
+        try:
+            request_daemon(self.__root, "status")
+        except DaemonUnavailable:
+            pass
+        else:
+            raise DaemonAlreadyRunning(self.socket_path)
+
+        with self.__lock:
+            self.__sync(force=True)
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        # Only the current user may connect, as the configurations are sent pickled.
+        umask = os.umask(0o077)
+        try:
+            self.__server = _DaemonServer(str(self.socket_path), self)
+        finally:
+            os.umask(umask)
+
+        refresher = threading.Thread(target=self.__keep_fresh, name="suit-daemon-refresher", daemon=True)
+        refresher.start()
+        self.__log(f"Serving {self.__root} at {self.socket_path}, watching with {self.__watcher.name}")
+        try:
+            self.__server.serve_forever(poll_interval=_REFRESH_INTERVAL_SECONDS)
+        finally:
+            self.__stopped.set()
+            self.__server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            refresher.join()
+            self.__watcher.close()
+
+    def stop(self):
+        self.__stopped.set()
+        if self.__server is not None:
+            # Shutting down waits for the serving loop to exit, which may be the caller's.
+            threading.Thread(target=self.__server.shutdown, daemon=True).start()
+
+    def handle(self, request: Mapping[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+        """Answer `request`, returning the header and the payload of the response."""
+        if request.get("protocol") != PROTOCOL_VERSION:
+            return {"ok": False, "error": f"Unsupported protocol {request.get('protocol')!r}"}, b""
+        kind = request.get("request")
+        if kind == "stop":
+            self.stop()
+            return {"ok": True}, b""
+
+        with self.__lock:
+            self.__sync()
+            if kind == "status":
+                return {"ok": True, **self.__status()}, b""
+            if kind == "config":
+                if self.__warm.suit is None:
+                    return {"ok": False, "error": self.__warm.error}, b""
+                return {"ok": True}, self.__warm.snapshot()
+        return {"ok": False, "error": f"Unknown request {kind!r}"}, b""
+
+    def __status(self) -> Dict[str, Any]:
+        suit = self.__warm.suit
+        return {
+            "pid": os.getpid(),
+            "root": str(self.__root),
+            "watcher": self.__watcher.name,
+            "targets": len(suit.targets) if suit is not None else None,
+            "error": self.__warm.error,
+            "started_at": self.__started_at,
+            "refreshed_at": self.__refreshed_at,
+        }
+
+    def __keep_fresh(self):
+        while not self.__stopped.is_set():
+            self.__watcher.wait(_REFRESH_INTERVAL_SECONDS)
+            with self.__lock:
+                if not self.__stopped.is_set():
+                    self.__sync()
+
+    def __sync(self, force: bool = False):
+        if not (self.__watcher.changed() or force):
+            return
+        try:
+            changed = self.__warm.refresh_watching(self.__watcher)
+        except OSError as error:
+            self.__log(f"Can't watch the tree anymore ({error}), polling it instead")
+            self.__watcher.close()
+            self.__watcher = PollingWatcher(CONFIGURATION_FILE_NAMES)
+            changed = self.__warm.refresh_watching(self.__watcher)
+        if changed:
+            self.__refreshed_at = time.time()
+            suit = self.__warm.suit
+            self.__log(
+                f"Invalid configurations: {self.__warm.error}"
+                if suit is None
+                else f"Refreshed {len(suit.targets)} targets"
+            )
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    server: _DaemonServer
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline(_MAX_REQUEST_SIZE))
+        except ValueError:
+            return
+        if not isinstance(request, dict):
+            return
+        header, payload = self.server.daemon.handle(request)
+        self.wfile.write(json.dumps(header).encode() + b"\n" + payload)
+
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon: SuitDaemon):
+        super().__init__(socket_path, _DaemonRequestHandler)
+        self.daemon = daemon
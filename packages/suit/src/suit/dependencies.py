@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Sequence, Set
+
+
+class TargetCycleError(Exception):
+    def __init__(self, cycle: List[str]):
+        super().__init__(f"Targets depend on each other in a cycle: {' -> '.join(cycle)}")
+        self.cycle = cycle
+
+
+class UnknownTargetError(Exception):
+    def __init__(self, target_name: str, dependency_name: str):
+        super().__init__(f"Target '{target_name}' depends on a missing target '{dependency_name}'")
+        self.target_name = target_name
+        self.dependency_name = dependency_name
+
+
+class TargetGraph:
+    """
+    The dependencies between targets, as declared by their `depends_on`.
+
+    Targets are kept in a topological order - every target comes after its dependencies, and otherwise
+    targets keep the order they were given in.
+    """
+
+    def __init__(self, dependencies: Mapping[str, Sequence[str]]):
+        for target_name, dependency_names in dependencies.items():
+            for dependency_name in dependency_names:
+                if dependency_name not in dependencies:
+                    raise UnknownTargetError(target_name, dependency_name)
+        self.__dependencies = {name: tuple(dict.fromkeys(deps)) for name, deps in dependencies.items()}
+        self.__order = self.__topological_order()
+        self.__transitive: Dict[str, List[str]] = {}
+
+    @property
+    def order(self) -> List[str]:
+        return self.__order
+
+    def dependencies_of(self, target_name: str) -> Sequence[str]:
+        """The targets `target_name` directly depends on."""
+        return self.__dependencies[target_name]
+
+    def all_dependencies_of(self, target_name: str) -> List[str]:
+        """Every target `target_name` depends on, directly or not, in topological order."""
+        transitive = self.__transitive.get(target_name)
+        if transitive is None:
+            found: Set[str] = set()
+            pending = list(self.__dependencies[target_name])
+            while pending:
+                dependency_name = pending.pop()
+                if dependency_name not in found:
+                    found.add(dependency_name)
+                    pending.extend(self.__dependencies[dependency_name])
+            transitive = self.__transitive[target_name] = [name for name in self.__order if name in found]
+        return transitive
+
+    def with_dependents(self, target_names: Iterable[str]) -> Set[str]:
+        """`target_names`, along with every target depending on them, directly or not."""
+        selected = set(target_names)
+        for target_name in self.__order:
+            if any(dependency_name in selected for dependency_name in self.__dependencies[target_name]):
+                selected.add(target_name)
+        return selected
+
+    def __topological_order(self) -> List[str]:
+        order: List[str] = []
+        done: Set[str] = set()
+        visiting: List[str] = []
+
+        def visit(target_name: str):
+            if target_name in done:
+                return
+            if target_name in visiting:
+                raise TargetCycleError([*visiting[visiting.index(target_name) :], target_name])
+            visiting.append(target_name)
+            for dependency_name in self.__dependencies[target_name]:
+                visit(dependency_name)
+            visiting.pop()
+            done.add(target_name)
+            order.append(target_name)
+
+        for target_name in self.__dependencies:
+            visit(target_name)
+        return order
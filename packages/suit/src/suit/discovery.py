@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+import tomli
+
+from .ignore import DEFAULT_EXCLUDES, IgnoreRules
+
+CACHE_DIRECTORY = pathlib.Path(".suit", "cache")
+_CACHE_FILE_NAME = "discovery.json"
+_CACHE_VERSION = 2
+_PROJECT_FILE_NAME = "pyproject.toml"
+_IGNORE_FILE_NAME = ".gitignore"
+# Filesystem timestamps may lag behind the clock, so anything modified shortly before a discovery
+# started is suspected to have been modified during it.
+_RACY_MARGIN_NS = 1_000_000_000
+
+
+def _pyproject_uses_suit(pyproject_data: Mapping[str, Any]) -> bool:
+    return "target" in pyproject_data.get("tool", {}).get("suit", {})
+
+
+def _may_use_suit(raw_project_data: bytes) -> bool:
+    """
+    Whether a raw `pyproject.toml` might configure suit, without parsing it.
+
+    However the `tool.suit` table is spelled (dotted keys, inline tables, spacing), its key must
+    appear, so a file not mentioning `suit` at all surely doesn't use it.
+    """
+    return b"suit" in raw_project_data
+
+
+def _parse_pyproject(path: str) -> Optional[Mapping[str, Any]]:
+    """Parse a `pyproject.toml` file, returning its suit target table if it has one."""
+    with open(path, "rb") as project_file_io:
+        raw_project_data = project_file_io.read()
+    if not _may_use_suit(raw_project_data):
+        return None
+    project_data = tomli.loads(raw_project_data.decode("utf-8"))
+    if not _pyproject_uses_suit(project_data):
+        return None
+    return project_data["tool"]["suit"]["target"]
+
+
+def _read_ignore_file(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8", errors="replace") as ignore_file_io:
+        return ignore_file_io.read().splitlines()
+
+
+@dataclass
+class _DirectoryEntry:
+    mtime_ns: int
+    subdirectories: List[str]
+    has_project_file: bool
+    has_ignore_file: bool
+
+
+@dataclass
+class _FileEntry:
+    """A file's stat, along with what was read from it - a target table, or the lines of an ignore file."""
+
+    mtime_ns: int
+    size: int
+    content: Any
+
+
+class DiscoveryCache:
+    """
+    What the previous discovery found: every directory under the root, and every file read in them.
+
+    A directory whose mtime did not change since it was recorded has exactly the same entries, so it
+    does not need to be listed again. A file whose mtime and size did not change does not need to be
+    read again. Entries modified after the previous discovery started are never trusted, as
+    they may have changed again within the same timestamp granularity.
+
+    A cache without a `path` lives only in memory, and is never saved.
+    """
+
+    def __init__(
+        self,
+        path: Optional[pathlib.Path] = None,
+        directories: Optional[Dict[str, _DirectoryEntry]] = None,
+        files: Optional[Dict[str, _FileEntry]] = None,
+        scanned_at_ns: int = 0,
+    ):
+        self.__path = path
+        self.__directories = directories or {}
+        self.__files = files or {}
+        self.__scanned_at_ns = scanned_at_ns
+
+    @classmethod
+    def load(cls, root: pathlib.Path) -> DiscoveryCache:
+        """Load the cache stored under `root`, or start an empty one if it's missing or unreadable."""
+        path = root / CACHE_DIRECTORY / _CACHE_FILE_NAME
+        try:
+            with path.open("r", encoding="utf-8") as cache_io:
+                raw = json.load(cache_io)
+            if raw.get("version") != _CACHE_VERSION:
+                return cls(path)
+            return cls(
+                path,
+                directories={name: _DirectoryEntry(**entry) for name, entry in raw["directories"].items()},
+                files={name: _FileEntry(**entry) for name, entry in raw["files"].items()},
+                scanned_at_ns=raw["scanned_at_ns"],
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls(path)
+
+    def save(self):
+        """
+        Store the cache, atomically. Failing to store it is not an error - it's only a cache.
+
+        Files whose content JSON can't hold as it is, such as target tables with TOML dates, are left
+        out, to be read again by the next discovery.
+        """
+        if self.__path is None:
+            return
+        raw = {
+            "version": _CACHE_VERSION,
+            "scanned_at_ns": self.__scanned_at_ns,
+            "directories": {name: asdict(entry) for name, entry in self.__directories.items()},
+            "files": {name: asdict(entry) for name, entry in self.__files.items() if _is_json(entry.content)},
+        }
+        temporary_path = self.__path.with_name(f"{self.__path.name}.{os.getpid()}.tmp")
+        try:
+            self.__path.parent.mkdir(parents=True, exist_ok=True)
+            with temporary_path.open("w", encoding="utf-8") as cache_io:
+                json.dump(raw, cache_io)
+            os.replace(temporary_path, self.__path)
+        except (OSError, TypeError, ValueError):
+            temporary_path.unlink(missing_ok=True)
+
+    @property
+    def directory_names(self) -> List[str]:
+        """The directories found by the last discovery, relative to the root (which is `""`)."""
+        return list(self.__directories)
+
+    def directory(self, name: str, mtime_ns: int) -> Optional[_DirectoryEntry]:
+        entry = self.__directories.get(name)
+        if entry is None or entry.mtime_ns != mtime_ns or mtime_ns >= self.__scanned_at_ns:
+            return None
+        return entry
+
+    def file(self, name: str, stat: os.stat_result) -> Optional[_FileEntry]:
+        entry = self.__files.get(name)
+        if (
+            entry is None
+            or entry.mtime_ns != stat.st_mtime_ns
+            or entry.size != stat.st_size
+            or stat.st_mtime_ns >= self.__scanned_at_ns
+        ):
+            return None
+        return entry
+
+    def replace(
+        self,
+        directories: Dict[str, _DirectoryEntry],
+        files: Dict[str, _FileEntry],
+        scanned_at_ns: int,
+    ):
+        self.__directories = directories
+        self.__files = files
+        self.__scanned_at_ns = scanned_at_ns
+
+
+def _is_json(value: Any) -> bool:
+    """Whether `value` is stored in JSON as it is, and loaded back the same."""
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_json(item) for key, item in value.items())
+    if isinstance(value, list):
+        return all(_is_json(item) for item in value)
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _list_directory(path: str, mtime_ns: int) -> _DirectoryEntry:
+    subdirectories = []
+    has_project_file = has_ignore_file = False
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    subdirectories.append(entry.name)
+                elif entry.name == _PROJECT_FILE_NAME and entry.is_file():
+                    has_project_file = True
+                elif entry.name == _IGNORE_FILE_NAME and entry.is_file():
+                    has_ignore_file = True
+            except OSError:
+                continue
+    return _DirectoryEntry(mtime_ns, sorted(subdirectories), has_project_file, has_ignore_file)
+
+
+def _join(directory: str, name: str) -> str:
+    return f"{directory}/{name}" if directory else name
+
+
+def discover_targets(
+    root: pathlib.Path,
+    cache: Optional[DiscoveryCache] = None,
+    ignore_rules: Optional[IgnoreRules] = None,
+    use_ignore_files: bool = False,
+    max_workers: Optional[int] = None,
+) -> Iterator[Tuple[pathlib.Path, Mapping[str, Any]]]:
+    """
+    Find every `pyproject.toml` under `root` that configures a suit target.
+
+    Yields the path of each such file along with its target table. Directories matching `ignore_rules`
+    are not descended into, nor are the ones ignored by `.gitignore` files when `use_ignore_files`.
+    Unchanged directories and files are taken from `cache`, which is updated once the walk is done;
+    the other project files are parsed concurrently, by up to `max_workers` threads.
+    """
+    if cache is None:
+        cache = DiscoveryCache()
+    if ignore_rules is None:
+        ignore_rules = IgnoreRules.from_lines(DEFAULT_EXCLUDES)
+
+    scan_started_ns = time.time_ns() - _RACY_MARGIN_NS
+    directories: Dict[str, _DirectoryEntry] = {}
+    files: Dict[str, _FileEntry] = {}
+    stale_project_files: Dict[str, os.stat_result] = {}
+    found_project_files: List[str] = []
+    visited: Set[Tuple[int, int]] = set()
+
+    pending = [("", ignore_rules)]
+    while pending:
+        name, rules = pending.pop()
+        path = os.path.join(root, name)
+        try:
+            stat = os.stat(path)
+            if (stat.st_dev, stat.st_ino) in visited:
+                # Symbolic links looping back up the tree.
+                continue
+            visited.add((stat.st_dev, stat.st_ino))
+            directory = cache.directory(name, stat.st_mtime_ns) or _list_directory(path, stat.st_mtime_ns)
+        except OSError:
+            continue
+        directories[name] = directory
+
+        if use_ignore_files and directory.has_ignore_file:
+            ignore_file = _read_file(root, _join(name, _IGNORE_FILE_NAME), cache, _read_ignore_file)
+            if ignore_file is not None:
+                files[_join(name, _IGNORE_FILE_NAME)] = ignore_file
+                rules = rules.extended(ignore_file.content, base=name)
+
+        if directory.has_project_file:
+            project_file_name = _join(name, _PROJECT_FILE_NAME)
+            try:
+                project_file_stat = os.stat(os.path.join(root, project_file_name))
+            except OSError:
+                project_file_stat = None
+            if project_file_stat is not None:
+                found_project_files.append(project_file_name)
+                cached = cache.file(project_file_name, project_file_stat)
+                if cached is not None:
+                    files[project_file_name] = cached
+                else:
+                    stale_project_files[project_file_name] = project_file_stat
+
+        for subdirectory in reversed(directory.subdirectories):
+            subdirectory_name = _join(name, subdirectory)
+            if not rules.is_ignored(subdirectory_name, is_directory=True):
+                pending.append((subdirectory_name, rules))
+
+    files.update(_parse_project_files(root, stale_project_files, max_workers))
+    cache.replace(directories, files, scan_started_ns)
+
+    for project_file_name in found_project_files:
+        project_file = files.get(project_file_name)
+        if project_file is not None and project_file.content is not None:
+            yield root / project_file_name, project_file.content
+
+
+def _read_file(
+    root: pathlib.Path, name: str, cache: DiscoveryCache, read: Callable[[str], Any]
+) -> Optional[_FileEntry]:
+    path = os.path.join(root, name)
+    try:
+        stat = os.stat(path)
+        return cache.file(name, stat) or _FileEntry(stat.st_mtime_ns, stat.st_size, read(path))
+    except OSError:
+        return None
+
+
+def _parse_project_files(
+    root: pathlib.Path, stats: Mapping[str, os.stat_result], max_workers: Optional[int]
+) -> Dict[str, _FileEntry]:
+    def parse(name: str) -> _FileEntry:
+        stat = stats[name]
+        return _FileEntry(stat.st_mtime_ns, stat.st_size, _parse_pyproject(os.path.join(root, name)))
+
+    if len(stats) <= 1:
+        return {name: parse(name) for name in stats}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(stats, pool.map(parse, stats)))
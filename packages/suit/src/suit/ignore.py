@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Pattern, Tuple
+
+DEFAULT_EXCLUDES = (
+    ".git/",
+    ".hg/",
+    ".svn/",
+    ".suit/",
+    ".venv/",
+    "venv/",
+    ".tox/",
+    ".nox/",
+    "node_modules/",
+    "site-packages/",
+    "__pycache__/",
+    ".mypy_cache/",
+    ".pytest_cache/",
+    "*.egg-info/",
+    "build/",
+    "dist/",
+)
+
+
+@dataclass(frozen=True)
+class _IgnorePattern:
+    regex: Pattern[str]
+    base: str
+    negated: bool
+    directories_only: bool
+    anchored: bool
+
+    def matches(self, path: str, is_directory: bool) -> bool:
+        if self.directories_only and not is_directory:
+            return False
+        if self.base:
+            if not path.startswith(self.base + "/"):
+                return False
+            path = path[len(self.base) + 1 :]
+        if not self.anchored:
+            path = path.rsplit("/", 1)[-1]
+        return self.regex.fullmatch(path) is not None
+
+
+def _translate(glob: str) -> str:
+    """Translate a gitignore-style glob into a regular expression."""
+    result = []
+    index = 0
+    while index < len(glob):
+        char = glob[index]
+        if glob.startswith("**/", index):
+            result.append("(?:.*/)?")
+            index += 3
+            continue
+        if glob.startswith("**", index):
+            result.append(".*")
+            index += 2
+            continue
+        if char == "*":
+            result.append("[^/]*")
+        elif char == "?":
+            result.append("[^/]")
+        elif char == "[":
+            closing = glob.find("]", index + 2)
+            if closing == -1:
+                result.append(re.escape(char))
+            else:
+                group = glob[index + 1 : closing]
+                if group.startswith("!"):
+                    group = "^" + group[1:]
+                result.append(f"[{group}]")
+                index = closing
+        elif char == "\\" and index + 1 < len(glob):
+            index += 1
+            result.append(re.escape(glob[index]))
+        else:
+            result.append(re.escape(char))
+        index += 1
+    return "".join(result)
+
+
+def _compile(line: str, base: str) -> Tuple[_IgnorePattern, ...]:
+    line = line.rstrip("\n")
+    if not line.strip() or line.startswith("#"):
+        return ()
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    if line.startswith("\\"):
+        line = line[1:]
+    if not line.endswith("\\ "):
+        line = line.rstrip(" ")
+
+    directories_only = line.endswith("/")
+    line = line.rstrip("/")
+    # A slash anywhere but at the end anchors the pattern to the directory it was defined in.
+    anchored = "/" in line
+    line = line.lstrip("/")
+    if not line:
+        return ()
+    return (_IgnorePattern(re.compile(_translate(line)), base, negated, directories_only, anchored),)
+
+
+class IgnoreRules:
+    """
+    Decide which paths under the root are ignored, following `.gitignore` semantics.
+
+    Paths are relative to the root and `/` separated. Patterns are considered in order, and the last one
+    matching a path decides whether it's ignored - so a later `!pattern` re-includes what earlier
+    patterns ignored.
+    """
+
+    def __init__(self, patterns: Tuple[_IgnorePattern, ...] = ()):
+        self.__patterns = patterns
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], base: str = "") -> IgnoreRules:
+        return cls().extended(lines, base)
+
+    def extended(self, lines: Iterable[str], base: str = "") -> IgnoreRules:
+        """New rules, where `lines` of a `.gitignore` file found at `base` take precedence over these."""
+        added = tuple(pattern for line in lines for pattern in _compile(line, base))
+        if not added:
+            return self
+        return IgnoreRules(self.__patterns + added)
+
+    def is_ignored(self, path: str, is_directory: bool) -> bool:
+        for pattern in reversed(self.__patterns):
+            if pattern.matches(path, is_directory):
+                return not pattern.negated
+        return False
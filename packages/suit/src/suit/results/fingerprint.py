@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+from typing import Dict, Iterable, Optional
+
+from suit.scripts.types import ShellScript
+
+_FINGERPRINT_VERSION = "2"
+# Stands for the root in the fingerprinted commands, so checkouts in different places share results.
+_ROOT_MARKER = "{root}"
+_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_files(base: pathlib.Path, globs: Iterable[str]) -> Dict[str, str]:
+    """The SHA-256 of every file matching `globs` under `base`, by their `/` separated relative path."""
+    paths = sorted({path for glob in globs for path in base.glob(_files_glob(glob)) if path.is_file()})
+    return {path.relative_to(base).as_posix(): _hash_file(path) for path in paths}
+
+
+def _files_glob(glob: str) -> str:
+    """
+    `glob`, matching the files under the directories it ends with.
+
+    Before Python 3.13, a trailing `**` (as in `src/**`) matches only directories.
+    """
+    if glob == "**" or glob.endswith("/**"):
+        return f"{glob}/*"
+    return glob
+
+
+def _hash_file(path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as file_io:
+        for chunk in iter(lambda: file_io.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _working_directory(root: str) -> str:
+    cwd = os.getcwd()
+    try:
+        return pathlib.Path(os.path.relpath(cwd, root)).as_posix()
+    except ValueError:
+        # On another drive than the root.
+        return cwd
+
+
+def fingerprint(shell_script: ShellScript, command: str) -> Optional[str]:
+    """
+    A hash of everything that determines the outcome of running `shell_script` as `command`.
+
+    That is its target, the command, the args, the working directory, the declared input and output
+    globs, and the content of every input file. Scripts without declared inputs have no fingerprint,
+    as there's no telling what their outcome depends on.
+
+    Paths are taken relative to the root, so the same tree checked out elsewhere has the same fingerprints.
+    """
+    specs = shell_script.specs
+    if not specs.inputs:
+        return None
+
+    digest = hashlib.sha256()
+
+    def update(label: str, value: str):
+        encoded = value.encode("utf-8")
+        digest.update(f"{label}:{len(encoded)}:".encode("utf-8"))
+        digest.update(encoded)
+
+    update("version", _FINGERPRINT_VERSION)
+    update("target", shell_script.target.path.relative_to(shell_script.suit.root).as_posix())
+    root = str(shell_script.suit.root)
+    update("command", command.replace(root, _ROOT_MARKER))
+    update("args", json.dumps([shell_script.target.data.args, dict(specs.args)], sort_keys=True, default=str))
+    update("cwd", _working_directory(root))
+    update("globs", json.dumps([specs.inputs, specs.outputs]))
+    for name, file_digest in hash_files(shell_script.target.path, specs.inputs).items():
+        update("input", name)
+        update("digest", file_digest)
+    return digest.hexdigest()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import gzip
+import http.client
+import threading
+import urllib.parse
+import zlib
+from typing import Dict, Optional, Tuple
+
+from .shared import CacheBackend
+
+DEFAULT_TIMEOUT_SECONDS = 30.0
+# Outputs are often compressed already (wheels, tarballs), so a fast level gets most of the gain.
+_COMPRESS_LEVEL = 1
+
+
+class HTTPBackend(CacheBackend):
+    """
+    A cache served over HTTP: blobs are fetched with GET and stored with PUT, under a base URL.
+
+    Any server that stores what's PUT and serves it back will do, such as nginx's WebDAV module.
+    Blobs are stored compressed with gzip. Every thread keeps its own connection open between requests.
+    """
+
+    def __init__(self, url: str, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+        parsed = urllib.parse.urlsplit(url)
+        self.__connection_type = (
+            http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+        )
+        self.__host = parsed.hostname or ""
+        self.__port = parsed.port
+        self.__base_path = parsed.path.rstrip("/")
+        self.__timeout = timeout
+        self.__local = threading.local()
+
+    def load(self, path: str) -> Optional[bytes]:
+        status, body = self.__request("GET", path)
+        if status == 404:
+            return None
+        if status != 200:
+            raise OSError(f"GET {path} answered with status {status}")
+        try:
+            return gzip.decompress(body)
+        except (OSError, EOFError, zlib.error):
+            # Not written by suit, or truncated.
+            return None
+
+    def save(self, path: str, data: bytes):
+        status, _ = self.__request("PUT", path, gzip.compress(data, compresslevel=_COMPRESS_LEVEL))
+        if status not in (200, 201, 204):
+            raise OSError(f"PUT {path} answered with status {status}")
+
+    def __request(self, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, bytes]:
+        try:
+            return self.__send(method, path, body)
+        except (OSError, http.client.HTTPException):
+            # The server may have closed a connection that was kept open for long, so try once more on a new one.
+            try:
+                return self.__send(method, path, body)
+            except (OSError, http.client.HTTPException) as error:
+                raise OSError(f"{method} {path} failed: {error}") from error
+
+    def __send(self, method: str, path: str, body: Optional[bytes]) -> Tuple[int, bytes]:
+        headers: Dict[str, str] = {"Content-Type": "application/octet-stream"} if body is not None else {}
+        connection = self.__connection()
+        try:
+            connection.request(method, f"{self.__base_path}/{path}", body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except BaseException:
+            connection.close()
+            self.__local.connection = None
+            raise
+
+    def __connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self.__local, "connection", None)
+        if connection is None:
+            connection = self.__local.connection = self.__connection_type(
+                self.__host, self.__port, timeout=self.__timeout
+            )
+        return connection
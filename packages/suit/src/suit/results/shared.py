@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import abc
+import hashlib
+import json
+import os
+import pathlib
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Callable, Dict, Mapping, Optional, TypeVar
+
+from .store import ScriptResult
+
+CACHE_URL_VARIABLE = "SUIT_CACHE_URL"
+DEFAULT_TRANSFERS = 8
+
+_T = TypeVar("_T")
+
+
+class CacheBackend(metaclass=abc.ABCMeta):
+    """
+    Where shared results are kept: opaque bytes, by paths such as `ac/<key>` and `cas/<digest>`.
+
+    Backends are used from many threads at once, and raise `OSError` when the cache can't be reached.
+    """
+
+    @abc.abstractmethod
+    def load(self, path: str) -> Optional[bytes]:
+        """The bytes kept at `path`, or `None` if there are none."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def save(self, path: str, data: bytes):
+        raise NotImplementedError
+
+
+class DirectoryBackend(CacheBackend):
+    """A cache in a local directory, such as a mounted volume shared by the machines."""
+
+    def __init__(self, directory: pathlib.Path):
+        self.__directory = directory
+
+    def load(self, path: str) -> Optional[bytes]:
+        try:
+            return self.__directory.joinpath(path).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def save(self, path: str, data: bytes):
+        target = self.__directory / path
+        temporary_path = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_bytes(data)
+            os.replace(temporary_path, target)
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+
+class SharedResults:
+    """
+    Results shared between machines, restoring the outputs and the logs of scripts that ran elsewhere.
+
+    A result is recorded under `ac/<key>`, as the digests of its outputs and of its logs. Their content
+    is kept once per digest, under `cas/<digest>`. Blobs are moved concurrently, and a result is only
+    recorded once all of its blobs are, so it never refers to missing ones. The key is a hash of the
+    fingerprint and of `platform_tag`, so results are only shared between machines of the same
+    platform and Python.
+
+    The cache is an optimization: once it can't be reached, it's left alone for the rest of the run.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        upload: bool = True,
+        transfers: int = DEFAULT_TRANSFERS,
+        platform_tag: Optional[str] = None,
+    ):
+        self.__backend = backend
+        self.__upload = upload
+        self.__platform_tag = platform_tag if platform_tag is not None else _platform_tag()
+        self.__pool = ThreadPoolExecutor(max_workers=transfers, thread_name_prefix="suit-cache")
+        self.__error: Optional[str] = None
+
+    @property
+    def error(self) -> Optional[str]:
+        """Why the cache was left alone, if it was."""
+        return self.__error
+
+    def restore(self, key: str, base: pathlib.Path) -> Optional[bytes]:
+        """Restore the outputs of the result recorded under `key` into `base`, returning its logs (`None` on a miss)."""
+        data = self.__guarded(lambda: self.__backend.load(self.__result_path(key)))
+        result = _parse_result(data) if data is not None else None
+        if result is None:
+            return None
+        digests = list({*result.outputs.values(), *([result.log] if result.log is not None else [])})
+        blobs = self.__guarded(lambda: dict(zip(digests, self.__pool.map(self.__load_blob, digests))))
+        if blobs is None or any(blob is None for blob in blobs.values()):
+            return None
+
+        for name, digest in result.outputs.items():
+            path = base / name
+            temporary_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temporary_path.write_bytes(blobs[digest])
+                os.replace(temporary_path, path)
+            finally:
+                temporary_path.unlink(missing_ok=True)
+        return blobs[result.log] if result.log is not None else b""
+
+    def record(self, key: str, base: pathlib.Path, outputs: Mapping[str, str], log: bytes):
+        """Share the result of a successful run: its outputs, with their digests, under `base`, and its logs."""
+        if not self.__upload or self.__error is not None:
+            return
+        log_digest = hashlib.sha256(log).hexdigest() if log else None
+        uploads: Dict[str, Callable[[], bytes]] = {
+            digest: (base / name).read_bytes for name, digest in outputs.items()
+        }
+        if log_digest is not None:
+            uploads[log_digest] = lambda: log
+
+        def upload(digest: str):
+            self.__backend.save(f"cas/{digest}", uploads[digest]())
+
+        def upload_all():
+            for _ in self.__pool.map(upload, uploads):
+                pass
+            result = ScriptResult(dict(outputs), time.time(), log_digest)
+            self.__backend.save(self.__result_path(key), json.dumps(asdict(result)).encode("utf-8"))
+
+        self.__guarded(upload_all)
+
+    def close(self):
+        self.__pool.shutdown()
+
+    def __result_path(self, key: str) -> str:
+        return f"ac/{hashlib.sha256(f'{self.__platform_tag}:{key}'.encode('utf-8')).hexdigest()}"
+
+    def __load_blob(self, digest: str) -> Optional[bytes]:
+        blob = self.__backend.load(f"cas/{digest}")
+        # Blobs are verified, so a corrupted one is a miss rather than a corrupted output.
+        return blob if blob is not None and hashlib.sha256(blob).hexdigest() == digest else None
+
+    def __guarded(self, transfer: Callable[[], _T]) -> Optional[_T]:
+        if self.__error is not None:
+            return None
+        try:
+            return transfer()
+        except OSError as error:
+            self.__error = str(error)
+            return None
+
+
+def _platform_tag() -> str:
+    """What results may depend on besides their fingerprint: the OS, the machine and the Python running suit."""
+    return f"{sys.platform}-{platform.machine()}-{sys.implementation.cache_tag}"
+
+
+def _parse_result(data: bytes) -> Optional[ScriptResult]:
+    try:
+        result = ScriptResult(**json.loads(data))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(result.outputs, dict) or not all(
+        _is_relative(name) and isinstance(digest, str) for name, digest in result.outputs.items()
+    ):
+        return None
+    return result if result.log is None or isinstance(result.log, str) else None
+
+
+def _is_relative(name: object) -> bool:
+    # Output paths come from the cache, and must not escape the target they're restored into.
+    if not isinstance(name, str):
+        return False
+    path = pathlib.PurePosixPath(name)
+    return bool(name) and not path.is_absolute() and ".." not in path.parts and ":" not in name and "\\" not in name
+
+
+def create_shared_results(
+    url: str, root: pathlib.Path, upload: bool = True, transfers: int = DEFAULT_TRANSFERS
+) -> SharedResults:
+    """Shared results kept at `url`: an `http(s)://` URL, or a directory (relative to `root`)."""
+    backend: CacheBackend
+    if url.startswith(("http://", "https://")):
+        from .http import HTTPBackend  # pylint: disable=import-outside-toplevel
+
+        backend = HTTPBackend(url)
+    else:
+        path = url[len("file://") :] if url.startswith("file://") else url
+        backend = DirectoryBackend(root / os.path.expanduser(path))
+    return SharedResults(backend, upload, transfers)
+
+
+def shared_results_of(cache_url: Optional[str], root: pathlib.Path, upload: bool) -> Optional[SharedResults]:
+    """The shared results configured for the run, with `$SUIT_CACHE_URL` overriding the configured URL."""
+    url = os.environ.get(CACHE_URL_VARIABLE) or cache_url
+    return create_shared_results(url, root, upload) if url else None
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import abc
+import json
+import os
+import pathlib
+import threading
+from dataclasses import asdict, dataclass
+from typing import Mapping, Optional
+
+
+@dataclass(frozen=True)
+class ScriptResult:
+    """The record of a successful script run: the digests of the outputs it left behind, and of its logs."""
+
+    outputs: Mapping[str, str]
+    created_at: float
+    log: Optional[str] = None
+
+
+class ResultStore(metaclass=abc.ABCMeta):
+    """Where results of successful script runs are kept, by the fingerprint of the run."""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[ScriptResult]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def put(self, key: str, result: ScriptResult):
+        raise NotImplementedError
+
+
+class LocalResultStore(ResultStore):
+    """Results kept as small JSON files in a local directory."""
+
+    def __init__(self, directory: pathlib.Path):
+        self.__directory = directory
+
+    def __path_of(self, key: str) -> pathlib.Path:
+        return self.__directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[ScriptResult]:
+        try:
+            with self.__path_of(key).open("r", encoding="utf-8") as result_io:
+                return ScriptResult(**json.load(result_io))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, key: str, result: ScriptResult):
+        path = self.__path_of(key)
+        temporary_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with temporary_path.open("w", encoding="utf-8") as result_io:
+                json.dump(asdict(result), result_io)
+            os.replace(temporary_path, path)
+        except OSError:
+            temporary_path.unlink(missing_ok=True)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pathlib
+from typing import Any, Collection, List, Mapping, Optional, Tuple, Union
+
+Location = Tuple[Union[str, int], ...]
+
+
+class ConfigError(Exception):
+    """
+    Invalid configuration data.
+
+    Its `location` is the keys leading to the invalid value from the root of the table being validated.
+    """
+
+    def __init__(self, location: Location, problem: str, source: Optional[pathlib.Path] = None):
+        where = ".".join(str(key) for key in location) or "<root>"
+        super().__init__(f"{source}: {where}: {problem}" if source else f"{where}: {problem}")
+        self.location = location
+        self.problem = problem
+        self.source = source
+
+    def in_source(self, source: pathlib.Path) -> ConfigError:
+        """The same error, pointing at the file the configuration was read from."""
+        return ConfigError(self.location, self.problem, source)
+
+
+def _type_name(value: Any) -> str:
+    if isinstance(value, Mapping):
+        return "a table"
+    if isinstance(value, (list, tuple)):
+        return "an array"
+    return f"a {type(value).__name__}"
+
+
+def mapping(value: Any, location: Location, known_keys: Optional[Collection[str]] = None) -> Mapping[str, Any]:
+    """`value` as a table, allowing only `known_keys` in it (when given)."""
+    if not isinstance(value, Mapping):
+        raise ConfigError(location, f"Expected a table, got {_type_name(value)}")
+    if known_keys is not None:
+        for key in value:
+            if key not in known_keys:
+                raise ConfigError((*location, key), f"Unknown key, expected one of: {', '.join(known_keys)}")
+    return value
+
+
+def string(value: Any, location: Location) -> str:
+    if not isinstance(value, str):
+        raise ConfigError(location, f"Expected a string, got {_type_name(value)}")
+    return value
+
+
+def strings(value: Any, location: Location) -> List[str]:
+    """`value` as an array of strings."""
+    if not isinstance(value, (list, tuple)):
+        raise ConfigError(location, f"Expected an array of strings, got {_type_name(value)}")
+    return [string(item, (*location, index)) for index, item in enumerate(value)]
+
+
+def boolean(value: Any, location: Location) -> bool:
+    if not isinstance(value, bool):
+        raise ConfigError(location, f"Expected a boolean, got {_type_name(value)}")
+    return value
+
+
+def integer(value: Any, location: Location, minimum: Optional[int] = None) -> int:
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ConfigError(location, f"Expected an integer, got {_type_name(value)}")
+    if minimum is not None and value < minimum:
+        raise ConfigError(location, f"Expected at least {minimum}, got {value}")
+    return value
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import functools
+import re
+import string
+from typing import Any, List, Mapping, Optional, Tuple, Union
+
+from .types import ShellScript
+
+_FIELD_NAME = re.compile(r"([^.\[]+)((?:\.[^.\[]+|\[[^\]]+\])*)$")
+_FIELD_LOOKUP = re.compile(r"\.([^.\[]+)|\[([^\]]+)\]")
+
+
+class CommandTemplateError(Exception):
+    def __init__(self, template: str, problem: str, script_name: Optional[str] = None):
+        where = f"Script '{script_name}' has an invalid command" if script_name else "Invalid command"
+        super().__init__(f"{where} `{template}`: {problem}")
+        self.template = template
+        self.problem = problem
+        self.script_name = script_name
+
+    def of_script(self, script_name: str) -> CommandTemplateError:
+        """The same error, naming the script whose command it is."""
+        return CommandTemplateError(self.template, self.problem, script_name)
+
+
+class _Field:
+    """A replacement field of a template - the name it's looked up by, and how to format what's found."""
+
+    def __init__(self, template: str, field_name: str, conversion: Optional[str], format_spec: str):
+        match = _FIELD_NAME.match(field_name)
+        if match is None or match.group(1).isdigit():
+            raise CommandTemplateError(template, f"Field `{{{field_name}}}` must be named, like `{{args.name}}`")
+        self.name = field_name
+        self.__template = template
+        self.__first = match.group(1)
+        self.__lookups: List[Tuple[bool, Union[str, int]]] = [
+            (bool(attribute), attribute or (int(item) if item.isdigit() else item))
+            for attribute, item in _FIELD_LOOKUP.findall(match.group(2))
+        ]
+        self.__conversion = conversion
+        # Format specs may have fields of their own, such as `{args.name:>{args.width}}`.
+        self.__format_spec = CommandTemplate(format_spec) if "{" in format_spec else format_spec
+
+    def render(self, namespace: Mapping[str, Any]) -> str:
+        value = namespace[self.__first]
+        for is_attribute, key in self.__lookups:
+            # Tables are looked up by key either way, as `{args.name}` and `{args[name]}` mean the same.
+            if isinstance(value, Mapping):
+                value = value[key]
+            else:
+                value = getattr(value, key) if is_attribute else value[key]
+        if self.__conversion == "r":
+            value = repr(value)
+        elif self.__conversion == "a":
+            value = ascii(value)
+        elif self.__conversion == "s":
+            value = str(value)
+        format_spec = self.__format_spec
+        if isinstance(format_spec, CommandTemplate):
+            format_spec = format_spec.render(namespace)
+        try:
+            return format(value, format_spec)
+        except (TypeError, ValueError) as error:
+            raise CommandTemplateError(
+                self.__template, f"Field `{{{self.name}}}` can't be formatted: {error}"
+            ) from None
+
+
+class CommandTemplate:
+    """
+    A command with `str.format` replacement fields, parsed once so it can be rendered many times.
+
+    Fields are looked up in a plain namespace mapping - tables along the way are looked up by key,
+    anything else by attribute or index.
+    """
+
+    def __init__(self, template: str):
+        self.__template = template
+        try:
+            parsed = list(string.Formatter().parse(template))
+        except ValueError as error:
+            raise CommandTemplateError(template, str(error)) from None
+        self.__parts: List[Tuple[str, Optional[_Field]]] = [
+            (literal, None if field_name is None else _Field(template, field_name, conversion, format_spec or ""))
+            for literal, field_name, format_spec, conversion in parsed
+        ]
+
+    @property
+    def template(self) -> str:
+        return self.__template
+
+    @property
+    def field_names(self) -> List[str]:
+        return [field.name for _, field in self.__parts if field is not None]
+
+    def render(self, namespace: Mapping[str, Any]) -> str:
+        rendered = []
+        for literal, field in self.__parts:
+            rendered.append(literal)
+            if field is not None:
+                try:
+                    rendered.append(field.render(namespace))
+                except (KeyError, IndexError, AttributeError, TypeError):
+                    raise CommandTemplateError(
+                        self.__template, f"Field `{{{field.name}}}` has no value for this target"
+                    ) from None
+        return "".join(rendered)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_command(template: str) -> CommandTemplate:
+    """The compiled `template`. Templates are compiled once, however many targets share them."""
+    return CommandTemplate(template)
+
+
+def command_namespace(shell_script: ShellScript) -> Mapping[str, Any]:
+    """What the fields of `shell_script`'s command are looked up in."""
+    return {
+        "root": {"path": shell_script.suit.root},
+        "local": {"path": shell_script.target.path},
+        "args": shell_script.target.data.args,
+    }
+
+
+def render_command(shell_script: ShellScript) -> str:
+    """The command line of `shell_script`, with the root, target and args fields filled in."""
+    try:
+        return compile_command(shell_script.specs.cmd).render(command_namespace(shell_script))
+    except CommandTemplateError as error:
+        target_name = shell_script.target.path.relative_to(shell_script.suit.root)
+        raise error.of_script(f"{target_name}:{shell_script.name}") from None
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Mapping, Tuple
+
+from .commands import render_command
+from .types import CompositeScript, RefScript, ScriptExecutor, ShellScript, _ScriptBase
+
+
+def script_key(script: _ScriptBase) -> str:
+    """The name identifying `script` in a run - its target's name and its own."""
+    return f"{script.target.path.relative_to(script.suit.root)}:{script.name}"
+
+
+class ScriptCycleError(Exception):
+    def __init__(self, cycle: List[str]):
+        super().__init__(f"Scripts reference each other in a cycle: {' -> '.join(cycle)}")
+        self.cycle = cycle
+
+
+class UnknownScriptError(Exception):
+    def __init__(self, referring_script: str, script_name: str):
+        super().__init__(f"Script '{referring_script}' refers to a missing script '{script_name}'")
+        self.referring_script = referring_script
+        self.script_name = script_name
+
+
+@dataclass(frozen=True)
+class ScriptNode:
+    """
+    A shell script to run, once all of the scripts in `deps` (by their key) succeeded.
+
+    `parents` are the keys of the composite and ref scripts that led to it, outermost first.
+    """
+
+    key: str
+    script: ShellScript
+    deps: Tuple[str, ...]
+    parents: Tuple[str, ...] = ()
+
+
+class ScriptGraph:
+    """
+    The shell scripts of a run, and the order they must run in.
+
+    Composite and ref scripts are flattened into their shell scripts. Steps of a composite script
+    depend on the steps before them, unless the composite is `parallel`. A script reached more than
+    once in a run becomes a single node, so it runs only once. Nodes are kept in the order they were
+    added, which is always an order they can run in.
+
+    Adding a shell script whose command can't be rendered raises `CommandTemplateError`.
+    """
+
+    def __init__(self):
+        self.__nodes: Dict[str, ScriptNode] = {}
+
+    @property
+    def nodes(self) -> Mapping[str, ScriptNode]:
+        return self.__nodes
+
+    def add(self, script: _ScriptBase, after: FrozenSet[str] = frozenset()) -> FrozenSet[str]:
+        """
+        Add `script` to the graph, to run after the nodes in `after`.
+
+        Returns the nodes that have to complete for `script` to be considered complete.
+        """
+        return _GraphCompiler(self.__nodes).compile(script, after)
+
+
+class _GraphCompiler(ScriptExecutor):
+    def __init__(self, nodes: Dict[str, ScriptNode]):
+        self.__nodes = nodes
+        self.__after: FrozenSet[str] = frozenset()
+        self.__expanding: List[str] = []
+
+    def compile(self, script: _ScriptBase, after: FrozenSet[str]) -> FrozenSet[str]:
+        key = script_key(script)
+        if key in self.__expanding:
+            raise ScriptCycleError([*self.__expanding[self.__expanding.index(key) :], key])
+
+        previous_after, self.__after = self.__after, after
+        self.__expanding.append(key)
+        try:
+            return self.execute(script)
+        finally:
+            self.__expanding.pop()
+            self.__after = previous_after
+
+    def handle_shell_script(self, shell_script: ShellScript) -> FrozenSet[str]:
+        key = script_key(shell_script)
+        if key in self.__nodes:
+            # Already runs in this run - wait for it, as well as for what this occurrence had to wait for.
+            return self.__after | {key}
+        # Rendering the command up front, so a missing arg fails the run before anything started.
+        render_command(shell_script)
+        parents = tuple(self.__expanding[:-1])
+        self.__nodes[key] = ScriptNode(key, shell_script, tuple(sorted(self.__after)), parents)
+        return frozenset({key})
+
+    def handle_ref_script(self, ref_script: RefScript) -> FrozenSet[str]:
+        scripts = ref_script.suit.scripts.of(ref_script.target)
+        if ref_script.specs.ref not in scripts:
+            raise UnknownScriptError(script_key(ref_script), ref_script.specs.ref)
+        return self.compile(scripts[ref_script.specs.ref], self.__after)
+
+    def handle_composite_script(self, composite_script: CompositeScript) -> FrozenSet[str]:
+        steps = composite_script.suit.scripts.steps_of(composite_script)
+        if composite_script.specs.parallel:
+            after = self.__after
+            return frozenset().union(*(self.compile(step, after) for step in steps)) or after
+
+        after = self.__after
+        for step in steps:
+            after = self.compile(step, after)
+        return after
@@ -1,4 +1,8 @@
-from typing import Mapping
+import bisect
+import fnmatch
+import pathlib
+import re
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
 
 from suit.collector import SuitConfig, TargetConfig
 
@@ -6,6 +10,37 @@ from .specs import CompositeScriptSpec, RefScriptSpec, ScriptSpec, ShellScriptSp
 from .types import CompositeScript, RefScript, ShellScript, _ScriptBase
 
 
+class TargetScripts(Mapping[str, _ScriptBase]):
+    """
+    The resolved scripts of a target, by name.
+
+    Targets defining the same script names - as targets inheriting the same templates do - share the
+    positions of the names, so each target only keeps its scripts themselves.
+    """
+
+    __slots__ = ("__positions", "__scripts")
+
+    def __init__(self, scripts: Mapping[str, _ScriptBase]):
+        names = tuple(scripts)
+        positions = _positions_of_names.get(names)
+        if positions is None:
+            positions = _positions_of_names[names] = {name: position for position, name in enumerate(names)}
+        self.__positions = positions
+        self.__scripts = tuple(scripts.values())
+
+    def __getitem__(self, name: str) -> _ScriptBase:
+        return self.__scripts[self.__positions[name]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__positions)
+
+    def __len__(self) -> int:
+        return len(self.__scripts)
+
+
+_positions_of_names: Dict[Tuple[str, ...], Dict[str, int]] = {}
+
+
 def resolve_scripts(suit: SuitConfig, target_config: TargetConfig) -> Mapping[str, _ScriptBase]:
     """Resolve the scripts by their types."""
     target_scripts = {}
@@ -17,7 +52,7 @@ def resolve_scripts(suit: SuitConfig, target_config: TargetConfig) -> Mapping[st
     for script_name, inline_script in target_config.data.scripts.items():
         target_scripts[script_name] = resolve_script(suit, target_config, script_name, inline_script)
 
-    return target_scripts
+    return TargetScripts(target_scripts)
 
 
 __TYPES = {
@@ -35,3 +70,95 @@ def resolve_script(
         if isinstance(script_spec, script_spec_cls):
             return script_cls(**kwargs)
     raise ValueError()
+
+
+_GLOB_CHARACTERS = re.compile(r"[*?\[]")
+
+
+class ScriptIndex:
+    """
+    The resolved scripts of every target in a suit configuration.
+
+    Each target's scripts (and each composite script's steps) are resolved once, on first use, and
+    shared by everyone using the configuration afterwards.
+    """
+
+    def __init__(self, suit: SuitConfig):
+        self.__suit = suit
+        self.__scripts: Dict[pathlib.Path, Mapping[str, _ScriptBase]] = {}
+        self.__steps: Dict[Tuple[pathlib.Path, str], List[_ScriptBase]] = {}
+        self.__by_name: Optional[Dict[str, List[Tuple[str, _ScriptBase]]]] = None
+        self.__sorted_names: List[str] = []
+
+    def of(self, target: TargetConfig) -> Mapping[str, _ScriptBase]:
+        """The resolved scripts of `target`, by name."""
+        scripts = self.__scripts.get(target.path)
+        if scripts is None:
+            scripts = self.__scripts[target.path] = resolve_scripts(self.__suit, target)
+        return scripts
+
+    @property
+    def by_name(self) -> Mapping[str, List[Tuple[str, _ScriptBase]]]:
+        """
+        Every script name, with the targets defining it (in targets order) and their resolved script.
+
+        Names are ordered by their first appearance when going over the targets in order.
+        """
+        if self.__by_name is None:
+            by_name: Dict[str, List[Tuple[str, _ScriptBase]]] = {}
+            for target_name, target in self.__suit.targets.items():
+                for script_name, script in self.of(target).items():
+                    by_name.setdefault(script_name, []).append((target_name, script))
+            self.__sorted_names = sorted(by_name)
+            self.__by_name = by_name
+        return self.__by_name
+
+    def targets_of(self, script_name: str) -> List[Tuple[str, _ScriptBase]]:
+        """The targets defining `script_name`, along with their resolved script."""
+        return self.by_name.get(script_name, [])
+
+    def find(self, pattern: str) -> List[str]:
+        """
+        The script names matching `pattern`, in sorted order.
+
+        A pattern naming a script exactly, such as `tests[unit]`, matches only it. Any other pattern with
+        glob characters (`*`, `?`, `[`) is matched as a glob, considering only the names sharing its
+        literal prefix.
+        """
+        if pattern in self.by_name:
+            return [pattern]
+        glob_start = _GLOB_CHARACTERS.search(pattern)
+        if glob_start is None:
+            return []
+
+        prefix = pattern[: glob_start.start()]
+        start = bisect.bisect_left(self.__sorted_names, prefix)
+        matches = []
+        for name in self.__sorted_names[start:]:
+            if not name.startswith(prefix):
+                break
+            if fnmatch.fnmatchcase(name, pattern):
+                matches.append(name)
+        return matches
+
+    def steps_of(self, composite_script: CompositeScript) -> List[_ScriptBase]:
+        """The resolved steps of `composite_script`, in order."""
+        key = (composite_script.target.path, composite_script.name)
+        steps = self.__steps.get(key)
+        if steps is None:
+            steps = self.__steps[key] = [
+                resolve_script(self.__suit, composite_script.target, f"{composite_script.name}[{index}]", raw_script)
+                for index, raw_script in enumerate(composite_script.specs.scripts)
+            ]
+        return steps
+
+    def invalidate(self, target: Optional[TargetConfig] = None):
+        """Forget what was resolved for `target`, or for all targets."""
+        self.__by_name = None
+        if target is None:
+            self.__scripts.clear()
+            self.__steps.clear()
+            return
+        self.__scripts.pop(target.path, None)
+        for key in [key for key in self.__steps if key[0] == target.path]:
+            del self.__steps[key]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import Any, Tuple, TypeVar
+
+_C = TypeVar("_C", bound=type)
+
+
+def slotted(cls: _C) -> _C:
+    """
+    The dataclass `cls`, with `__slots__` for its fields rather than a `__dict__`.
+
+    This is `dataclass(slots=True)` of Python 3.10, for the Pythons before it. Instances of slotted
+    classes take a fraction of the memory, and can still be pickled, frozen or not. They can be weakly
+    referenced only if a base class has a `__weakref__` slot. As the class is created again, its
+    methods must not use `super()` without arguments.
+    """
+    inherited = {name for base in cls.__mro__[1:] for name in getattr(base, "__slots__", ())}
+    field_names = tuple(field.name for field in dataclasses.fields(cls) if field.name not in inherited)
+    namespace = dict(cls.__dict__)
+    for name in (*field_names, "__dict__", "__weakref__"):
+        namespace.pop(name, None)
+    namespace["__slots__"] = field_names
+    if cls.__dataclass_params__.frozen:
+        namespace["__getstate__"] = _frozen_getstate
+        namespace["__setstate__"] = _frozen_setstate
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+def _frozen_getstate(self) -> Tuple[Any, ...]:
+    return tuple(getattr(self, field.name) for field in dataclasses.fields(self))
+
+
+def _frozen_setstate(self, state: Tuple[Any, ...]):
+    # Frozen dataclasses refuse `setattr`, which is how slotted objects are unpickled by default.
+    for field, value in zip(dataclasses.fields(self), state):
+        object.__setattr__(self, field.name, value)
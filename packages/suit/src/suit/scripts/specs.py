@@ -1,67 +1,178 @@
 from __future__ import annotations
 
 import abc
+import copyreg
+import weakref
 from dataclasses import dataclass, field
-from typing import Any, List, Mapping, Optional, Tuple, Union
+from types import MappingProxyType
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from suit import schema
+from suit.schema import Location
+
+from .slots import slotted
+
+# The default of the specs' tables, given by a factory as dataclasses refuse unhashable defaults.
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+
+
+def _mapping_proxy(items: Dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType(items)
+
+
+# Mapping proxies can't be pickled on their own, and parsed specs (pickled by the daemon) hold them.
+copyreg.pickle(MappingProxyType, lambda proxy: (_mapping_proxy, (dict(proxy),)))
 
 
 class ScriptSpec(metaclass=abc.ABCMeta):
-    pass
+    """
+    How a script is declared. Specs are immutable, as targets declaring the same script share its spec.
 
+    Parsed specs hold tuples and read-only mappings, rather than the lists and tables they were parsed from.
+    """
 
-@dataclass
-class ShellScriptSpec(ScriptSpec):
-    cmd: str
-    args: Mapping[str, Any] = field(default_factory=dict)
+    # Shared specs are looked up through weak references, so they're dropped once no target uses them.
+    __slots__ = ("__weakref__",)
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
+class ShellScriptSpec(ScriptSpec):
+    cmd: str
+    args: Mapping[str, Any] = field(default_factory=lambda: _EMPTY_MAPPING)
+    # Globs, relative to the target, of the files the script reads and writes. Declaring inputs lets
+    # the script be skipped when they (and the command) did not change since it last succeeded.
+    inputs: Sequence[str] = ()
+    outputs: Sequence[str] = ()
+    # Run the command - a Python entry point - in a warm worker rather than a fresh interpreter.
+    warm: bool = False
+    # Tokens the script holds while running, out of the run's budgets: `cpu` is its share of the jobs
+    # (1 by default), and other names are of the budgets in `[suit.resources]`.
+    resources: Mapping[str, int] = field(default_factory=lambda: _EMPTY_MAPPING)
+
+
+@slotted
+@dataclass(frozen=True)
 class RefScriptSpec(ScriptSpec):
     ref: str
-    args: Mapping[str, Any] = field(default_factory=dict)
+    args: Mapping[str, Any] = field(default_factory=lambda: _EMPTY_MAPPING)
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class CompositeScriptSpec(ScriptSpec):
-    scripts: List[ScriptSpec]
-    args: Mapping[str, Any] = field(default_factory=dict)
+    scripts: Sequence[ScriptSpec]
+    args: Mapping[str, Any] = field(default_factory=lambda: _EMPTY_MAPPING)
+    parallel: bool = False
 
 
-def scripts_from_mapping(scripts: Optional[Mapping[str, Union[str, Mapping[str, Any], ScriptSpec]]]):
+def scripts_from_mapping(
+    scripts: Optional[Mapping[str, Union[str, Mapping[str, Any], ScriptSpec]]], location: Location = ("scripts",)
+):
     if not scripts:
         return {}
 
-    return {script_name: _process_script(script_input) for script_name, script_input in scripts.items()}
+    return {
+        script_name: _process_script(script_input, (*location, script_name))
+        for script_name, script_input in schema.mapping(scripts, location).items()
+    }
+
+
+def resources_from_mapping(resources: Any, location: Location = ("resources",)) -> Mapping[str, int]:
+    """Amounts of resources by their names, such as `{cpu = 4, memory = 2}`."""
+    return {
+        name: schema.integer(amount, (*location, name), minimum=1)
+        for name, amount in schema.mapping(resources, location).items()
+    }
+
+
+_SHELL_SCRIPT_KEYS = ("cmd", "args", "inputs", "outputs", "warm", "resources")
+_REF_SCRIPT_KEYS = ("ref", "args")
+_COMPOSITE_SCRIPT_KEYS = ("scripts", "args", "parallel")
+
+
+# Parsed scripts, by their raw declaration. Targets often declare the same scripts, copying them from
+# one `pyproject.toml` to the next, and share a single spec of each rather than one apiece.
+_interned_specs: weakref.WeakValueDictionary[Hashable, ScriptSpec] = weakref.WeakValueDictionary()
+
+
+def _interning_key(value: Any) -> Hashable:
+    """A hashable key of a raw declaration. Types are part of it, as `true` and `1` are equal in Python."""
+    if isinstance(value, Mapping):
+        return (Mapping, tuple(sorted((key, _interning_key(item)) for key, item in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(_interning_key(item) for item in value))
+    return (type(value), value)
 
 
 def _process_script(
+    script_input: Union[str, List[str], Tuple[str, ...], Mapping[str, Any], ScriptSpec], location: Location = ()
+) -> ScriptSpec:
+    if isinstance(script_input, ScriptSpec):
+        return script_input
+    try:
+        key = _interning_key(script_input)
+        spec = _interned_specs.get(key)
+    except TypeError:
+        # Declarations holding unhashable values, such as specs built by hand, are not shared.
+        return _parse_script(script_input, location)
+    if spec is None:
+        spec = _interned_specs[key] = _parse_script(script_input, location)
+    return spec
+
+
+def _parse_script(
     script_input: Union[
         str,
         List[str],
         Tuple[str, ...],
         Mapping[str, Any],
-        ScriptSpec,
-    ]
+    ],
+    location: Location = (),
 ) -> ScriptSpec:
-    if isinstance(script_input, ScriptSpec):
-        return script_input
-
     if isinstance(script_input, str):
-        return ShellScriptSpec(script_input, {})
+        return ShellScriptSpec(script_input)
 
     if isinstance(script_input, (list, tuple)):
-        return CompositeScriptSpec([_process_script(inner) for inner in script_input])
+        return CompositeScriptSpec(
+            tuple(_process_script(inner, (*location, index)) for index, inner in enumerate(script_input))
+        )
 
-    if "cmd" in script_input and isinstance(script_input["cmd"], str):
-        return ShellScriptSpec(script_input["cmd"], script_input.get("args", {}))
+    if not isinstance(script_input, Mapping):
+        raise schema.ConfigError(location, "Expected a command, an array of scripts or a table")
+
+    if "cmd" in script_input:
+        schema.mapping(script_input, location, _SHELL_SCRIPT_KEYS)
+        return ShellScriptSpec(
+            schema.string(script_input["cmd"], (*location, "cmd")),
+            _read_only(schema.mapping(script_input.get("args", {}), (*location, "args"))),
+            tuple(schema.strings(script_input.get("inputs", []), (*location, "inputs"))),
+            tuple(schema.strings(script_input.get("outputs", []), (*location, "outputs"))),
+            schema.boolean(script_input.get("warm", False), (*location, "warm")),
+            _read_only(resources_from_mapping(script_input.get("resources", {}), (*location, "resources"))),
+        )
 
-    if "ref" in script_input and isinstance(script_input["ref"], str):
-        return RefScriptSpec(script_input["ref"], script_input.get("args", {}))
+    if "ref" in script_input:
+        schema.mapping(script_input, location, _REF_SCRIPT_KEYS)
+        return RefScriptSpec(
+            schema.string(script_input["ref"], (*location, "ref")),
+            _read_only(schema.mapping(script_input.get("args", {}), (*location, "args"))),
+        )
 
-    if "scripts" in script_input and isinstance(script_input["scripts"], (list, tuple)):
+    if "scripts" in script_input:
+        schema.mapping(script_input, location, _COMPOSITE_SCRIPT_KEYS)
+        steps = script_input["scripts"]
+        if not isinstance(steps, (list, tuple)):
+            raise schema.ConfigError((*location, "scripts"), "Expected an array of scripts")
         return CompositeScriptSpec(
-            [_process_script(inner) for inner in script_input["scripts"]],
-            script_input.get("args", {}),
+            tuple(_process_script(inner, (*location, "scripts", index)) for index, inner in enumerate(steps)),
+            _read_only(schema.mapping(script_input.get("args", {}), (*location, "args"))),
+            schema.boolean(script_input.get("parallel", False), (*location, "parallel")),
         )
 
-    raise ValueError(script_input)
+    raise schema.ConfigError(location, "Expected a table with either `cmd`, `ref` or `scripts`")
+
+
+def _read_only(mapping: Mapping[str, Any]) -> Mapping[str, Any]:
+    # A copy, so the parsed table can't change the spec behind its back either.
+    return MappingProxyType(dict(mapping)) if mapping else _EMPTY_MAPPING
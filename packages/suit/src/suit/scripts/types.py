@@ -7,13 +7,22 @@ from typing import Any, Generic, Mapping, TypeVar
 from suit.collector import SuitConfig
 from suit.targets import TargetConfig
 
+from .slots import slotted
 from .specs import CompositeScriptSpec, RefScriptSpec, ShellScriptSpec
 
 _T = TypeVar("_T")
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class _ScriptBase(Generic[_T], metaclass=abc.ABCMeta):
+    """
+    A script of a target - its name and spec, for that target.
+
+    Targets inheriting a template have a script of each of the template's scripts, all referring to
+    the same spec. Scripts are slotted and immutable, so there can be many of them cheaply.
+    """
+
     name: str
     specs: _T
     suit: SuitConfig
@@ -41,19 +50,22 @@ class ScriptExecutor(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class ShellScript(_ScriptBase[ShellScriptSpec]):
     def accept(self, executor: ScriptExecutor):
         return executor.handle_shell_script(self)
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class RefScript(_ScriptBase[RefScriptSpec]):
     def accept(self, executor: ScriptExecutor):
         return executor.handle_ref_script(self)
 
 
-@dataclass
+@slotted
+@dataclass(frozen=True)
 class CompositeScript(_ScriptBase[CompositeScriptSpec]):
     def accept(self, executor: ScriptExecutor):
         return executor.handle_composite_script(self)
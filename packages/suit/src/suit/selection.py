@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import fnmatch
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Set
+
+_REGEX_PREFIX = "re:"
+_EXCLUSION_PREFIX = "!"
+_GLOB_CHARACTERS = re.compile(r"[*?\[]")
+# Characters meaning something in regexes but not in globs, telling patterns meant as regexes apart.
+_REGEX_CHARACTERS = re.compile(r"[.^$+{}()|\\]")
+
+
+class TargetPatternError(Exception):
+    def __init__(self, pattern: str, problem: str):
+        super().__init__(f"Invalid target pattern '{pattern}': {problem}")
+        self.pattern = pattern
+
+
+class _TrieNode:
+    """A directory of the tree, the target at it (if there is one) and the directories under it."""
+
+    __slots__ = ("target", "children")
+
+    def __init__(self):
+        self.target: Optional[str] = None
+        self.children: Dict[str, _TrieNode] = {}
+
+
+class _PathTrie:
+    """The target names, by the directories leading to them."""
+
+    def __init__(self, target_names: Iterable[str]):
+        self.names = list(target_names)
+        self.root = _TrieNode()
+        for name in self.names:
+            node = self.root
+            for part in _parts_of(name):
+                node = node.children.setdefault(part, _TrieNode())
+            node.target = name
+
+    def under(self, parts: List[str]) -> Set[str]:
+        """The targets at and under the directories matching `parts`, which may be globs."""
+        found: Set[str] = set()
+        visited: Set[int] = set()
+        for node in _matching_nodes(self.root, parts):
+            stack = [node]
+            while stack:
+                node = stack.pop()
+                if id(node) in visited:
+                    continue
+                visited.add(id(node))
+                if node.target is not None:
+                    found.add(node.target)
+                stack.extend(node.children.values())
+        return found
+
+
+def _matching_nodes(node: _TrieNode, parts: List[str]) -> Iterator[_TrieNode]:
+    if not parts:
+        yield node
+        return
+    part, rest = parts[0], parts[1:]
+    if part == "**":
+        yield from _matching_nodes(node, rest)
+        for child in node.children.values():
+            yield from _matching_nodes(child, parts)
+    elif _GLOB_CHARACTERS.search(part):
+        for name, child in node.children.items():
+            if fnmatch.fnmatchcase(name, part):
+                yield from _matching_nodes(child, rest)
+    elif part in node.children:
+        yield from _matching_nodes(node.children[part], rest)
+
+
+def _parts_of(path: str) -> List[str]:
+    return [part for part in path.split("/") if part and part != "."]
+
+
+class _TargetPattern:
+    """
+    A single pattern: a path (with globs), selecting the targets at and under it, or a regex.
+
+    A path selecting no target is searched for as a regex instead if it has regex characters other
+    than globs' (such as `.`, `+` or `|`), so patterns such as `packages/.*` keep selecting what they
+    would as regexes. Other paths, such as the path of a removed target, then select nothing.
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.__parts: Optional[List[str]] = None
+        self.__regex: Optional[Pattern[str]] = None
+        if pattern.startswith(_REGEX_PREFIX):
+            try:
+                self.__regex = re.compile(pattern[len(_REGEX_PREFIX) :])
+            except re.error as error:
+                raise TargetPatternError(pattern, str(error)) from error
+            return
+
+        self.__parts = _parts_of(pattern)
+        if _REGEX_CHARACTERS.search(pattern):
+            try:
+                self.__regex = re.compile(pattern)
+            except re.error:
+                pass
+
+    def select(self, trie: _PathTrie) -> Set[str]:
+        if self.__parts is not None:
+            found = trie.under(self.__parts)
+            if found:
+                return found
+        if self.__regex is None:
+            return set()
+        return {name for name in trie.names if self.__regex.search(name)}
+
+
+class TargetSelector:
+    """
+    Select targets by their names - their paths relative to the root, such as `libs/core`.
+
+    A pattern is either:
+
+    - A path, such as `libs` or `libs/`, selecting the target at it and every target under it.
+    - A path with globs, such as `apps/*/api` - `*` matching within a directory, and `**` any depth.
+    - A regex searched for in the names, when prefixed with `re:`, or when a path with regex
+      characters (other than globs') selects nothing.
+
+    Patterns prefixed with `!` exclude the targets they select from the ones the others select, or
+    from all targets when there are no other patterns. Without patterns, every target is selected.
+    Patterns match whole paths, not parts of them: `core` doesn't select `libs/core`.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self.__included: List[_TargetPattern] = []
+        self.__excluded: List[_TargetPattern] = []
+        for pattern in patterns:
+            if pattern.startswith(_EXCLUSION_PREFIX):
+                self.__excluded.append(_TargetPattern(pattern[len(_EXCLUSION_PREFIX) :]))
+            else:
+                self.__included.append(_TargetPattern(pattern))
+
+    def select(self, target_names: Iterable[str]) -> List[str]:
+        """The selected targets of `target_names`, in the order they were given."""
+        trie = _PathTrie(target_names)
+        if not self.__included and not self.__excluded:
+            return trie.names
+
+        included = set(trie.names) if not self.__included else set()
+        for pattern in self.__included:
+            included |= pattern.select(trie)
+        for pattern in self.__excluded:
+            included -= pattern.select(trie)
+        return [name for name in trie.names if name in included]
+
+    def unmatched(self, target_names: Iterable[str]) -> List[str]:
+        """The patterns selecting none of `target_names`, but exclusions, which may name removed targets."""
+        trie = _PathTrie(target_names)
+        return [pattern.pattern for pattern in self.__included if not pattern.select(trie)]
@@ -5,20 +5,26 @@ import pathlib
 from dataclasses import dataclass, field
 from typing import Any, List, Mapping, Optional, Tuple, Union
 
+from suit import schema
 from suit.scripts.specs import ScriptSpec, scripts_from_mapping
 
+_TARGET_LOCATION = ("tool", "suit", "target")
+_TARGET_KEYS = ("inherit", "args", "scripts", "depends_on")
+
 
 @dataclass(init=False, frozen=True)
 class TargetConfigData:
     inherit: List[str]
     args: Mapping[str, Any]
     scripts: Mapping[str, ScriptSpec]
+    depends_on: List[str]
 
     def __init__(
         self,
         inherit: Optional[List[str]] = None,
         args: Optional[Mapping[str, Any]] = None,
         scripts: Optional[Mapping[str, Union[str, Mapping[str, Any], ScriptSpec]]] = None,
+        depends_on: Optional[List[str]] = None,
     ):
         # Setting objects is weird on frozen dataclasses.
         if not inherit:
@@ -31,6 +37,10 @@ class TargetConfigData:
 
         object.__setattr__(self, "scripts", scripts_from_mapping(scripts))
 
+        if not depends_on:
+            depends_on = []
+        object.__setattr__(self, "depends_on", depends_on)
+
 
 @dataclass
 class TargetConfig:
@@ -43,5 +53,20 @@ class TargetConfig:
 
     @staticmethod
     def from_mapping(path: pathlib.Path, data: Mapping[str, Any]) -> TargetConfig:
-        """Build a `TargetConfig` from raw, mapping data."""
-        return TargetConfig(path=path, data=TargetConfigData(**data))
+        """
+        Build a `TargetConfig` from raw, mapping data - the `tool.suit.target` table of its `pyproject.toml`.
+
+        Raises `ConfigError` pointing at the `pyproject.toml` file when the data is invalid.
+        """
+        location = _TARGET_LOCATION
+        try:
+            data = schema.mapping(data, location, _TARGET_KEYS)
+            target_data = TargetConfigData(
+                inherit=schema.strings(data.get("inherit", []), (*location, "inherit")),
+                args=schema.mapping(data.get("args", {}), (*location, "args")),
+                scripts=scripts_from_mapping(data.get("scripts"), (*location, "scripts")),
+                depends_on=schema.strings(data.get("depends_on", []), (*location, "depends_on")),
+            )
+        except schema.ConfigError as error:
+            raise error.in_source(path / "pyproject.toml") from None
+        return TargetConfig(path=path, data=target_data)
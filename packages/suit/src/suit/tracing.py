@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import pathlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+@dataclass
+class Span:
+    """
+    A timed piece of work. `start` is in seconds since the tracer was created.
+
+    `parents` are the keys of the composite and ref scripts (outermost first) that led to the span,
+    while `parent` is the span that was open on the same thread when this one started.
+    """
+
+    name: str
+    category: str
+    start: float
+    thread_id: int
+    duration: float = 0.0
+    parent: Optional[str] = None
+    parents: Sequence[str] = ()
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """
+    Record spans of the work done in a run, from any thread.
+
+    A disabled tracer records nothing, so code can trace unconditionally.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.__enabled = enabled
+        self.__origin = time.perf_counter()
+        self.__lock = threading.Lock()
+        self.__spans: List[Span] = []
+        self.__open = threading.local()
+
+    @property
+    def spans(self) -> List[Span]:
+        with self.__lock:
+            return list(self.__spans)
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, parents: Sequence[str] = (), **args: Any) -> Iterator[Span]:
+        """Time the body of the `with` statement. Whatever is added to the span's `args` is recorded as well."""
+        stack: List[Span] = getattr(self.__open, "stack", None) or []
+        self.__open.stack = stack
+        span = Span(
+            name,
+            category,
+            time.perf_counter() - self.__origin,
+            threading.get_ident(),
+            parent=stack[-1].name if stack else None,
+            parents=tuple(parents),
+            args=dict(args),
+        )
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span.duration = time.perf_counter() - self.__origin - span.start
+            if self.__enabled:
+                with self.__lock:
+                    self.__spans.append(span)
+
+    def slowest(self, category: str, count: int) -> List[Span]:
+        spans = [span for span in self.spans if span.category == category]
+        return sorted(spans, key=lambda span: span.duration, reverse=True)[:count]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        The spans in Chrome's trace event format, as loaded by `chrome://tracing` and Perfetto.
+
+        Every span is a complete event on the thread it ran in. Composite and ref scripts are nested
+        async events, spanning from the first to the last of the scripts they led to.
+        """
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = []
+        groups: Dict[Sequence[str], List[float]] = {}
+        for span in self.spans:
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start * 1_000_000,
+                    "dur": span.duration * 1_000_000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {**span.args, **({"parent": span.parent} if span.parent else {})},
+                }
+            )
+            for depth in range(1, len(span.parents) + 1):
+                extent = groups.setdefault(tuple(span.parents[:depth]), [span.start, span.start + span.duration])
+                extent[0] = min(extent[0], span.start)
+                extent[1] = max(extent[1], span.start + span.duration)
+
+        for chain, (start, end) in groups.items():
+            common = {"name": chain[-1], "cat": "composite", "id": chain[0], "pid": pid, "tid": 0}
+            events.append({**common, "ph": "b", "ts": start * 1_000_000})
+            events.append({**common, "ph": "e", "ts": end * 1_000_000})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path: pathlib.Path):
+        path.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
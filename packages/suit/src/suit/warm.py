@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pathlib
+import pickle
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import tomli
+
+from .config import ProjectConfig, SuitConfig
+from .discovery import _IGNORE_FILE_NAME, _PROJECT_FILE_NAME, DiscoveryCache, discover_targets
+from .schema import ConfigError
+from .targets import TargetConfig
+from .watcher import TreeWatcher
+
+_SUIT_FILE_NAME = "suit.toml"
+# The files configurations are read from - changing any other file can't change them.
+CONFIGURATION_FILE_NAMES = (_SUIT_FILE_NAME, _PROJECT_FILE_NAME, _IGNORE_FILE_NAME)
+
+
+class WarmSuit:
+    """
+    The suit configurations of a root, kept in memory and refreshed in place.
+
+    Refreshing walks the tree with an in-memory discovery cache, so only new and modified project
+    files are parsed again, and only the targets whose tables changed are built again.
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.__root = root
+        self.__cache = DiscoveryCache()
+        self.__raw_project_config: Optional[Mapping[str, Any]] = None
+        self.__project_config = ProjectConfig()
+        self.__targets: Dict[pathlib.Path, Tuple[Mapping[str, Any], TargetConfig]] = {}
+        self.__suit: Optional[SuitConfig] = None
+        self.__snapshot: Optional[bytes] = None
+        self.__error: Optional[str] = None
+
+    @property
+    def suit(self) -> Optional[SuitConfig]:
+        """The configurations, unless they're invalid."""
+        return self.__suit
+
+    @property
+    def error(self) -> Optional[str]:
+        """Why the configurations are invalid, if they are."""
+        return self.__error
+
+    @property
+    def directories(self) -> List[str]:
+        """Every directory the configurations were discovered in."""
+        return [str(self.__root / name) for name in self.__cache.directory_names]
+
+    def snapshot(self) -> bytes:
+        """The configurations, pickled. Pickled once for every change, however many times they're asked for."""
+        if self.__snapshot is None:
+            self.__snapshot = pickle.dumps(self.__suit, protocol=pickle.HIGHEST_PROTOCOL)
+        return self.__snapshot
+
+    def refresh(self) -> bool:
+        """Bring the configurations up to date with the files, returning whether they changed."""
+        try:
+            changed = self.__refresh()
+        except (OSError, ValueError, KeyError, ConfigError) as error:
+            changed = self.__suit is not None or self.__error != str(error)
+            self.__suit = self.__snapshot = None
+            self.__error = str(error)
+            return changed
+        self.__error = None
+        return changed
+
+    def refresh_watching(self, watcher: TreeWatcher) -> bool:
+        """
+        Refresh, then have `watcher` watch every directory the configurations may be found in.
+
+        Directories that were not watched yet may have changed before their watch was added, so the
+        configurations are refreshed again until no new directory is found. Returns whether they changed.
+        """
+        changed = False
+        while True:
+            changed = self.refresh() or changed
+            if not watcher.watch(self.directories):
+                return changed
+
+    def __refresh(self) -> bool:
+        changed = self.__refresh_project_config()
+        discovery = self.__project_config.discovery
+        targets = {}
+        found_targets = discover_targets(
+            self.__root,
+            self.__cache,
+            ignore_rules=discovery.ignore_rules(),
+            use_ignore_files=discovery.gitignore,
+        )
+        for project_file, target_data in found_targets:
+            target = self.__targets.get(project_file)
+            if target is None or target[0] != target_data:
+                target = (target_data, TargetConfig.from_mapping(path=project_file.parent, data=target_data))
+                changed = True
+            targets[project_file] = target
+        changed = changed or targets.keys() != self.__targets.keys()
+        self.__targets = targets
+
+        if not changed and self.__suit is not None:
+            return False
+        self.__suit = SuitConfig(self.__root, self.__project_config, [target for _, target in targets.values()])
+        self.__snapshot = None
+        return True
+
+    def __refresh_project_config(self) -> bool:
+        suit_file = self.__root / _SUIT_FILE_NAME
+        with suit_file.open("rb") as suit_file_io:
+            raw_project_config = tomli.load(suit_file_io)["suit"]
+        if raw_project_config == self.__raw_project_config:
+            return False
+        try:
+            self.__project_config = ProjectConfig.parse_obj(raw_project_config)
+        except ConfigError as error:
+            raise error.in_source(suit_file) from None
+        self.__raw_project_config = raw_project_config
+        return True
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import abc
+import ctypes
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Collection, Dict, Iterable, Optional, Set, Tuple
+
+# From <sys/inotify.h>.
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_TREE_CHANGES = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO
+_EVENT = struct.Struct("iIII")
+
+
+class TreeWatcher(metaclass=abc.ABCMeta):
+    """
+    Tell what changed in a set of directories since it was last asked.
+
+    Directories coming and going are always reported. Files are reported only if they're named one of
+    the watcher's `file_names`, or all of them when it has none.
+    """
+
+    name = "unknown"
+
+    @abc.abstractmethod
+    def watch(self, directories: Iterable[str]) -> bool:
+        """Watch exactly `directories`, returning whether any of them was not watched before."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def wait(self, timeout: float):
+        """Block until changes may be pending, or for `timeout` seconds at most."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def changes(self) -> Optional[Set[str]]:
+        """The paths that changed since the last time it was asked, or `None` if there's no telling which."""
+        raise NotImplementedError
+
+    def changed(self) -> bool:
+        """Whether anything changed since the last time it was asked."""
+        changes = self.changes()
+        return changes is None or bool(changes)
+
+    def close(self):
+        pass
+
+
+class PollingWatcher(TreeWatcher):
+    """
+    Watch directories by listing them again whenever asked, comparing what's in them with what was.
+
+    Used where inotify is not available. Files are compared by their modification time and size.
+    """
+
+    name = "polling"
+
+    def __init__(self, file_names: Optional[Collection[str]] = None):
+        self.__file_names = set(file_names) if file_names is not None else None
+        self.__listings: Dict[str, Optional[Dict[str, Tuple[bool, int, int]]]] = {}
+
+    def watch(self, directories: Iterable[str]) -> bool:
+        wanted = set(directories)
+        for directory in self.__listings.keys() - wanted:
+            del self.__listings[directory]
+        added = wanted - self.__listings.keys()
+        for directory in added:
+            self.__listings[directory] = self.__list(directory)
+        return bool(added)
+
+    def wait(self, timeout: float):
+        time.sleep(timeout)
+
+    def changes(self) -> Optional[Set[str]]:
+        changes = set()
+        for directory, listing in self.__listings.items():
+            current = self.__listings[directory] = self.__list(directory)
+            if current is None or listing is None:
+                if current is not listing:
+                    changes.add(directory)
+                continue
+            for name in listing.keys() | current.keys():
+                if listing.get(name) != current.get(name):
+                    changes.add(os.path.join(directory, name))
+        return changes
+
+    def __list(self, directory: str) -> Optional[Dict[str, Tuple[bool, int, int]]]:
+        listing = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            # Directories changing is their content's business, only their coming and going matters.
+                            listing[entry.name] = (True, 0, 0)
+                        elif self.__file_names is None or entry.name in self.__file_names:
+                            stat = entry.stat()
+                            listing[entry.name] = (False, stat.st_mtime_ns, stat.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return listing
+
+
+class InotifyWatcher(TreeWatcher):
+    """Watch directories with Linux's inotify."""
+
+    name = "inotify"
+
+    def __init__(self, file_names: Optional[Collection[str]] = None):
+        self.__file_names = {os.fsencode(file_name) for file_name in file_names} if file_names is not None else None
+        self.__libc = ctypes.CDLL(None, use_errno=True)
+        self.__fd: int = self.__libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.__fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self.__watches: Dict[str, int] = {}
+        self.__directories: Dict[int, str] = {}
+
+    def watch(self, directories: Iterable[str]) -> bool:
+        wanted = set(directories)
+        for directory in self.__watches.keys() - wanted:
+            # Fails harmlessly for directories that were already removed, along with their watch.
+            watch_descriptor = self.__watches.pop(directory)
+            self.__directories.pop(watch_descriptor, None)
+            self.__libc.inotify_rm_watch(self.__fd, watch_descriptor)
+
+        added = False
+        for directory in wanted - self.__watches.keys():
+            watch_descriptor = self.__libc.inotify_add_watch(self.__fd, os.fsencode(directory), _WATCH_MASK)
+            if watch_descriptor < 0:
+                error = ctypes.get_errno()
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    # Removed since it was found, which its parent directory reports.
+                    continue
+                raise OSError(error, os.strerror(error), directory)
+            self.__watches[directory] = watch_descriptor
+            self.__directories[watch_descriptor] = directory
+            added = True
+        return added
+
+    def wait(self, timeout: float):
+        try:
+            select.select([self.__fd], [], [], timeout)
+        except (OSError, ValueError):
+            # Closed while waiting.
+            time.sleep(timeout)
+
+    def changes(self) -> Optional[Set[str]]:
+        changes: Optional[Set[str]] = set()
+        while True:
+            try:
+                events = os.read(self.__fd, 1 << 16)
+            except BlockingIOError:
+                return changes
+            found = self.__parse(events)
+            changes = None if changes is None or found is None else changes | found
+
+    def __parse(self, events: bytes) -> Optional[Set[str]]:
+        changes: Optional[Set[str]] = set()
+        offset = 0
+        while offset < len(events):
+            watch_descriptor, mask, _, name_length = _EVENT.unpack_from(events, offset)
+            name = events[offset + _EVENT.size : offset + _EVENT.size + name_length].rstrip(b"\0")
+            offset += _EVENT.size + name_length
+            directory = self.__directories.get(watch_descriptor)
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost.
+                changes = None
+            elif directory is None:
+                continue
+            elif mask & _IN_IGNORED:
+                # The directory is gone, and its watch with it - it's watched again if it comes back.
+                del self.__directories[watch_descriptor]
+                del self.__watches[directory]
+            elif changes is None:
+                continue
+            elif mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+                changes.add(directory)
+            elif (mask & _IN_ISDIR and mask & _TREE_CHANGES) or self.__file_names is None or name in self.__file_names:
+                changes.add(os.path.join(directory, os.fsdecode(name)))
+        return changes
+
+    def close(self):
+        if self.__fd >= 0:
+            os.close(self.__fd)
+            self.__fd = -1
+
+
+def create_watcher(file_names: Optional[Collection[str]] = None) -> TreeWatcher:
+    """An inotify watcher where it's available, or a polling one."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(file_names)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(file_names)
@@ -0,0 +1,53 @@
+import pathlib
+import subprocess
+
+import pytest
+from suit.affected import AffectedTargetsError, TargetPathIndex, changed_files
+
+
+def test_owner_is_the_longest_matching_target():
+    index = TargetPathIndex(["libs/core", "libs/core/plugins", "apps/api"])
+    assert index.owner_of("libs/core/src/module.py") == "libs/core"
+    assert index.owner_of("libs/core/plugins/a/b.py") == "libs/core/plugins"
+    assert index.owner_of("libs/core") == "libs/core"
+    assert index.owner_of("libs/core-extras/x.py") is None
+    assert index.owner_of("README.md") is None
+
+
+def test_root_target_owns_everything_else():
+    index = TargetPathIndex([".", "apps/api"])
+    assert index.owner_of("README.md") == "."
+    assert index.owner_of("apps/api/main.py") == "apps/api"
+
+
+def _git(root: pathlib.Path, *args: str):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=root,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def test_changed_files_since_revision(tmp_path: pathlib.Path):
+    for path in ("libs/core/a.py", "apps/api/b.py", "apps/web/c.py"):
+        tmp_path.joinpath(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.joinpath(path).write_text("")
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+    _git(tmp_path, "tag", "base")
+
+    tmp_path.joinpath("libs/core/a.py").write_text("changed")
+    _git(tmp_path, "commit", "-q", "-am", "change core")
+    _git(tmp_path, "mv", "apps/web/c.py", "apps/web/d.py")
+    tmp_path.joinpath("apps/api/new.py").write_text("")
+
+    assert changed_files(tmp_path, "base") == {"libs/core/a.py", "apps/web/c.py", "apps/web/d.py", "apps/api/new.py"}
+
+
+def test_unknown_revision_is_reported(tmp_path: pathlib.Path):
+    _git(tmp_path, "init", "-q")
+    with pytest.raises(AffectedTargetsError):
+        changed_files(tmp_path, "no-such-revision")
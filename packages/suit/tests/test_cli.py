@@ -0,0 +1,161 @@
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import textwrap
+
+import suit
+from click.testing import CliRunner
+from suit.cli._scripts import _stream_scripts
+from suit.cli.cli import cli
+from suit.config import ProjectConfig, SuitConfig
+from suit.targets import TargetConfig
+
+_SRC = str(pathlib.Path(suit.__file__).parent.parent)
+
+
+def _loaded_modules(code: str, cwd: pathlib.Path) -> set:
+    script = textwrap.dedent(f"""
+        import sys
+        {code}
+        print(" ".join(sys.modules))
+        """)
+    completed = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.PIPE,
+        encoding="utf-8",
+        env={**os.environ, "PYTHONPATH": _SRC},
+    )
+    # The modules are printed last, after whatever the code printed.
+    return set(completed.stdout.splitlines()[-1].split())
+
+
+def test_subcommands_are_listed_without_being_imported(tmp_path: pathlib.Path):
+    modules = _loaded_modules(
+        """
+        from suit.cli.cli import cli
+        try:
+            cli(["--help"])
+        except SystemExit:
+            pass
+        """,
+        tmp_path,
+    )
+    assert not {"rich", "suit.cli._scripts", "suit.cli._targets", "suit.config"} & modules
+
+
+def test_collecting_without_the_daemon_does_not_import_its_client(tmp_path: pathlib.Path):
+    tmp_path.joinpath("suit.toml").write_text("[suit]\n")
+    modules = _loaded_modules(
+        """
+        from suit.collector import SuitCollector
+        SuitCollector.find_root().collect(use_daemon=False)
+        """,
+        tmp_path,
+    )
+    assert "suit.collector" in modules
+    assert "suit.daemon.client" not in modules
+
+
+def test_raw_targets_listing_does_not_import_rich(tmp_path: pathlib.Path):
+    tmp_path.joinpath("suit.toml").write_text("[suit]\n")
+    tmp_path.joinpath("target").mkdir()
+    tmp_path.joinpath("target", "pyproject.toml").write_text("[tool.suit.target]\n")
+    modules = _loaded_modules(
+        """
+        from suit.cli.cli import cli
+        try:
+            cli(["targets", "list", "--raw"])
+        except SystemExit:
+            pass
+        """,
+        tmp_path,
+    )
+    assert "suit.cli._targets" in modules
+    assert "rich" not in modules
+
+
+def test_lazy_commands_are_resolved_on_demand():
+    assert cli.list_commands(None) == ["daemon", "run", "scripts", "targets", "watch"]
+    assert cli.get_command(None, "run").name == "run"
+    assert cli.get_command(None, "missing") is None
+
+
+def test_scripts_are_streamed_as_ndjson(tmp_path: pathlib.Path):
+    tmp_path.joinpath("suit.toml").write_text("[suit]\n")
+    for name in ("app", "lib"):
+        tmp_path.joinpath(name).mkdir()
+    tmp_path.joinpath("app", "pyproject.toml").write_text(textwrap.dedent("""
+            [tool.suit.target.scripts]
+            lint = 'pylint "{local.path}"'
+            check = [{ref = 'lint'}]
+            broken = 'echo {args.missing}'
+            """))
+    tmp_path.joinpath("lib", "pyproject.toml").write_text("[tool.suit.target.scripts]\nlint = 'pylint'\n")
+    code = """
+        from suit.cli.cli import cli
+        try:
+            cli(["scripts", "list", "--ndjson", "-t", "app"])
+        except SystemExit:
+            pass
+        """
+    assert "rich" not in _loaded_modules(code, tmp_path)
+
+    completed = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        cwd=tmp_path,
+        check=True,
+        stdout=subprocess.PIPE,
+        encoding="utf-8",
+        env={**os.environ, "PYTHONPATH": _SRC},
+    )
+    records = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert len(records) == 3
+    assert records[0] == {
+        "target": "app",
+        "script": "lint",
+        "kind": "shell",
+        "command": f'pylint "{tmp_path / "app"}"',
+    }
+    assert records[1] == {"target": "app", "script": "check", "kind": "composite"}
+    assert records[2]["command"] is None
+    assert "args.missing" in records[2]["error"]
+
+
+def test_streamed_scripts_named_by_their_exact_name(capsys):
+    scripts = {"tests[unit]": "pytest -m unit", "testsu": "pytest"}
+    target = TargetConfig.from_mapping(pathlib.Path("root/app"), {"scripts": scripts})
+    suit_config = SuitConfig(pathlib.Path("root"), ProjectConfig(), [target])
+
+    _stream_scripts(suit_config, ["app"], ("tests[unit]",))
+    assert [json.loads(line)["script"] for line in capsys.readouterr().out.splitlines()] == ["tests[unit]"]
+
+
+def test_invalid_configurations_are_reported_as_errors(tmp_path: pathlib.Path, monkeypatch):
+    tmp_path.joinpath("suit.toml").write_text("[suit]\nresources = {cpu = 2}\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SUIT_NO_DAEMON", "1")
+
+    for args in (["targets", "list"], ["scripts", "list"], ["run", "lint"]):
+        result = CliRunner().invoke(cli, args)
+        assert result.exit_code == 1
+        assert "suit.toml: suit.resources.cpu: The cpu budget" in result.output
+
+
+def test_patterns_selecting_no_target_are_usage_errors(tmp_path: pathlib.Path, monkeypatch):
+    tmp_path.joinpath("suit.toml").write_text("[suit]\n")
+    tmp_path.joinpath("packages", "suit").mkdir(parents=True)
+    tmp_path.joinpath("packages", "suit", "pyproject.toml").write_text('[tool.suit.target.scripts]\nlint = "true"\n')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SUIT_NO_DAEMON", "1")
+
+    # Patterns match the targets' paths, so a target's bare name selects nothing.
+    for args in (["targets", "list"], ["scripts", "list"], ["run", "lint", "--dry-run"]):
+        result = CliRunner().invoke(cli, [*args, "-t", "suit"])
+        assert result.exit_code == 2
+        assert "No target matches the pattern 'suit'" in result.output
+        assert "such as 'packages/suit'" in result.output
+    assert CliRunner().invoke(cli, ["run", "lint", "--dry-run", "-t", "packages/suit"]).exit_code == 0
@@ -1,5 +1,4 @@
-import io
-from typing import Any, Mapping
+import pathlib
 from unittest.mock import MagicMock
 
 import pytest
@@ -7,37 +6,16 @@ import toml
 from suit.collector import RootDirectoryNotFound, SuitCollector, _find_root_configuration, _pyproject_uses_suit
 
 
-def pyproject_toml_file_mock(*, path: str, content: Mapping[str, Any]) -> MagicMock:
-    mock = MagicMock()
-    mock.is_file.return_value = True
-    mock.exists.return_value = True
+def test_find_pyproject_toml_with_suit_configured(tmp_path: pathlib.Path):
+    tmp_path.joinpath("packages", "suit").mkdir(parents=True)
+    tmp_path.joinpath("packages", "suit", "pyproject.toml").write_text(toml.dumps({"tool": {"suit": {"target": {}}}}))
+    tmp_path.joinpath("packages", "notsuit").mkdir(parents=True)
+    tmp_path.joinpath("packages", "notsuit", "pyproject.toml").write_text(toml.dumps({}))
 
-    parent_mock = MagicMock()
-    parent_mock.__str__.return_value = path
-
-    mock.parent = parent_mock
-    mock.__str__.return_value = f"{path.strip('/')}/pyproject.toml"
-
-    mock.open.return_value = io.BytesIO(toml.dumps(content).encode("utf-8"))
-    return mock
-
-
-def test_find_pyproject_toml_with_suit_configured():
-    root = MagicMock()
-
-    suit_project_file = pyproject_toml_file_mock(
-        path="packages/suit",
-        content={"tool": {"suit": {"target": {}}}},
-    )
-
-    root.glob.return_value = (
-        suit_project_file,
-        pyproject_toml_file_mock(path="packages/notsuit", content={}),
-    )
-    collector = SuitCollector(root, {})
+    collector = SuitCollector(tmp_path, {})
     results = collector.collect()
-    assert results.root == root
-    assert len(results.targets) == 1
+    assert results.root == tmp_path
+    assert list(results.targets) == ["packages/suit"]
 
 
 def test_is_pyproject_uses_suit():
@@ -0,0 +1,50 @@
+import pathlib
+
+import pytest
+from suit.config import ProjectConfig, SuitConfig
+from suit.scripts.commands import CommandTemplate, CommandTemplateError, compile_command, render_command
+from suit.scripts.graph import ScriptGraph
+from suit.scripts.specs import ShellScriptSpec
+from suit.targets import TargetConfig, TargetConfigData
+
+
+def _shell_script(cmd: str, args=None):
+    target = TargetConfig(
+        pathlib.Path("root/target"), TargetConfigData(args=args, scripts={"script": ShellScriptSpec(cmd)})
+    )
+    suit = SuitConfig(pathlib.Path("root"), ProjectConfig(), [target])
+    return suit.scripts.of(target)["script"]
+
+
+@pytest.mark.parametrize(
+    ["cmd", "args", "expected"],
+    [
+        ("black {local.path}/src", {}, "black root/target/src"),
+        ("cd {root.path} && make {args.goal}", {"goal": "all"}, "cd root && make all"),
+        ("pytest -n {args[workers]:>3}", {"workers": 4}, "pytest -n   4"),
+        ("echo {args.nested.name!r}", {"nested": {"name": "x"}}, "echo 'x'"),
+        ("echo {local.path.name}", {}, "echo target"),
+        ("echo {args.items[1]} {{literal}}", {"items": ["a", "b"]}, "echo b {literal}"),
+        ("echo {args.name:{args.width}}|", {"name": "x", "width": 3}, "echo x  |"),
+    ],
+)
+def test_commands_render_like_str_format(cmd: str, args, expected: str):
+    assert render_command(_shell_script(cmd, args)) == expected
+
+
+def test_templates_are_compiled_once():
+    assert compile_command("make {args.goal}") is compile_command("make {args.goal}")
+    assert CommandTemplate("make {args.goal} -C {local.path}").field_names == ["args.goal", "local.path"]
+
+
+@pytest.mark.parametrize("cmd", ["echo {}", "echo {0}", "echo {args.name"])
+def test_invalid_templates_are_rejected(cmd: str):
+    with pytest.raises(CommandTemplateError):
+        CommandTemplate(cmd)
+
+
+def test_missing_args_fail_when_planning():
+    with pytest.raises(CommandTemplateError) as error:
+        ScriptGraph().add(_shell_script("make {args.goal}"))
+    assert error.value.script_name == "target:script"
+    assert "args.goal" in str(error.value)
@@ -0,0 +1,104 @@
+import os
+import pathlib
+import threading
+import time
+
+import pytest
+from suit.collector import SuitCollector
+from suit.daemon.client import DAEMON_SOCKET, NO_DAEMON_VARIABLE, DaemonUnavailable, fetch_config, request_daemon
+from suit.daemon.server import DaemonAlreadyRunning, SuitDaemon
+from suit.tracing import Tracer
+from suit.warm import CONFIGURATION_FILE_NAMES, WarmSuit
+from suit.watcher import PollingWatcher
+
+
+def _write_target(root: pathlib.Path, name: str, script: str = "echo hello"):
+    root.joinpath(name).mkdir(exist_ok=True)
+    root.joinpath(name, "pyproject.toml").write_text(f'[tool.suit.target.scripts]\nhello = "{script}"\n')
+
+
+def _tree(root: pathlib.Path) -> pathlib.Path:
+    root.joinpath("suit.toml").write_text("[suit]\n")
+    _write_target(root, "a")
+    _write_target(root, "b")
+    return root
+
+
+def test_warm_suit_rebuilds_only_changed_targets(tmp_path: pathlib.Path):
+    warm = WarmSuit(_tree(tmp_path))
+    assert warm.refresh()
+    first = warm.suit
+    assert list(first.targets) == ["a", "b"]
+    assert not warm.refresh()
+    assert warm.suit is first
+
+    _write_target(tmp_path, "a", script="echo changed")
+    assert warm.refresh()
+    assert warm.suit.targets["a"].data.scripts["hello"].cmd == "echo changed"
+    assert warm.suit.targets["b"] is first.targets["b"]
+
+    tmp_path.joinpath("b", "pyproject.toml").unlink()
+    assert warm.refresh()
+    assert list(warm.suit.targets) == ["a"]
+
+
+def test_warm_suit_reports_invalid_configurations(tmp_path: pathlib.Path):
+    warm = WarmSuit(_tree(tmp_path))
+    tmp_path.joinpath("a", "pyproject.toml").write_text("[tool.suit.target]\nunknown = 1\n")
+    assert warm.refresh()
+    assert warm.suit is None
+    assert "unknown" in warm.error
+
+    _write_target(tmp_path, "a")
+    assert warm.refresh()
+    assert warm.error is None
+    assert list(warm.suit.targets) == ["a", "b"]
+
+
+@pytest.fixture(name="daemon")
+def _daemon(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.delenv(NO_DAEMON_VARIABLE, raising=False)
+    daemon = SuitDaemon(_tree(tmp_path), watcher=PollingWatcher(CONFIGURATION_FILE_NAMES))
+    serving = threading.Thread(target=daemon.serve)
+    serving.start()
+    deadline = time.monotonic() + 10
+    while not tmp_path.joinpath(DAEMON_SOCKET).exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield daemon
+    daemon.stop()
+    serving.join()
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="Unix sockets only")
+def test_collecting_uses_the_daemon(daemon: SuitDaemon, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    tracer = Tracer()
+    suit = SuitCollector.find_root(tmp_path).collect(tracer)
+    assert list(suit.targets) == ["a", "b"]
+    assert suit.scripts.of(suit.targets["a"])["hello"].specs.cmd == "echo hello"
+    [fetched] = [span for span in tracer.spans if span.category == "daemon"]
+    assert fetched.args["served"]
+
+    # Answers are refreshed when asked for, so they're never older than the files.
+    _write_target(tmp_path, "c")
+    assert list(fetch_config(tmp_path).targets) == ["a", "b", "c"]
+
+    monkeypatch.setenv(NO_DAEMON_VARIABLE, "1")
+    assert fetch_config(tmp_path) is None
+    assert list(SuitCollector.find_root(tmp_path).collect().targets) == ["a", "b", "c"]
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="Unix sockets only")
+def test_daemon_status_and_stop(daemon: SuitDaemon, tmp_path: pathlib.Path):
+    status, _ = request_daemon(tmp_path, "status")
+    assert status["pid"] == os.getpid()
+    assert status["targets"] == 2
+    with pytest.raises(DaemonAlreadyRunning):
+        SuitDaemon(tmp_path, watcher=PollingWatcher(CONFIGURATION_FILE_NAMES)).serve()
+
+    request_daemon(tmp_path, "stop")
+    deadline = time.monotonic() + 10
+    while daemon.socket_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(DaemonUnavailable):
+        request_daemon(tmp_path, "status")
+    assert fetch_config(tmp_path) is None
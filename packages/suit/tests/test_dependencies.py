@@ -0,0 +1,47 @@
+import pathlib
+
+import pytest
+from suit.config import ProjectConfig, SuitConfig
+from suit.dependencies import TargetCycleError, TargetGraph, UnknownTargetError
+from suit.targets import TargetConfig, TargetConfigData
+
+
+def test_targets_are_ordered_after_their_dependencies():
+    graph = TargetGraph({"apps/api": ["libs/http", "libs/core"], "libs/http": ["libs/core"], "libs/core": []})
+    assert graph.order == ["libs/core", "libs/http", "apps/api"]
+    assert graph.dependencies_of("apps/api") == ("libs/http", "libs/core")
+    assert graph.all_dependencies_of("apps/api") == ["libs/core", "libs/http"]
+
+
+def test_unrelated_targets_keep_their_order():
+    graph = TargetGraph({"b": [], "a": [], "c": ["a"]})
+    assert graph.order == ["b", "a", "c"]
+
+
+def test_dependents_are_found_transitively():
+    graph = TargetGraph({"core": [], "http": ["core"], "api": ["http"], "web": []})
+    assert graph.with_dependents(["core"]) == {"core", "http", "api"}
+    assert graph.with_dependents(["web"]) == {"web"}
+
+
+def test_cycles_are_reported():
+    with pytest.raises(TargetCycleError) as error:
+        TargetGraph({"a": ["b"], "b": ["c"], "c": ["a"]})
+    assert error.value.cycle == ["a", "b", "c", "a"]
+
+
+def test_unknown_dependencies_are_reported():
+    with pytest.raises(UnknownTargetError):
+        TargetGraph({"a": ["missing"]})
+
+
+def test_suit_config_builds_graph_from_depends_on():
+    suit_config = SuitConfig(
+        pathlib.Path("root"),
+        ProjectConfig(),
+        [
+            TargetConfig(pathlib.Path("root/apps/api"), TargetConfigData(depends_on=["libs/core"])),
+            TargetConfig(pathlib.Path("root/libs/core"), TargetConfigData()),
+        ],
+    )
+    assert suit_config.dependencies.order == ["libs/core", "apps/api"]
@@ -0,0 +1,159 @@
+import datetime
+import os
+import pathlib
+import time
+
+import pytest
+from suit import discovery
+from suit.discovery import DiscoveryCache, discover_targets
+from suit.ignore import DEFAULT_EXCLUDES, IgnoreRules
+
+
+def _write_target(root: pathlib.Path, name: str, content: str = "[tool.suit.target]\n"):
+    root.joinpath(name).mkdir(parents=True, exist_ok=True)
+    root.joinpath(name, "pyproject.toml").write_text(content)
+
+
+def _age(root: pathlib.Path):
+    """Make everything under `root` look like it was modified a while ago, so the cache may trust it."""
+    past = time.time() - 60
+    for path in [root, *root.rglob("*")]:
+        os.utime(path, (past, past))
+
+
+def _discover(root: pathlib.Path):
+    cache = DiscoveryCache.load(root)
+    found = {str(path.parent.relative_to(root)): target for path, target in discover_targets(root, cache)}
+    cache.save()
+    return found
+
+
+@pytest.fixture
+def parsed(monkeypatch: pytest.MonkeyPatch):
+    parsed_paths = []
+    original = discovery._parse_pyproject
+
+    def spy(path: str):
+        parsed_paths.append(pathlib.Path(path).parent.name)
+        return original(path)
+
+    monkeypatch.setattr(discovery, "_parse_pyproject", spy)
+    return parsed_paths
+
+
+def test_discovers_only_suit_targets(tmp_path: pathlib.Path):
+    _write_target(tmp_path, "a", '[tool.suit.target]\ninherit = ["package"]\n')
+    _write_target(tmp_path, "nested/b")
+    _write_target(tmp_path, "not-suit", "[tool.black]\n")
+    assert _discover(tmp_path) == {"a": {"inherit": ["package"]}, "nested/b": {}}
+
+
+def test_warm_discovery_does_not_parse_again(tmp_path: pathlib.Path, parsed: list):
+    _write_target(tmp_path, "a")
+    _write_target(tmp_path, "b", "[tool.black]\n")
+    _age(tmp_path)
+
+    first = _discover(tmp_path)
+    assert sorted(parsed) == ["a", "b"]
+    parsed.clear()
+
+    assert _discover(tmp_path) == first
+    assert parsed == []
+
+
+def test_changed_and_added_files_are_revalidated(tmp_path: pathlib.Path, parsed: list):
+    _write_target(tmp_path, "a")
+    _write_target(tmp_path, "b")
+    _age(tmp_path)
+    _discover(tmp_path)
+    parsed.clear()
+
+    _write_target(tmp_path, "a", '[tool.suit.target]\ninherit = ["package"]\n')
+    _write_target(tmp_path, "deep/c")
+    assert _discover(tmp_path) == {"a": {"inherit": ["package"]}, "b": {}, "deep/c": {}}
+    assert sorted(parsed) == ["a", "c"]
+
+
+def test_removed_targets_are_forgotten(tmp_path: pathlib.Path):
+    _write_target(tmp_path, "a")
+    _write_target(tmp_path, "b")
+    _age(tmp_path)
+    _discover(tmp_path)
+
+    tmp_path.joinpath("b", "pyproject.toml").unlink()
+    assert _discover(tmp_path) == {"a": {}}
+
+
+def test_corrupt_cache_is_ignored(tmp_path: pathlib.Path):
+    _write_target(tmp_path, "a")
+    cache_file = tmp_path / discovery.CACHE_DIRECTORY / "discovery.json"
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_text("{not json")
+    assert _discover(tmp_path) == {"a": {}}
+
+
+def test_targets_with_dates_are_read_again_rather_than_cached(tmp_path: pathlib.Path, parsed: list):
+    _write_target(tmp_path, "a")
+    _write_target(tmp_path, "dated", "[tool.suit.target]\nreleased = 2024-01-01\n")
+    _age(tmp_path)
+    first = _discover(tmp_path)
+    assert first["dated"] == {"released": datetime.date(2024, 1, 1)}
+    parsed.clear()
+
+    assert _discover(tmp_path) == first
+    assert parsed == ["dated"]
+
+
+def test_default_excludes_are_not_descended_into(tmp_path: pathlib.Path):
+    _write_target(tmp_path, "a")
+    _write_target(tmp_path, ".venv/lib/site-packages/vendored")
+    _write_target(tmp_path, "a/node_modules/vendored")
+    _write_target(tmp_path, "a/build")
+    assert _discover(tmp_path) == {"a": {}}
+
+
+def test_configured_excludes_and_includes(tmp_path: pathlib.Path):
+    _write_target(tmp_path, "libs/core")
+    _write_target(tmp_path, "libs/legacy")
+    _write_target(tmp_path, "tools/build")
+    rules = IgnoreRules.from_lines([*DEFAULT_EXCLUDES, "libs/legacy", "!tools/build"])
+    found = [
+        path.parent.relative_to(tmp_path).as_posix() for path, _ in discover_targets(tmp_path, ignore_rules=rules)
+    ]
+    assert found == ["libs/core", "tools/build"]
+
+
+def test_gitignore_rules_are_optional(tmp_path: pathlib.Path):
+    _write_target(tmp_path, "a")
+    _write_target(tmp_path, "a/generated")
+    _write_target(tmp_path, "b/generated")
+    tmp_path.joinpath("a", ".gitignore").write_text("generated/\n")
+
+    def found(use_ignore_files: bool):
+        return [
+            path.parent.relative_to(tmp_path).as_posix()
+            for path, _ in discover_targets(tmp_path, use_ignore_files=use_ignore_files)
+        ]
+
+    assert found(use_ignore_files=False) == ["a", "a/generated", "b/generated"]
+    assert found(use_ignore_files=True) == ["a", "b/generated"]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "[tool.suit.target]\n",
+        "[tool]\nsuit.target = {}\n",
+        "tool = { suit = { target = {} } }\n",
+        '[ tool . "suit" . target ]\n',
+    ],
+)
+def test_prefilter_accepts_every_spelling_of_suit_tables(tmp_path: pathlib.Path, content: str):
+    _write_target(tmp_path, "a", content)
+    assert _discover(tmp_path) == {"a": {}}
+
+
+def test_prefilter_skips_parsing_files_not_mentioning_suit(tmp_path: pathlib.Path):
+    _write_target(tmp_path, "a")
+    _write_target(tmp_path, "not-even-toml", "this = [is not valid")
+    assert _discover(tmp_path) == {"a": {}}
@@ -0,0 +1,75 @@
+import pathlib
+from typing import Mapping
+
+import pytest
+from suit.config import ProjectConfig, SuitConfig
+from suit.scripts.graph import ScriptCycleError, ScriptGraph, UnknownScriptError
+from suit.scripts.specs import CompositeScriptSpec, RefScriptSpec, ScriptSpec, ShellScriptSpec
+from suit.targets import TargetConfig, TargetConfigData
+
+
+def _graph_of(scripts: Mapping[str, ScriptSpec], *requested: str) -> ScriptGraph:
+    target = TargetConfig(pathlib.Path("root/target"), TargetConfigData(scripts=scripts))
+    suit = SuitConfig(pathlib.Path("root"), ProjectConfig(), [target])
+    graph = ScriptGraph()
+    after = frozenset()
+    for script_name in requested:
+        after = graph.add(suit.scripts.of(target)[script_name], after)
+    return graph
+
+
+def _deps(graph: ScriptGraph):
+    return {key.split(":", 1)[1]: [dep.split(":", 1)[1] for dep in node.deps] for key, node in graph.nodes.items()}
+
+
+def test_composite_steps_run_in_sequence():
+    graph = _graph_of({"lint": ["black", "pylint", "mypy"]}, "lint")
+    assert _deps(graph) == {"lint[0]": [], "lint[1]": ["lint[0]"], "lint[2]": ["lint[1]"]}
+
+
+def test_parallel_composite_steps_are_independent():
+    graph = _graph_of(
+        {
+            "lint": CompositeScriptSpec([ShellScriptSpec("black"), ShellScriptSpec("pylint")], parallel=True),
+            "report": "echo done",
+            "all": [{"ref": "lint"}, {"ref": "report"}],
+        },
+        "all",
+    )
+    assert _deps(graph) == {"lint[0]": [], "lint[1]": [], "report": ["lint[0]", "lint[1]"]}
+
+
+def test_scripts_referenced_twice_run_once():
+    graph = _graph_of(
+        {
+            "install": "pip install",
+            "tests": [{"ref": "install"}, "pytest"],
+            "build": ["prepare", {"ref": "install"}, "python -m build"],
+        },
+        "tests",
+        "build",
+    )
+    assert _deps(graph) == {
+        "install": [],
+        "tests[1]": ["install"],
+        "build[0]": ["tests[1]"],
+        "build[2]": ["build[0]", "install"],
+    }
+
+
+def test_reference_cycles_are_detected():
+    with pytest.raises(ScriptCycleError) as error:
+        _graph_of({"a": {"ref": "b"}, "b": ["echo", {"ref": "a"}]}, "a")
+    assert [key.split(":", 1)[1] for key in error.value.cycle] == ["a", "b", "b[1]", "a"]
+
+
+def test_unknown_references_are_reported():
+    with pytest.raises(UnknownScriptError):
+        _graph_of({"a": RefScriptSpec("missing")}, "a")
+
+
+def test_parallel_is_read_from_raw_scripts():
+    target = TargetConfigData(scripts={"lint": {"scripts": ["black", "pylint"], "parallel": True}})
+    assert target.scripts["lint"] == CompositeScriptSpec(
+        (ShellScriptSpec("black"), ShellScriptSpec("pylint")), {}, True
+    )
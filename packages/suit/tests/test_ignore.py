@@ -0,0 +1,40 @@
+import pytest
+from suit.ignore import DEFAULT_EXCLUDES, IgnoreRules
+
+
+@pytest.mark.parametrize(
+    ["patterns", "path", "is_directory", "expected"],
+    [
+        (["build/"], "build", True, True),
+        (["build/"], "packages/a/build", True, True),
+        (["build/"], "build", False, False),
+        (["/build"], "packages/build", True, False),
+        (["packages/*/legacy"], "packages/a/legacy", True, True),
+        (["packages/*/legacy"], "packages/a/b/legacy", True, False),
+        (["packages/**/legacy"], "packages/a/b/legacy", True, True),
+        (["**/legacy"], "legacy", True, True),
+        (["*.egg-info/"], "src/suit.egg-info", True, True),
+        (["vendor?"], "vendor1", True, True),
+        (["vendor[0-9]"], "vendorx", True, False),
+        (["build/", "!build"], "build", True, False),
+        (["!build", "build/"], "build", True, True),
+        (["# build", ""], "build", True, False),
+    ],
+)
+def test_ignore_rules(patterns, path: str, is_directory: bool, expected: bool):
+    assert IgnoreRules.from_lines(patterns).is_ignored(path, is_directory) is expected
+
+
+def test_extended_rules_are_relative_to_their_base():
+    rules = IgnoreRules.from_lines(["generated/"]).extended(["/out", "!generated"], base="packages/a")
+    assert rules.is_ignored("packages/a/out", True)
+    assert not rules.is_ignored("out", True)
+    assert not rules.is_ignored("packages/a/generated", True)
+    assert rules.is_ignored("packages/b/generated", True)
+
+
+def test_default_excludes():
+    rules = IgnoreRules.from_lines(DEFAULT_EXCLUDES)
+    for ignored in (".git", ".venv", "a/node_modules", "a/.tox", "lib/python3.10/site-packages", "dist"):
+        assert rules.is_ignored(ignored, True)
+    assert not rules.is_ignored("packages/suit", True)
@@ -0,0 +1,128 @@
+import io
+import os
+import pathlib
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+from rich.console import Console
+from suit.cli.jobserver import MAKEFLAGS_VARIABLE, JobServer
+from suit.cli.scheduler import Job, JobContext, JobStatus, Scheduler
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="The jobserver needs POSIX pipes")
+
+
+@pytest.fixture(name="served")
+def _served(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv(MAKEFLAGS_VARIABLE, "k -j1")
+    served = JobServer.serve(2)
+    yield served
+    served.close()
+
+
+def test_serving_advertises_the_jobserver(served: JobServer):
+    read_fd, write_fd = served.inherited_fds
+    assert os.environ[MAKEFLAGS_VARIABLE] == f"k -j2 --jobserver-auth={read_fd},{write_fd}"
+    served.close()
+    assert os.environ[MAKEFLAGS_VARIABLE] == "k -j1"
+
+
+def test_tokens_are_shared_with_joined_processes(served: JobServer):
+    joined = JobServer.join(os.environ)
+    assert joined is not None
+    assert joined.capacity == 2
+
+    held = served.acquire(2, lambda: False)
+    assert (held.implicit, held.taken) == (True, b"+")
+    # The joined process runs its first job for free, but has no token left for a second one.
+    first = joined.acquire(1, lambda: False)
+    assert first.implicit
+    deadline = time.monotonic() + 0.3
+    assert joined.acquire(1, lambda: time.monotonic() > deadline) is None
+
+    served.release(held)
+    second = joined.acquire(1, lambda: False)
+    assert (second.implicit, second.taken) == (False, b"+")
+    joined.release(second)
+    joined.release(first)
+    joined.close()
+
+
+def test_jobservers_that_were_not_passed_on_are_not_joined(tmp_path: pathlib.Path):
+    assert JobServer.join({}) is None
+    assert JobServer.join({MAKEFLAGS_VARIABLE: "-j4 --jobserver-auth=-1,-1"}) is None
+    assert JobServer.join({MAKEFLAGS_VARIABLE: "-j4 --jobserver-auth=997,998"}) is None
+    assert JobServer.join({MAKEFLAGS_VARIABLE: f"-j4 --jobserver-auth=fifo:{tmp_path / 'missing'}"}) is None
+
+
+def test_named_pipe_jobservers_are_joined(tmp_path: pathlib.Path):
+    fifo = tmp_path / "jobserver"
+    os.mkfifo(fifo)
+    holder = os.open(fifo, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        os.write(os.open(fifo, os.O_WRONLY), b"+")
+        joined = JobServer.join({MAKEFLAGS_VARIABLE: f"-j2 --jobserver-auth=fifo:{fifo}"})
+        tokens = joined.acquire(2, lambda: False)
+        assert (tokens.implicit, tokens.taken) == (True, b"+")
+        joined.release(tokens)
+        joined.close()
+    finally:
+        os.close(holder)
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="Needs GNU make")
+def test_nested_make_shares_the_limit(served: JobServer, tmp_path: pathlib.Path):
+    targets = [f"t{i}" for i in range(4)]
+    tmp_path.joinpath("Makefile").write_text(
+        f"all: {' '.join(targets)}\n"
+        + "".join(f"{target}:\n\techo start >> log; sleep 0.2; echo end >> log\n" for target in targets)
+    )
+    outputs = []
+
+    def run_make(context: JobContext):
+        outputs.append(
+            subprocess.run(
+                ["make", "-s", "-C", str(tmp_path)],
+                pass_fds=context.inherited_fds,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        )
+
+    results = Scheduler(jobs=2, console=Console(file=io.StringIO()), jobserver=served).run(
+        [Job(name="make", run=run_make)]
+    )
+    assert results[0].status is JobStatus.SUCCEEDED
+    assert "jobserver" not in outputs[0].stderr
+
+    concurrent, peak = 0, 0
+    for line in tmp_path.joinpath("log").read_text().split():
+        concurrent += 1 if line == "start" else -1
+        peak = max(peak, concurrent)
+    assert peak == 2
+
+
+def test_scheduled_jobs_take_tokens(served: JobServer):
+    lock = threading.Lock()
+    running, peaks = [], []
+
+    def run(context: JobContext):
+        with lock:
+            running.append(1)
+            peaks.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.pop()
+
+    # Jobs of another process hold the only token, so only the free job runs at a time.
+    joined = JobServer.join(os.environ)
+    other = joined.acquire(2, lambda: False)
+    Scheduler(jobs=4, console=Console(file=io.StringIO()), jobserver=served).run(
+        [Job(name=str(i), run=run) for i in range(4)]
+    )
+    joined.release(other)
+    joined.close()
+    assert max(peaks) == 1
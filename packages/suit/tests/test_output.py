@@ -0,0 +1,55 @@
+import io
+import json
+
+import pytest
+from rich.console import Console
+from suit.cli.output import OUTPUT_MODES, NDJSONOutput, PlainOutput, create_output
+from suit.cli.streaming import OutputLine
+
+_LINES = [OutputLine("stdout", "first", 1.0), OutputLine("stdout", "second", 1.0)]
+
+
+def _console() -> Console:
+    return Console(file=io.StringIO(), width=120)
+
+
+def test_plain_output_prefixes_every_line():
+    console = _console()
+    output = PlainOutput(console)
+    output.script_started("libs/core", "test")
+    output.script_output("libs/core", "test", _LINES)
+    output.script_output("libs/core", "test", [OutputLine("stderr", "oops", 2.0)])
+    output.script_failed("libs/core", "test", 2)
+    assert console.file.getvalue().splitlines() == [
+        "libs/core:test: running",
+        "libs/core:test OUT | first",
+        "libs/core:test OUT | second",
+        "libs/core:test ERR | oops",
+        "libs/core:test: exited with return-code 2",
+    ]
+
+
+def test_ndjson_output_emits_an_event_per_line():
+    console = _console()
+    output = NDJSONOutput(console)
+    output.script_started("libs/core", "test")
+    output.script_output("libs/core", "test", _LINES)
+    events = [json.loads(line) for line in console.file.getvalue().splitlines()]
+    assert [event["event"] for event in events] == ["started", "output", "output"]
+    assert events[1] == {
+        "event": "output",
+        "timestamp": 1.0,
+        "target": "libs/core",
+        "script": "test",
+        "stream": "stdout",
+        "line": "first",
+    }
+
+
+@pytest.mark.parametrize("mode", OUTPUT_MODES)
+def test_every_mode_reports_output(mode: str):
+    console = _console()
+    output = create_output(mode, console)
+    output.script_output("libs/core", "test", _LINES)
+    output.failure_summary("libs/core", "test", 3, _LINES)
+    assert "second" in console.file.getvalue()
@@ -0,0 +1,94 @@
+import io
+import pathlib
+import sys
+
+from rich.console import Console
+from suit.cli.executor import CLIExecutor
+from suit.config import ProjectConfig, SuitConfig
+from suit.results.fingerprint import fingerprint, hash_files
+from suit.results.store import LocalResultStore, ScriptResult
+from suit.scripts.specs import ShellScriptSpec
+from suit.targets import TargetConfig, TargetConfigData
+
+
+def _shell_script(root: pathlib.Path, spec: ShellScriptSpec):
+    target = TargetConfig(root / "target", TargetConfigData(scripts={"build": spec}))
+    target.path.mkdir(parents=True, exist_ok=True)
+    return SuitConfig(root, ProjectConfig(), [target]).scripts.of(target)["build"]
+
+
+def test_scripts_without_inputs_have_no_fingerprint(tmp_path: pathlib.Path):
+    assert fingerprint(_shell_script(tmp_path, ShellScriptSpec("make")), "make") is None
+
+
+def test_fingerprint_follows_inputs_and_command(tmp_path: pathlib.Path):
+    script = _shell_script(tmp_path, ShellScriptSpec("make", inputs=["src/**/*.py"]))
+    source = script.target.path / "src" / "pkg" / "module.py"
+    source.parent.mkdir(parents=True)
+    source.write_text("a = 1")
+
+    original = fingerprint(script, "make")
+    assert fingerprint(script, "make") == original
+    assert fingerprint(script, "make all") != original
+
+    source.write_text("a = 2")
+    assert fingerprint(script, "make") != original
+
+    source.write_text("a = 1")
+    script.target.path.joinpath("unrelated.txt").write_text("")
+    assert fingerprint(script, "make") == original
+
+
+def test_fingerprint_follows_files_under_trailing_double_star(tmp_path: pathlib.Path):
+    script = _shell_script(tmp_path, ShellScriptSpec("make", inputs=["src/**"]))
+    source = script.target.path / "src" / "pkg" / "module.py"
+    source.parent.mkdir(parents=True)
+    source.write_text("a = 1")
+    assert list(hash_files(script.target.path, ["src/**"])) == ["src/pkg/module.py"]
+
+    original = fingerprint(script, "make")
+    source.write_text("a = 2")
+    assert fingerprint(script, "make") != original
+
+
+def test_local_store_round_trip(tmp_path: pathlib.Path):
+    store = LocalResultStore(tmp_path)
+    assert store.get("ab" * 32) is None
+    store.put("ab" * 32, ScriptResult({"out.txt": "digest"}, 1.0))
+    assert store.get("ab" * 32) == ScriptResult({"out.txt": "digest"}, 1.0)
+
+
+def test_unchanged_scripts_are_skipped(tmp_path: pathlib.Path):
+    counter = tmp_path / "counter.txt"
+    helper = tmp_path / "copy.py"
+    helper.write_text(
+        "import pathlib, shutil, sys\n"
+        f"counter = pathlib.Path({str(counter)!r})\n"
+        "counter.write_text((counter.read_text() if counter.exists() else '') + 'x')\n"
+        "shutil.copy(sys.argv[1], sys.argv[2])\n"
+    )
+    script = _shell_script(
+        tmp_path,
+        ShellScriptSpec(
+            f"{sys.executable} {helper} {{local.path}}/input.txt {{local.path}}/output.txt",
+            inputs=["input.txt"],
+            outputs=["output.txt"],
+        ),
+    )
+    script.target.path.joinpath("input.txt").write_text("1")
+    store = LocalResultStore(tmp_path / "results")
+
+    def run():
+        CLIExecutor(is_dry_run=False, console=Console(file=io.StringIO()), results=store).execute(script)
+        return counter.read_text().count("x")
+
+    assert run() == 1
+    assert run() == 1
+    assert hash_files(script.target.path, ["output.txt"])
+
+    script.target.path.joinpath("output.txt").unlink()
+    assert run() == 2
+
+    script.target.path.joinpath("input.txt").write_text("2")
+    assert run() == 3
+    assert run() == 3
@@ -0,0 +1,201 @@
+import io
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from rich.console import Console
+from suit.cli.scheduler import Job, JobContext, JobResult, JobStatus, ProcessGroup, Scheduler, critical_path
+
+
+def _quiet_console() -> Console:
+    return Console(file=io.StringIO(), width=120)
+
+
+def _recording_job(name: str, record: list, deps=(), fail: bool = False) -> Job:
+    def run(context: JobContext):
+        record.append(name)
+        if fail:
+            raise RuntimeError(name)
+
+    return Job(name=name, run=run, deps=deps)
+
+
+def test_jobs_run_after_their_dependencies():
+    record = []
+    results = Scheduler(jobs=4, console=_quiet_console()).run(
+        [
+            _recording_job("c", record, deps=("b",)),
+            _recording_job("b", record, deps=("a",)),
+            _recording_job("a", record),
+        ]
+    )
+    assert record == ["a", "b", "c"]
+    assert [result.status for result in results] == [JobStatus.SUCCEEDED] * 3
+
+
+def test_jobs_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def run(context: JobContext):
+        barrier.wait()
+
+    results = Scheduler(jobs=3, console=_quiet_console()).run([Job(name=str(i), run=run) for i in range(3)])
+    assert all(result.status is JobStatus.SUCCEEDED for result in results)
+
+
+def test_fail_fast_skips_remaining_jobs():
+    record = []
+    results = Scheduler(jobs=1, console=_quiet_console()).run(
+        [
+            _recording_job("a", record, fail=True),
+            _recording_job("b", record),
+        ]
+    )
+    assert record == ["a"]
+    assert [result.status for result in results] == [JobStatus.FAILED, JobStatus.SKIPPED]
+
+
+def test_keep_going_skips_only_dependents_of_failures():
+    record = []
+    results = Scheduler(jobs=1, keep_going=True, console=_quiet_console()).run(
+        [
+            _recording_job("a", record, fail=True),
+            _recording_job("b", record, deps=("a",)),
+            _recording_job("c", record),
+        ]
+    )
+    assert record == ["a", "c"]
+    assert [result.status for result in results] == [JobStatus.FAILED, JobStatus.SKIPPED, JobStatus.SUCCEEDED]
+
+
+def test_fail_fast_cancels_in_flight_processes():
+    def sleeper(context: JobContext):
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        context.processes.register(process)
+        try:
+            if process.wait() != 0:
+                raise RuntimeError("terminated")
+        finally:
+            context.processes.unregister(process)
+
+    def failing(context: JobContext):
+        time.sleep(0.2)
+        raise RuntimeError("failed")
+
+    started = time.perf_counter()
+    results = Scheduler(jobs=2, console=_quiet_console()).run(
+        [Job(name="sleeper", run=sleeper), Job(name="failing", run=failing)]
+    )
+    assert time.perf_counter() - started < 10
+    assert [result.status for result in results] == [JobStatus.CANCELLED, JobStatus.FAILED]
+
+
+def test_cancelling_from_outside_stops_the_run():
+    processes = ProcessGroup()
+    record = []
+
+    def cancelling(context: JobContext):
+        record.append("cancelling")
+        context.processes.cancel()
+
+    results = Scheduler(jobs=1, console=_quiet_console()).run(
+        [Job(name="cancelling", run=cancelling), _recording_job("after", record, deps=("cancelling",))], processes
+    )
+    assert record == ["cancelling"]
+    assert [result.status for result in results] == [JobStatus.SUCCEEDED, JobStatus.SKIPPED]
+
+
+def test_output_of_concurrent_jobs_is_grouped():
+    output = io.StringIO()
+
+    def chatty(name: str) -> Job:
+        def run(context: JobContext):
+            for index in range(3):
+                context.console.print(f"{name}-{index}")
+                time.sleep(0.01)
+
+        return Job(name=name, run=run)
+
+    Scheduler(jobs=2, console=Console(file=output, width=120)).run([chatty("a"), chatty("b")])
+    lines = output.getvalue().split()
+    assert sorted([lines[:3], lines[3:]]) == [["a-0", "a-1", "a-2"], ["b-0", "b-1", "b-2"]]
+
+
+def test_registering_to_cancelled_group_terminates_process():
+    processes = ProcessGroup()
+    processes.cancel()
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    processes.register(process)
+    assert process.wait(timeout=10) != 0
+    processes.unregister(process)
+
+
+def test_unknown_dependencies_are_rejected():
+    with pytest.raises(ValueError):
+        Scheduler(jobs=1).run([Job(name="a", run=lambda context: None, deps=("missing",))])
+
+
+def test_critical_path_is_the_longest_dependent_chain():
+    def result(name: str, duration: float, deps=()) -> JobResult:
+        return JobResult(Job(name=name, run=lambda context: None, deps=deps), JobStatus.SUCCEEDED, duration=duration)
+
+    results = [
+        result("core", 1.0),
+        result("http", 0.5, deps=("core",)),
+        result("lint", 2.0),
+        result("api", 1.0, deps=("http", "lint")),
+    ]
+    assert [found.job.name for found in critical_path(results)] == ["lint", "api"]
+    assert critical_path([]) == []
+
+
+def _concurrency_tracking_job(name: str, running: list, peaks: list, **resources) -> Job:
+    lock = threading.Lock()
+
+    def run(context: JobContext):
+        with lock:
+            running.append(name)
+            peaks.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(name)
+
+    return Job(name=name, run=run, resources=resources)
+
+
+def test_jobs_hold_their_resources_while_running():
+    running, peaks = [], []
+    jobs = [_concurrency_tracking_job(str(i), running, peaks, memory=2) for i in range(4)]
+    results = Scheduler(jobs=4, console=_quiet_console(), budget={"memory": 3}).run(jobs)
+    assert all(result.status is JobStatus.SUCCEEDED for result in results)
+    assert max(peaks) == 1
+
+    running, peaks = [], []
+    jobs = [_concurrency_tracking_job(str(i), running, peaks, cpu=2, gpu=1) for i in range(4)]
+    Scheduler(jobs=4, console=_quiet_console()).run(jobs)
+    assert max(peaks) == 2
+
+
+def test_jobs_heavier_than_the_budget_run_alone():
+    running, peaks = [], []
+    jobs = [
+        _concurrency_tracking_job("heavy", running, peaks, cpu=16),
+        *(_concurrency_tracking_job(str(i), running, peaks) for i in range(3)),
+    ]
+    results = Scheduler(jobs=2, console=_quiet_console()).run(jobs)
+    assert all(result.status is JobStatus.SUCCEEDED for result in results)
+    assert peaks[0] == 1
+    assert max(peaks) == 2
+
+
+def test_wide_graphs_are_scheduled_quickly():
+    record = []
+    roots = [_recording_job(f"root{i}", record) for i in range(2000)]
+    leaves = [_recording_job(f"leaf{i}", record, deps=(f"root{i}",)) for i in range(2000)]
+    started = time.perf_counter()
+    results = Scheduler(jobs=1, console=_quiet_console()).run([*roots, *leaves])
+    assert time.perf_counter() - started < 5
+    assert all(result.status is JobStatus.SUCCEEDED for result in results)
+    assert record.index("leaf0") > record.index("root0")
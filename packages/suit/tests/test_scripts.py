@@ -1,9 +1,12 @@
+import dataclasses
 import pathlib
+import pickle
 from typing import Mapping
 
 import pytest
 from suit.collector import SuitConfig
 from suit.config import ProjectConfig, SuitTemplate
+from suit.scripts import resolver
 from suit.scripts.resolver import ShellScript, resolve_scripts
 from suit.scripts.types import CompositeScript, CompositeScriptSpec, RefScriptSpec, ShellScriptSpec
 from suit.targets import TargetConfig, TargetConfigData
@@ -56,3 +59,108 @@ def test_resolve_performs_inheritance_of_targets():
     )
     scripts = resolve_scripts(suit_config, target_config)
     assert "lint" in scripts
+
+
+def test_script_index_resolves_each_target_once(monkeypatch: pytest.MonkeyPatch):
+    target_config = TargetConfig(
+        pathlib.Path("root/target"),
+        TargetConfigData(scripts={"lint": CompositeScriptSpec([ShellScriptSpec("black"), ShellScriptSpec("pylint")])}),
+    )
+    suit_config = SuitConfig(pathlib.Path("root/"), ProjectConfig(), [target_config])
+
+    resolutions = []
+    original = resolver.resolve_scripts
+    monkeypatch.setattr(resolver, "resolve_scripts", lambda *args: resolutions.append(args) or original(*args))
+
+    lint = suit_config.scripts.of(target_config)["lint"]
+    assert suit_config.scripts.of(target_config)["lint"] is lint
+    assert len(resolutions) == 1
+
+    steps = suit_config.scripts.steps_of(lint)
+    assert [step.name for step in steps] == ["lint[0]", "lint[1]"]
+    assert suit_config.scripts.steps_of(lint) is steps
+
+    suit_config.scripts.invalidate(target_config)
+    assert suit_config.scripts.of(target_config)["lint"] is not lint
+    assert len(resolutions) == 2
+
+
+def test_script_index_by_name_and_lookups():
+    template = SuitTemplate(scripts={"lint:black": ShellScriptSpec("black"), "lint:pylint": ShellScriptSpec("pylint")})
+    package_a = TargetConfig(pathlib.Path("root/a"), TargetConfigData(inherit=["package"]))
+    package_b = TargetConfig(
+        pathlib.Path("root/b"), TargetConfigData(inherit=["package"], scripts={"build": ShellScriptSpec("make")})
+    )
+    suit_config = SuitConfig(
+        pathlib.Path("root/"), ProjectConfig(templates={"package": template}), [package_a, package_b]
+    )
+    index = suit_config.scripts
+
+    assert list(index.by_name) == ["lint:black", "lint:pylint", "build"]
+    assert [target_name for target_name, _ in index.targets_of("lint:black")] == ["a", "b"]
+    assert [target_name for target_name, _ in index.targets_of("build")] == ["b"]
+    assert index.targets_of("missing") == []
+
+    assert index.find("build") == ["build"]
+    assert index.find("missing") == []
+    assert index.find("lint:*") == ["lint:black", "lint:pylint"]
+    assert index.find("*") == ["build", "lint:black", "lint:pylint"]
+    assert index.find("lint:[b]*") == ["lint:black"]
+
+
+def test_script_names_with_glob_characters_are_found_exactly():
+    scripts = {"tests[unit]": ShellScriptSpec("pytest -m unit"), "testsu": ShellScriptSpec("pytest")}
+    target = TargetConfig(pathlib.Path("root/a"), TargetConfigData(scripts=scripts))
+    index = SuitConfig(pathlib.Path("root/"), ProjectConfig(), [target]).scripts
+
+    assert index.find("tests[unit]") == ["tests[unit]"]
+    assert index.find("tests[u]*") == ["testsu"]
+
+
+def test_identical_declarations_share_an_immutable_spec():
+    first = TargetConfigData(scripts={"lint": {"cmd": "pylint", "inputs": ["src/**"]}, "test": ["pytest"]})
+    second = TargetConfigData(scripts={"lint": {"cmd": "pylint", "inputs": ["src/**"]}, "test": ["pytest"]})
+    assert first.scripts["lint"] is second.scripts["lint"]
+    assert first.scripts["test"] is second.scripts["test"]
+    assert TargetConfigData(scripts={"lint": {"cmd": "pylint"}}).scripts["lint"] is not first.scripts["lint"]
+    assert not hasattr(first.scripts["lint"], "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.scripts["lint"].cmd = "flake8"
+
+
+def test_shared_specs_hold_immutable_values():
+    raw_scripts = {
+        "lint": {"cmd": "pylint", "args": {"strict": True}, "inputs": ["src/**"], "resources": {"cpu": 2}},
+        "check": {"scripts": ["black", {"ref": "lint"}]},
+    }
+    scripts = TargetConfigData(scripts=raw_scripts).scripts
+    lint, check = scripts["lint"], scripts["check"]
+    assert lint.inputs == ("src/**",)
+    assert check.scripts == (ShellScriptSpec("black"), RefScriptSpec("lint"))
+    with pytest.raises(TypeError):
+        lint.args["strict"] = False
+    with pytest.raises(TypeError):
+        lint.resources["cpu"] = 1
+
+    raw_scripts["lint"]["args"]["strict"] = False
+    assert lint.args == {"strict": True}
+    assert pickle.loads(pickle.dumps(lint)) == lint
+
+
+def test_targets_inheriting_a_template_share_its_specs():
+    template = SuitTemplate(scripts={"black": ShellScriptSpec("black"), "pylint": ShellScriptSpec("pylint")})
+    targets = [
+        TargetConfig(pathlib.Path(f"root/{name}"), TargetConfigData(inherit=["package"], scripts={"mypy": "mypy"}))
+        for name in ("a", "b")
+    ]
+    suit_config = SuitConfig(pathlib.Path("root/"), ProjectConfig(templates={"package": template}), targets)
+    first, second = (suit_config.scripts.of(target) for target in targets)
+    assert list(first) == list(second) == ["black", "pylint", "mypy"]
+    assert first["black"].specs is second["black"].specs is template.scripts["black"]
+    assert first["black"].target is targets[0]
+    assert not hasattr(first["black"], "__dict__")
+
+    restored = pickle.loads(pickle.dumps(first))
+    assert [(name, script.specs) for name, script in restored.items()] == [
+        (name, script.specs) for name, script in first.items()
+    ]
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+from suit.selection import TargetPatternError, TargetSelector
+
+_TARGETS = [".", "apps/web/api", "apps/web/ui", "apps/mobile/api", "libs/core", "libs/core/plugins", "libs/legacy"]
+
+
+@pytest.mark.parametrize(
+    ["patterns", "selected"],
+    [
+        ((), _TARGETS),
+        (("libs",), ["libs/core", "libs/core/plugins", "libs/legacy"]),
+        (("libs/core/",), ["libs/core", "libs/core/plugins"]),
+        (("apps/*/api",), ["apps/web/api", "apps/mobile/api"]),
+        (("**/api",), ["apps/web/api", "apps/mobile/api"]),
+        (("libs", "!libs/legacy"), ["libs/core", "libs/core/plugins"]),
+        (("!apps", "!libs"), ["."]),
+        ((".",), _TARGETS),
+        (("re:core$",), ["libs/core"]),
+        (("app.*/api",), ["apps/web/api", "apps/mobile/api"]),
+        (("apps/(web|ios)/ui",), ["apps/web/ui"]),
+        (("lib",), []),
+        (
+            (
+                "missing",
+                "apps/*/(",
+            ),
+            [],
+        ),
+    ],
+)
+def test_targets_are_selected_in_their_order(patterns, selected):
+    assert TargetSelector(patterns).select(_TARGETS) == selected
+
+
+def test_excluding_a_removed_target_excludes_nothing():
+    targets = [name for name in _TARGETS if name != "libs/legacy"] + ["libs/legacy-tools"]
+    assert TargetSelector(["libs", "!libs/legacy"]).select(targets) == [
+        "libs/core",
+        "libs/core/plugins",
+        "libs/legacy-tools",
+    ]
+
+
+def test_patterns_selecting_nothing_are_reported():
+    selector = TargetSelector(["lib", "libs/core", "re:^web", "!libs/removed"])
+    assert selector.unmatched(_TARGETS) == ["lib", "re:^web"]
+
+
+def test_invalid_regexes_are_reported():
+    with pytest.raises(TargetPatternError) as error:
+        TargetSelector(["re:apps/("])
+    assert error.value.pattern == "re:apps/("
+
+
+def test_selection_does_not_scan_every_target_per_pattern():
+    targets = [f"packages/group{group}/package{package}" for group in range(100) for package in range(100)]
+    selector = TargetSelector([f"packages/group{group}/" for group in range(0, 100, 2)] + ["!packages/group0"])
+    started = time.perf_counter()
+    selected = selector.select(targets)
+    assert time.perf_counter() - started < 1
+    assert len(selected) == 49 * 100
+    assert selected[0] == "packages/group2/package0"
@@ -0,0 +1,182 @@
+import gzip
+import io
+import pathlib
+import shutil
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+import pytest
+from rich.console import Console
+from suit.cli.executor import CLIExecutor
+from suit.config import ProjectConfig, SuitConfig
+from suit.results.fingerprint import fingerprint
+from suit.results.http import HTTPBackend
+from suit.results.shared import CacheBackend, DirectoryBackend, SharedResults
+from suit.scripts.specs import ShellScriptSpec
+from suit.targets import TargetConfig, TargetConfigData
+
+
+class _StandInServer(ThreadingHTTPServer):
+    """Keeps whatever is PUT in memory, and serves it back."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        self.blobs: Dict[str, bytes] = {}
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/cache"
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _StandInServer
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        blob = self.server.blobs.get(self.path)
+        self.send_response(404 if blob is None else 200)
+        self.send_header("Content-Length", str(len(blob or b"")))
+        self.end_headers()
+        self.wfile.write(blob or b"")
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        self.server.blobs[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture(name="server")
+def _server():
+    server = _StandInServer()
+    serving = threading.Thread(target=server.serve_forever)
+    serving.start()
+    yield server
+    server.shutdown()
+    serving.join()
+    server.server_close()
+
+
+def test_http_backend_round_trip(server: _StandInServer):
+    backend = HTTPBackend(server.url)
+    assert backend.load("cas/missing") is None
+    backend.save("cas/blob", b"x" * 1000)
+    assert backend.load("cas/blob") == b"x" * 1000
+
+    stored = server.blobs["/cache/cas/blob"]
+    assert len(stored) < 1000
+    assert gzip.decompress(stored) == b"x" * 1000
+
+
+def test_unreachable_cache_is_left_alone(server: _StandInServer, tmp_path: pathlib.Path):
+    url = server.url
+    server.shutdown()
+    server.server_close()
+    shared = SharedResults(HTTPBackend(url, timeout=1))
+    assert shared.restore("ab" * 32, tmp_path) is None
+    assert shared.error is not None
+    shared.record("ab" * 32, tmp_path, {}, b"log")
+    shared.close()
+
+
+def _tree(root: pathlib.Path, counter: pathlib.Path):
+    root.mkdir()
+    helper = root / "build.py"
+    helper.write_text(
+        "import pathlib, sys\n"
+        f"counter = pathlib.Path({str(counter)!r})\n"
+        "counter.write_text((counter.read_text() if counter.exists() else '') + 'x')\n"
+        "target = pathlib.Path(sys.argv[1])\n"
+        "target.joinpath('dist').mkdir(exist_ok=True)\n"
+        "target.joinpath('dist', 'out.txt').write_text(target.joinpath('input.txt').read_text() * 2)\n"
+        "print('built')\n"
+        "print('warned', file=sys.stderr)\n"
+    )
+    spec = ShellScriptSpec(
+        f"{sys.executable} {{root.path}}/build.py {{local.path}}", inputs=["input.txt"], outputs=["dist/**"]
+    )
+    target = TargetConfig(root / "target", TargetConfigData(scripts={"build": spec}))
+    target.path.mkdir(parents=True, exist_ok=True)
+    target.path.joinpath("input.txt").write_text("1")
+    return SuitConfig(root, ProjectConfig(), [target]).scripts.of(target)["build"]
+
+
+@pytest.fixture(name="backend", params=["directory", "http"])
+def _backend(request: pytest.FixtureRequest, tmp_path: pathlib.Path):
+    if request.param == "directory":
+        return DirectoryBackend(tmp_path / "shared")
+    return HTTPBackend(request.getfixturevalue("server").url)
+
+
+def test_results_are_restored_elsewhere(backend: CacheBackend, tmp_path: pathlib.Path):
+    counter = tmp_path / "counter.txt"
+    first = _tree(tmp_path / "first", counter)
+    second = _tree(tmp_path / "second", counter)
+    assert fingerprint(first, "make") == fingerprint(second, "make")
+
+    def run(script) -> str:
+        shared = SharedResults(backend)
+        output = io.StringIO()
+        CLIExecutor(
+            is_dry_run=False, console=Console(file=output), output_mode="plain", shared_results=shared
+        ).execute(script)
+        shared.close()
+        return output.getvalue()
+
+    assert "running" in run(first)
+    assert counter.read_text() == "x"
+
+    restored = run(second)
+    assert counter.read_text() == "x"
+    assert second.target.path.joinpath("dist", "out.txt").read_text() == "11"
+    assert "target:build: restored from the shared cache" in restored
+    assert "OUT | built" in restored
+    assert "ERR | warned" in restored
+
+    second.target.path.joinpath("input.txt").write_text("2")
+    run(second)
+    assert counter.read_text() == "xx"
+    assert second.target.path.joinpath("dist", "out.txt").read_text() == "22"
+
+
+def test_results_are_not_restored_on_other_platforms(tmp_path: pathlib.Path):
+    counter = tmp_path / "counter.txt"
+    script = _tree(tmp_path / "tree", counter)
+
+    def run(platform_tag: str):
+        shared = SharedResults(DirectoryBackend(tmp_path / "shared"), platform_tag=platform_tag)
+        CLIExecutor(is_dry_run=False, console=Console(file=io.StringIO()), shared_results=shared).execute(script)
+        shared.close()
+        shutil.rmtree(script.target.path / "dist")
+
+    run("linux-x86_64-cpython-311")
+    run("linux-x86_64-cpython-311")
+    assert counter.read_text() == "x"
+    run("darwin-arm64-cpython-311")
+    assert counter.read_text() == "xx"
+
+
+def test_corrupted_blobs_are_misses(tmp_path: pathlib.Path):
+    counter = tmp_path / "counter.txt"
+    script = _tree(tmp_path / "tree", counter)
+    cache = tmp_path / "shared"
+
+    def run():
+        shared = SharedResults(DirectoryBackend(cache))
+        CLIExecutor(is_dry_run=False, console=Console(file=io.StringIO()), shared_results=shared).execute(script)
+        shared.close()
+
+    run()
+    for blob in cache.joinpath("cas").iterdir():
+        blob.write_bytes(b"corrupted")
+    shutil.rmtree(script.target.path / "dist")
+    run()
+    assert counter.read_text() == "xx"
+    assert script.target.path.joinpath("dist", "out.txt").read_text() == "11"
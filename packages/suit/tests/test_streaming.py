@@ -0,0 +1,83 @@
+import io
+import pathlib
+import subprocess
+import sys
+
+import pytest
+from rich.console import Console
+from suit.cli import streaming
+from suit.cli.executor import CLIExecutor, ScriptFailedError
+from suit.cli.streaming import _LineSplitter, stream_process_output, stream_process_output_batches
+from suit.config import ProjectConfig, SuitConfig
+from suit.scripts.resolver import resolve_scripts
+from suit.targets import TargetConfig, TargetConfigData
+
+
+def _python(code: str) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+@pytest.fixture(name="reading", params=["selecting", "threads"])
+def _reading(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+    # Pipes are read by threads on Windows, which can be tried anywhere.
+    if request.param == "threads":
+        monkeypatch.setattr(streaming, "_read_selecting", streaming._read_in_threads)
+    return request.param
+
+
+@pytest.mark.usefixtures("reading")
+def test_lines_of_both_streams_are_collected():
+    lines = []
+    with _python("import sys; print('out'); sys.stdout.flush(); print('err', file=sys.stderr)") as process:
+        stream_process_output(process, lines.append)
+    assert sorted((line.stream, line.text) for line in lines) == [("stderr", "err"), ("stdout", "out")]
+
+
+@pytest.mark.usefixtures("reading")
+def test_large_output_on_both_streams_does_not_deadlock():
+    code = "import sys\nfor i in range(20000):\n    print(i)\n    print(i, file=sys.stderr)"
+    counts = {"stdout": 0, "stderr": 0}
+
+    def count(line):
+        counts[line.stream] += 1
+
+    with _python(code) as process:
+        stream_process_output(process, count)
+    assert process.returncode == 0
+    assert counts == {"stdout": 20000, "stderr": 20000}
+
+
+def test_line_splitter_keeps_partial_lines_until_complete():
+    splitter = _LineSplitter()
+    assert splitter.feed(b"a\nb") == ["a"]
+    assert splitter.feed(b"c\r\n\xe2\x82") == ["bc"]
+    assert splitter.feed(b"\xac", final=True) == ["€"]
+
+
+def test_line_splitter_bounds_line_length():
+    splitter = _LineSplitter(max_line_length=4)
+    assert splitter.feed(b"abcdef") == ["abcdef"]
+    assert splitter.feed(b"gh") == []
+
+
+@pytest.mark.parametrize("tail_lines", [0, 3])
+def test_failure_keeps_only_the_tail_of_the_output(tmp_path: pathlib.Path, tail_lines: int):
+    target = TargetConfig(
+        tmp_path / "target",
+        TargetConfigData(scripts={"noisy": f"{sys.executable} -c 'print(*range(100), sep=chr(10)); exit(3)'"}),
+    )
+    suit = SuitConfig(tmp_path, ProjectConfig(), [target])
+    executor = CLIExecutor(is_dry_run=False, console=Console(file=io.StringIO()), tail_lines=tail_lines)
+
+    with pytest.raises(ScriptFailedError) as failure:
+        executor.execute(resolve_scripts(suit, target)["noisy"])
+    assert failure.value.return_code == 3
+    assert [line.text for line in failure.value.tail] == [str(i) for i in range(100 - tail_lines, 100)]
+
+
+def test_lines_are_batched_by_read():
+    batches = []
+    # A single write of less than PIPE_BUF bytes is read at once.
+    with _python("import os; os.write(1, b'a\\nb\\nc\\n')") as process:
+        stream_process_output_batches(process, batches.append)
+    assert [[line.text for line in batch] for batch in batches] == [["a", "b", "c"]]
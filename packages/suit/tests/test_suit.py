@@ -1,6 +1,8 @@
 import pathlib
 
-from suit.config import SuitConfig, ProjectConfig
+import pytest
+from suit.config import CacheConfig, DiscoveryConfig, SuitConfig, ProjectConfig
+from suit.schema import ConfigError
 from suit.scripts.specs import ShellScriptSpec
 from suit.targets import TargetConfig, TargetConfigData
 
@@ -26,3 +28,41 @@ def test_templates():
 
     template_scripts = suit_config.project_config.templates["package"].scripts
     assert isinstance(template_scripts["black"], ShellScriptSpec)
+
+
+def test_discovery_config_defaults():
+    project_config = ProjectConfig.parse_obj({})
+    assert project_config.discovery == DiscoveryConfig()
+    assert project_config.cache == CacheConfig()
+    assert project_config.resources == {}
+    assert project_config.templates == {}
+
+
+@pytest.mark.parametrize(
+    ["raw_data", "location"],
+    [
+        ({"templates": {"package": {}}}, ("suit", "templates", "package")),
+        (
+            {"templates": {"package": {"scripts": {"lint": {"cmd": 3}}}}},
+            ("suit", "templates", "package", "scripts", "lint", "cmd"),
+        ),
+        (
+            {"templates": {"package": {"scripts": {"lint": ["black", {"cdm": "x"}]}}}},
+            ("suit", "templates", "package", "scripts", "lint", 1),
+        ),
+        ({"discovery": {"exclude": "build"}}, ("suit", "discovery", "exclude")),
+        ({"discovery": {"gitignore": "yes"}}, ("suit", "discovery", "gitignore")),
+        ({"discovery": {"excludes": []}}, ("suit", "discovery", "excludes")),
+        ({"cache": {"url": 8080}}, ("suit", "cache", "url")),
+        ({"resources": {"memory": 0}}, ("suit", "resources", "memory")),
+        ({"resources": {"cpu": 4}}, ("suit", "resources", "cpu")),
+        (
+            {"templates": {"package": {"scripts": {"test": {"cmd": "pytest", "resources": {"cpu": "all"}}}}}},
+            ("suit", "templates", "package", "scripts", "test", "resources", "cpu"),
+        ),
+    ],
+)
+def test_invalid_project_config_is_located(raw_data, location):
+    with pytest.raises(ConfigError) as error:
+        ProjectConfig.parse_obj(raw_data)
+    assert error.value.location == location
@@ -2,6 +2,7 @@ import pathlib
 from typing import Any, Mapping
 
 import pytest
+from suit.schema import ConfigError
 from suit.targets import TargetConfig, TargetConfigData
 from suit.scripts.specs import CompositeScriptSpec, RefScriptSpec, ShellScriptSpec
 
@@ -14,6 +15,10 @@ from suit.scripts.specs import CompositeScriptSpec, RefScriptSpec, ShellScriptSp
             {"inherit": ["a", "b", "c"]},
             TargetConfigData(inherit=["a", "b", "c"]),
         ),
+        (
+            {"depends_on": ["libs/core"]},
+            TargetConfigData(depends_on=["libs/core"]),
+        ),
         (
             {"scripts": {"format": "black"}},
             TargetConfigData(scripts={"format": ShellScriptSpec("black")}),
@@ -26,6 +31,10 @@ from suit.scripts.specs import CompositeScriptSpec, RefScriptSpec, ShellScriptSp
             {"scripts": {"format": {"cmd": "black", "args": {"argname": 1}}}},
             TargetConfigData(scripts={"format": ShellScriptSpec("black", {"argname": 1})}),
         ),
+        (
+            {"scripts": {"build": {"cmd": "make", "inputs": ["src/**"], "outputs": ["dist/*"]}}},
+            TargetConfigData(scripts={"build": ShellScriptSpec("make", inputs=("src/**",), outputs=("dist/*",))}),
+        ),
         (
             {"scripts": {"format-black": "black", "format": {"ref": "format-black"}}},
             TargetConfigData(
@@ -40,10 +49,10 @@ from suit.scripts.specs import CompositeScriptSpec, RefScriptSpec, ShellScriptSp
             TargetConfigData(
                 scripts={
                     "lint": CompositeScriptSpec(
-                        [
+                        (
                             ShellScriptSpec("pylint"),
                             ShellScriptSpec("flake8"),
-                        ]
+                        )
                     )
                 }
             ),
@@ -53,3 +62,26 @@ from suit.scripts.specs import CompositeScriptSpec, RefScriptSpec, ShellScriptSp
 def test_build_target(raw_data: Mapping[str, Any], expected: TargetConfigData):
     config = TargetConfig.from_mapping(pathlib.Path("target"), raw_data)
     assert config == TargetConfig(pathlib.Path("target"), expected)
+
+
+@pytest.mark.parametrize(
+    ["raw_data", "location"],
+    [
+        ({"inherits": ["a"]}, ("tool", "suit", "target", "inherits")),
+        ({"depends_on": "libs/core"}, ("tool", "suit", "target", "depends_on")),
+        (
+            {"scripts": {"build": {"cmd": "make", "inputs": ["src", 3]}}},
+            ("tool", "suit", "target", "scripts", "build", "inputs", 1),
+        ),
+        (
+            {"scripts": {"build": {"scripts": ["a"], "parallel": 1}}},
+            ("tool", "suit", "target", "scripts", "build", "parallel"),
+        ),
+        ({"scripts": {"build": 3}}, ("tool", "suit", "target", "scripts", "build")),
+    ],
+)
+def test_invalid_target_is_located(raw_data: Mapping[str, Any], location: tuple):
+    with pytest.raises(ConfigError) as error:
+        TargetConfig.from_mapping(pathlib.Path("target"), raw_data)
+    assert error.value.location == location
+    assert error.value.source == pathlib.Path("target/pyproject.toml")
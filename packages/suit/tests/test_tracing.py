@@ -0,0 +1,95 @@
+import io
+import json
+import pathlib
+import subprocess
+import sys
+
+from rich.console import Console
+from suit.cli.executor import CLIExecutor, _wait
+from suit.config import ProjectConfig, SuitConfig
+from suit.scripts.resolver import resolve_scripts
+from suit.targets import TargetConfig, TargetConfigData
+from suit.tracing import Tracer
+
+
+def test_spans_know_the_span_they_were_opened_in():
+    tracer = Tracer()
+    with tracer.span("outer", "run"):
+        with tracer.span("inner", "run", size=3) as inner:
+            inner.args["found"] = True
+
+    spans = {span.name: span for span in tracer.spans}
+    assert spans["outer"].parent is None
+    assert spans["inner"].parent == "outer"
+    assert spans["inner"].args == {"size": 3, "found": True}
+    assert spans["outer"].duration >= spans["inner"].duration
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("work", "run"):
+        pass
+    assert not tracer.spans
+
+
+def test_slowest_spans_of_a_category():
+    tracer = Tracer()
+    for name in ["a", "b", "c"]:
+        with tracer.span(name, "script") as span:
+            pass
+        span.duration = {"a": 1.0, "b": 3.0, "c": 2.0}[name]
+    with tracer.span("config", "config"):
+        pass
+    assert [span.name for span in tracer.slowest("script", 2)] == ["b", "c"]
+
+
+def test_chrome_trace_groups_scripts_by_composite(tmp_path: pathlib.Path):
+    tracer = Tracer()
+    with tracer.span("t:one", "script", parents=["t:all", "t:inner"]):
+        pass
+    with tracer.span("t:two", "script", parents=["t:all"]):
+        pass
+    tracer.save(tmp_path / "trace.json")
+
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert sorted(event["name"] for event in events if event["ph"] == "X") == ["t:one", "t:two"]
+    groups = [(event["ph"], event["name"], event["id"]) for event in events if event["cat"] == "composite"]
+    assert sorted(groups) == [
+        ("b", "t:all", "t:all"),
+        ("b", "t:inner", "t:all"),
+        ("e", "t:all", "t:all"),
+        ("e", "t:inner", "t:all"),
+    ]
+
+
+def test_executor_traces_scripts_with_their_resources(tmp_path: pathlib.Path):
+    target = TargetConfig(
+        tmp_path / "target",
+        TargetConfigData(
+            scripts={
+                "busy": f"{sys.executable} -c 'sum(range(10 ** 6))'",
+                "all": {"scripts": [{"ref": "busy"}]},
+            }
+        ),
+    )
+    suit = SuitConfig(tmp_path, ProjectConfig(), [target])
+    tracer = Tracer()
+    CLIExecutor(is_dry_run=False, console=Console(file=io.StringIO()), tracer=tracer).execute(
+        resolve_scripts(suit, target)["all"]
+    )
+
+    [span] = tracer.slowest("script", 1)
+    assert span.name == "target:busy"
+    assert span.parents == ("target:all", "target:all[0]")
+    assert span.args["exit_code"] == 0
+    assert span.args["status"] == "succeeded"
+    if "user_cpu" in span.args:
+        assert span.args["user_cpu"] > 0
+        assert span.args["max_rss_kb"] > 0
+    assert [span.name for span in tracer.spans if span.category == "render"] == ["render command"]
+
+
+def test_processes_reaped_before_waiting_report_no_usage():
+    process = subprocess.Popen([sys.executable, "-c", "raise SystemExit(3)"])
+    process.wait()
+    assert _wait(process) == (3, {})
@@ -0,0 +1,157 @@
+import os
+import pathlib
+import sys
+import threading
+import time
+from typing import Iterable, List, Optional, Set
+
+import pytest
+from suit.cli._watch import _watch_runner
+from suit.cli.jobserver import MAKEFLAGS_VARIABLE, JobServer
+from suit.cli.scheduler import ProcessGroup
+from suit.cli.watch import ScriptWatch
+from suit.selection import TargetSelector
+from suit.warm import WarmSuit
+from suit.watcher import PollingWatcher, TreeWatcher
+
+
+class _ScriptedWatcher(TreeWatcher):
+    """Reports the given batches of changes, one batch every time it's asked."""
+
+    def __init__(self, batches: Iterable[Optional[Set[pathlib.Path]]]):
+        self.__batches = [None if batch is None else {str(path) for path in batch} for batch in batches]
+
+    def watch(self, directories: Iterable[str]) -> bool:
+        return False
+
+    def wait(self, timeout: float):
+        pass
+
+    def changes(self) -> Optional[Set[str]]:
+        return self.__batches.pop(0) if self.__batches else set()
+
+
+def _tree(root: pathlib.Path) -> pathlib.Path:
+    root.joinpath("suit.toml").write_text("[suit]\n")
+    for name in ["a", "b", "c"]:
+        root.joinpath(name).mkdir()
+        root.joinpath(name, "pyproject.toml").write_text(
+            '[tool.suit.target.scripts]\ntest = "true"\nbuild = { cmd = "true", outputs = ["dist/*"] }\n'
+        )
+    return root
+
+
+def _watch(root: pathlib.Path, watcher: TreeWatcher, runs: List[Set[str]], run=None) -> ScriptWatch:
+    def record(suit, targets: Set[str], processes: ProcessGroup):
+        runs.append(targets)
+
+    watch = ScriptWatch(WarmSuit(root), watcher, run or record, debounce=0)
+    assert watch.start() is not None
+    return watch
+
+
+def test_bursts_of_changes_run_their_targets_once(tmp_path: pathlib.Path):
+    root = _tree(tmp_path)
+    runs = []
+    watcher = _ScriptedWatcher([{root / "a" / "x.py"}, {root / "a" / "y.py", root / "b" / "z.py"}, set()])
+    watch = _watch(root, watcher, runs)
+    assert watch.poll(timeout=0) == {"a", "b"}
+    watch.wait_for_run()
+    assert runs == [{"a", "b"}]
+    assert watch.poll(timeout=0) is None
+
+
+def test_ignored_paths_and_outputs_are_not_changes(tmp_path: pathlib.Path):
+    root = _tree(tmp_path)
+    root.joinpath("c", "dist").mkdir()
+    root.joinpath("a", "node_modules").mkdir()
+    changes = {root / "c" / "dist", root / "c" / "dist" / "c.whl", root / "a" / "node_modules", root / "README.md"}
+    runs = []
+    watch = _watch(root, _ScriptedWatcher([changes]), runs)
+    assert watch.poll(timeout=0) is None
+    assert not runs
+
+
+def test_changing_the_root_configurations_runs_every_target(tmp_path: pathlib.Path):
+    root = _tree(tmp_path)
+    runs = []
+    watch = _watch(root, _ScriptedWatcher([{root / "suit.toml"}]), runs)
+    root.joinpath("suit.toml").write_text("[suit.discovery]\ncache = false\n")
+    assert watch.poll(timeout=0) == {"a", "b", "c"}
+
+
+def test_new_changes_cancel_the_stale_run(tmp_path: pathlib.Path):
+    root = _tree(tmp_path)
+    runs = []
+    started = threading.Event()
+
+    def run(suit, targets: Set[str], processes: ProcessGroup):
+        runs.append((targets, processes))
+        started.set()
+        deadline = time.monotonic() + 10
+        while not processes.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    watch = _watch(root, _ScriptedWatcher([{root / "a" / "x.py"}, set(), {root / "b" / "x.py"}]), runs, run)
+    assert watch.poll(timeout=0) == {"a"}
+    assert started.wait(timeout=10)
+    assert watch.poll(timeout=0) == {"a", "b"}
+    assert runs[0][1].cancelled
+    watch.stop()
+    assert [targets for targets, _ in runs] == [{"a"}, {"a", "b"}]
+
+
+def test_watching_the_file_system(tmp_path: pathlib.Path):
+    root = _tree(tmp_path)
+    runs = []
+    watcher = PollingWatcher()
+    watch = _watch(root, watcher, runs)
+    root.joinpath("b", "module.py").write_text("print('hello')")
+    assert watch.poll(timeout=0) == {"b"}
+
+
+def _logging_tree(root: pathlib.Path, project: str, script: str) -> pathlib.Path:
+    """Targets `a` and `b`, whose `test` scripts log when they start and end, sleeping in between."""
+    log = root / "log"
+    helper = root / "record.py"
+    helper.write_text(
+        "import pathlib, time\n"
+        f"log = pathlib.Path({str(log)!r})\n"
+        "with log.open('a') as file: file.write('start ')\n"
+        "time.sleep(0.2)\n"
+        "with log.open('a') as file: file.write('end ')\n"
+    )
+    root.joinpath("suit.toml").write_text(f"[suit]\n{project}")
+    for name in ["a", "b"]:
+        root.joinpath(name).mkdir()
+        root.joinpath(name, "pyproject.toml").write_text(
+            f"[tool.suit.target.scripts]\ntest = {{ cmd = {f'{sys.executable} {helper}'!r}{script} }}\n"
+        )
+    return log
+
+
+def _run_tests(root: pathlib.Path, jobs: int):
+    warm = WarmSuit(root)
+    warm.refresh()
+    run = _watch_runner(("test",), TargetSelector(), jobs, 0, True, "plain", False)
+    run(warm.suit, {"a", "b"}, ProcessGroup())
+
+
+def test_runs_hold_the_resources_of_their_scripts(tmp_path: pathlib.Path):
+    log = _logging_tree(tmp_path, "resources = {memory = 2}\n", ", resources = { memory = 2 }")
+    _run_tests(tmp_path, jobs=2)
+    # Both scripts take the whole memory budget, so they run one after the other despite the 2 jobs.
+    assert log.read_text().split() == ["start", "end", "start", "end"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="The jobserver needs POSIX pipes")
+def test_runs_take_tokens_from_the_jobserver(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    log = _logging_tree(tmp_path, "", "")
+    monkeypatch.setenv(MAKEFLAGS_VARIABLE, "-j1")
+    # Served with a single job, the jobserver has no token to spare for a second script.
+    served = JobServer.serve(1)
+    try:
+        _run_tests(tmp_path, jobs=2)
+    finally:
+        served.close()
+    assert log.read_text().split() == ["start", "end", "start", "end"]
@@ -0,0 +1,51 @@
+import os
+import pathlib
+import sys
+
+import pytest
+from suit.watcher import InotifyWatcher, PollingWatcher, TreeWatcher
+
+_WATCHERS = [PollingWatcher]
+if sys.platform.startswith("linux"):
+    _WATCHERS.append(InotifyWatcher)
+
+
+@pytest.fixture(name="watcher_cls", params=_WATCHERS)
+def _watcher_cls(request: pytest.FixtureRequest):
+    return request.param
+
+
+def test_watchers_report_changed_paths(watcher_cls, tmp_path: pathlib.Path):
+    watcher: TreeWatcher = watcher_cls()
+    try:
+        assert watcher.watch([str(tmp_path)])
+        assert not watcher.watch([str(tmp_path)])
+        assert watcher.changes() == set()
+
+        tmp_path.joinpath("module.py").write_text("print('hello')")
+        tmp_path.joinpath("package").mkdir()
+        assert watcher.changes() == {str(tmp_path / "module.py"), str(tmp_path / "package")}
+        assert not watcher.changed()
+
+        # Changes in directories that are not watched are not reported.
+        tmp_path.joinpath("package", "module.py").write_text("")
+        assert watcher.changes() == set()
+        assert watcher.watch([str(tmp_path), str(tmp_path / "package")])
+        os.remove(tmp_path / "package" / "module.py")
+        assert watcher.changes() == {str(tmp_path / "package" / "module.py")}
+    finally:
+        watcher.close()
+
+
+def test_watchers_report_only_the_named_files(watcher_cls, tmp_path: pathlib.Path):
+    watcher: TreeWatcher = watcher_cls(["pyproject.toml"])
+    try:
+        watcher.watch([str(tmp_path)])
+        tmp_path.joinpath("notes.txt").write_text("irrelevant")
+        assert not watcher.changed()
+        tmp_path.joinpath("pyproject.toml").write_text("[project]\n")
+        assert watcher.changes() == {str(tmp_path / "pyproject.toml")}
+        tmp_path.joinpath("package").mkdir()
+        assert watcher.changed()
+    finally:
+        watcher.close()
@@ -0,0 +1,115 @@
+import io
+import os
+import pathlib
+import shutil
+import signal
+import sys
+import threading
+import time
+
+import pytest
+from rich.console import Console
+from suit.cli.executor import CLIExecutor, ScriptFailedError
+from suit.cli.scheduler import ProcessGroup
+from suit.cli.workers import WorkerPool, resolve_python_command
+from suit.config import ProjectConfig, SuitConfig
+from suit.scripts.specs import ShellScriptSpec
+from suit.targets import TargetConfig, TargetConfigData
+
+pytestmark = pytest.mark.skipif(not WorkerPool.is_available(), reason="Needs fork and Unix sockets")
+
+_TOOL = """\
+import os, sys, time
+
+print("argv", sys.argv[1:])
+print("cwd", os.getcwd())
+print("env", os.environ.get("SUIT_TOOL_VARIABLE"))
+print("warning", file=sys.stderr)
+mode = sys.argv[1]
+if mode == "code":
+    sys.exit(3)
+if mode == "message":
+    sys.exit("bad input")
+if mode == "raise":
+    raise RuntimeError("boom")
+if mode == "sleep":
+    sys.stdout.flush()
+    time.sleep(30)
+"""
+
+
+def _run(root: pathlib.Path, mode: str, warm: bool, processes: ProcessGroup = None):
+    command = f"{sys.executable} -m suit_test_tool {mode} 'an arg'"
+    target = TargetConfig(root / "target", TargetConfigData(scripts={"tool": ShellScriptSpec(command, warm=warm)}))
+    target.path.mkdir(exist_ok=True)
+    script = SuitConfig(root, ProjectConfig(), [target]).scripts.of(target)["tool"]
+    output = io.StringIO()
+    executor = CLIExecutor(is_dry_run=False, console=Console(file=output), output_mode="plain", processes=processes)
+    try:
+        executor.execute(script)
+        return_code = 0
+    except ScriptFailedError as error:
+        return_code = error.return_code
+    return return_code, sorted(line for line in output.getvalue().splitlines() if " | " in line)
+
+
+@pytest.mark.parametrize("mode", ["ok", "code", "message", "raise"])
+def test_warm_runs_behave_like_cold_ones(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, mode: str):
+    tmp_path.joinpath("suit_test_tool.py").write_text(_TOOL)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SUIT_TOOL_VARIABLE", mode)
+
+    cold = _run(tmp_path, mode, warm=False)
+    warm = _run(tmp_path, mode, warm=True)
+    if mode == "raise":
+        # Tracebacks differ in the frames above the tool.
+        assert warm[0] == cold[0] == 1
+        assert warm[1][-1] == cold[1][-1]
+    else:
+        assert warm == cold
+    assert f"target:tool OUT | env {mode}" in warm[1]
+
+
+def test_cancelling_terminates_warm_workers(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    tmp_path.joinpath("suit_test_tool.py").write_text(_TOOL)
+    monkeypatch.chdir(tmp_path)
+    processes = ProcessGroup()
+    results = []
+    running = threading.Thread(target=lambda: results.append(_run(tmp_path, "sleep", True, processes)))
+    running.start()
+    time.sleep(0.5)
+    processes.cancel()
+    running.join(timeout=10)
+    assert results[0][0] == -signal.SIGTERM
+
+
+def test_workers_are_reaped_only_once_waited_for(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    tmp_path.joinpath("suit_test_tool.py").write_text(_TOOL)
+    monkeypatch.chdir(tmp_path)
+    pool = WorkerPool()
+    try:
+        process = pool.spawn(resolve_python_command([sys.executable, "-m", "suit_test_tool", "code"]))
+        time.sleep(0.5)
+        # The worker exited, but its pid is still taken, so it can't be reused by another process yet.
+        os.kill(process.pid, 0)
+        process.stdout.close()
+        process.stderr.close()
+        assert process.wait() == 3
+    finally:
+        pool.close()
+
+
+def test_python_commands_are_resolved():
+    command = resolve_python_command([sys.executable, "-m", "suit.cli", "src"])
+    assert (command.argv, command.preloaded) == (["-m", "src"], "suit")
+    assert resolve_python_command([sys.executable, "-m", "suit.__main__"]).preloaded == "suit"
+    assert resolve_python_command([sys.executable, "-c", "pass"]) is None
+    assert resolve_python_command(["sh", "-c", "true"]) is None
+
+    pytest_script = shutil.which("pytest")
+    if pytest_script is None or os.path.dirname(pytest_script) != os.path.dirname(sys.executable):
+        pytest.skip("pytest is not installed alongside the interpreter")
+    command = resolve_python_command(["pytest", "-q"])
+    assert command.attribute is not None
+    assert command.preloaded == command.module
+    assert command.argv == [pytest_script, "-q"]